@@ -6,33 +6,33 @@ Properly detects stock status with multiple validation checks
 
 import urllib.request
 import csv
-import re
+import heapq
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from config import VERIFY_CONFIG
+from database import db_manager
+from http_cache import cached_urlopen
+from stock_status import StockMatcher
+from structured_data import extract_product
 
 def make_request(url):
     """Make HTTP request"""
     try:
         ua = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         req = urllib.request.Request(url, headers={'User-Agent': ua})
-        response = urllib.request.urlopen(req, timeout=15)
-        return response.read().decode('utf-8', errors='ignore')
+        return cached_urlopen(req, timeout=15).text
     except Exception as e:
         print(f"❌ Error fetching {url}: {e}")
         return None
 
-def detect_stock_status(html_content, url=""):
-    """
-    Improved stock detection with multiple checks
-    Returns: (in_stock: bool, confidence: str, reason: str)
-    """
-    if not html_content:
-        return False, "low", "No HTML content"
-    
-    html_lower = html_content.lower()
-    
-    # PRIORITY 1: Explicit out-of-stock indicators (these override everything)
-    out_of_stock_indicators = [
+# PRIORITY 1: Explicit out-of-stock indicators (these override everything)
+# PRIORITY 2: Strong in-stock indicators, unless buttons are disabled
+# PRIORITY 3: Visible price
+stock_matcher = StockMatcher(
+    out_of_stock=[
         'out of stock',
         'sold out', 
         'currently unavailable',
@@ -45,14 +45,8 @@ def detect_stock_status(html_content, url=""):
         'not available',
         'discontinued',
         'item unavailable'
-    ]
-    
-    for indicator in out_of_stock_indicators:
-        if indicator in html_lower:
-            return False, "high", f"Found '{indicator}'"
-    
-    # PRIORITY 2: Strong in-stock indicators
-    strong_in_stock_indicators = [
+    ],
+    in_stock=[
         'add to cart',
         'buy now',
         'purchase now',
@@ -61,93 +55,139 @@ def detect_stock_status(html_content, url=""):
         'available now',
         'ships today',
         'ready to ship'
-    ]
-    
-    strong_matches = []
-    for indicator in strong_in_stock_indicators:
-        if indicator in html_lower:
-            strong_matches.append(indicator)
-    
-    # PRIORITY 3: Check for price visibility (good indicator)
-    has_visible_price = bool(re.search(r'\$[0-9,]+\.?\d*', html_content))
-    
-    # PRIORITY 4: Check for disabled/greyed out buttons
-    disabled_patterns = [
-        r'disabled["\s>]',
-        r'btn-disabled',
-        r'button-disabled',
-        r'class="[^"]*disabled[^"]*"'
-    ]
-    
-    has_disabled_elements = any(re.search(pattern, html_lower) for pattern in disabled_patterns)
-    
-    # Decision logic
-    if strong_matches and not has_disabled_elements:
-        return True, "high", f"Found: {', '.join(strong_matches[:2])}"
-    elif strong_matches and has_disabled_elements:
-        return False, "medium", "Buttons present but disabled"
-    elif has_visible_price and not has_disabled_elements:
-        return True, "medium", "Price visible, no disabled elements"
-    else:
-        return False, "low", "No clear stock indicators"
+    ],
+    disabled=True,
+    price=True,
+)
+
+def detect_stock_status(html_content, url=""):
+    """
+    Improved stock detection with multiple checks
+    Returns: (in_stock: bool, confidence: str, reason: str)
+    """
+    return stock_matcher.detect(html_content)
+
+class StockVerifier:
+    """Re-checks stock and price of the deals users actually see.
 
-def check_multiple_products():
-    """Check stock status on multiple products"""
+    The priority queue holds the top VERIFY_CONFIG['max_rank'] entries of
+    every caliber's best_prices board, ordered by minutes since the product
+    was last verified divided by its rank: the cheapest offer is due every
+    reverify_minutes, rank N every N times that. Pages are fetched
+    concurrently through the shared cache and per-domain rate limiter, at
+    most checks_per_minute overall, and results are written back to the
+    product record with verified_at.
+    """
+
+    def __init__(self, max_rank=None, reverify_minutes=None, checks_per_minute=None, concurrency=None):
+        self.max_rank = max_rank or VERIFY_CONFIG['max_rank']
+        self.reverify_minutes = reverify_minutes or VERIFY_CONFIG['reverify_minutes']
+        self.checks_per_minute = checks_per_minute or VERIFY_CONFIG['checks_per_minute']
+        self.concurrency = concurrency or VERIFY_CONFIG['concurrency']
+        self.queue = []
+
+        # Statistics (updated from the worker threads)
+        self.stats_lock = threading.Lock()
+        self.checked = 0
+        self.changed = 0
+        self.failed = 0
+
+    def refill(self, now=None):
+        """Rebuild the queue from the leaderboard with every entry that is due"""
+        now = now or datetime.utcnow()
+        self.queue = []
+        for product_id, name, url, price, rank, last_checked in db_manager.get_verification_candidates(self.max_rank):
+            age_minutes = (now - last_checked).total_seconds() / 60 if last_checked else float('inf')
+            urgency = age_minutes / rank
+            if urgency >= self.reverify_minutes:
+                heapq.heappush(self.queue, (-urgency, rank, product_id, name, url, price))
+        return len(self.queue)
+
+    def next_batch(self, size):
+        """Pop up to size of the most urgent entries"""
+        return [heapq.heappop(self.queue) for _ in range(min(size, len(self.queue)))]
+
+    def verify(self, entry):
+        """Fetch one product page and write the result back; None if the page could not be loaded"""
+        _, rank, product_id, name, url, expected_price = entry
+        html = make_request(url)
+        if not html:
+            with self.stats_lock:
+                self.failed += 1
+            return None
+
+        # schema.org Product markup beats page heuristics for both price and availability
+        structured = extract_product(html)
+        if structured and structured['in_stock'] is not None:
+            in_stock, confidence, reason = structured['in_stock'], 'high', 'Structured data availability'
+        else:
+            in_stock, confidence, reason = detect_stock_status(html, url)
+        current_price = structured['price'] if structured else None
+
+        changed = db_manager.record_verification(
+            product_id,
+            in_stock=in_stock if confidence != 'low' else None,
+            price=current_price
+        )
+        with self.stats_lock:
+            self.checked += 1
+            self.changed += changed
+
+        return {
+            'name': name,
+            'url': url,
+            'rank': rank,
+            'in_stock': in_stock,
+            'confidence': confidence,
+            'reason': reason,
+            'expected_price': expected_price,
+            'current_price': current_price,
+            'price_match': current_price == expected_price if current_price else False,
+            'checked_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+    def run_once(self, limit=None):
+        """Verify the most urgent due entries concurrently; returns their results"""
+        self.refill()
+        batch = self.next_batch(limit or self.checks_per_minute)
+        if not batch:
+            return []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            return [result for result in executor.map(self.verify, batch) if result]
+
+    def run_forever(self):
+        """Keep the top deals verified, spending at most checks_per_minute per minute"""
+        while True:
+            started = time.monotonic()
+            results = self.run_once()
+            print(f"🔁 Verified {len(results)} deals "
+                  f"(total {self.checked} checked, {self.changed} changed, {self.failed} failed)")
+            time.sleep(max(0.0, 60 - (time.monotonic() - started)))
+
+def check_multiple_products(limit=None):
+    """Check stock status of the most urgent top-ranked deals"""
     
     print("🔍 ACCURATE STOCK STATUS CHECK")
     print("="*60)
     
-    # Test products from our previous data
-    test_products = [
-        {
-            'name': 'Winchester 9mm NATO (1000 rounds)',
-            'url': 'https://www.bulkammo.com/1000-rounds-of-9mm-nato-ammo-by-winchester-124gr-fmj',
-            'expected_price': 244.00
-        },
-        {
-            'name': 'Ammo Inc 9mm (1000 rounds)', 
-            'url': 'https://www.bulkammo.com/1000-rounds-of-9mm-ammo-by-ammo-inc-115gr-fmj',
-            'expected_price': 244.00
-        },
-        {
-            'name': 'Turan 5.56 (750 rounds)',
-            'url': 'https://www.bulkammo.com/750-rounds-of-5-56x45-ammo-by-turan-55gr-fmj',
-            'expected_price': 314.00
-        }
-    ]
+    verifier = StockVerifier()
+    due = verifier.refill()
+    batch = verifier.next_batch(limit or verifier.checks_per_minute)
+    print(f"{due} top-ranked deals due for verification, checking {len(batch)}")
+    
+    with ThreadPoolExecutor(max_workers=verifier.concurrency) as executor:
+        checked = list(executor.map(verifier.verify, batch))
     
     results = []
     
-    for i, product in enumerate(test_products, 1):
-        print(f"\n{i}. Testing: {product['name']}")
-        print(f"   URL: {product['url']}")
+    for i, (entry, result) in enumerate(zip(batch, checked), 1):
+        _, rank, _, name, url, _ = entry
+        print(f"\n{i}. Testing: {name} (rank {rank})")
+        print(f"   URL: {url}")
         
-        html = make_request(product['url'])
-        if html:
-            in_stock, confidence, reason = detect_stock_status(html, product['url'])
-            
-            # Also check for current price
-            price_match = re.search(r'\$([0-9,]+\.?\d*)', html)
-            current_price = None
-            if price_match:
-                try:
-                    current_price = float(price_match.group(1).replace(',', ''))
-                except:
-                    pass
-            
-            result = {
-                'name': product['name'],
-                'url': product['url'],
-                'in_stock': in_stock,
-                'confidence': confidence,
-                'reason': reason,
-                'expected_price': product['expected_price'],
-                'current_price': current_price,
-                'price_match': current_price == product['expected_price'] if current_price else False,
-                'checked_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
+        if result:
             results.append(result)
+            in_stock, confidence, current_price = result['in_stock'], result['confidence'], result['current_price']
             
             # Display result
             stock_emoji = "✅" if in_stock else "❌"
@@ -156,13 +196,11 @@ def check_multiple_products():
             
             print(f"   Status: {stock_emoji} {'IN STOCK' if in_stock else 'OUT OF STOCK'}")
             print(f"   Confidence: {confidence_emoji} {confidence.upper()}")
-            print(f"   Reason: {reason}")
-            print(f"   Price: {price_emoji} Expected ${product['expected_price']} | Current ${current_price or 'Not found'}")
+            print(f"   Reason: {result['reason']}")
+            print(f"   Price: {price_emoji} Expected ${result['expected_price']} | Current ${current_price or 'Not found'}")
             
         else:
             print("   ❌ Failed to load page")
-        
-        time.sleep(2)  # Be respectful
     
     return results
 
@@ -173,7 +211,7 @@ def save_accurate_results(results, filename='accurate_stock_check.csv'):
     
     try:
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['name', 'url', 'in_stock', 'confidence', 'reason', 'expected_price', 'current_price', 'price_match', 'checked_at']
+            fieldnames = ['name', 'url', 'rank', 'in_stock', 'confidence', 'reason', 'expected_price', 'current_price', 'price_match', 'checked_at']
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             
             writer.writeheader()
@@ -217,9 +255,17 @@ def analyze_accuracy_issues(results):
 
 def main():
     """Main function"""
+    if '--continuous' in sys.argv:
+        print("🔁 Continuously verifying top-ranked deals (Ctrl+C to stop)")
+        try:
+            StockVerifier().run_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+    
     print("🔧 FIXING STOCK DETECTION ISSUES")
     print("="*60)
-    print("Testing our previous products with improved detection...")
+    print("Re-verifying the top-ranked deals with improved detection...")
     
     # Check stock status accurately
     results = check_multiple_products()
@@ -4,16 +4,40 @@ Analyze scraped ammunition pricing results
 """
 
 import csv
+import sys
 
-def analyze_results():
+import price_snapshot
+
+def load_deals(combined=False):
+    """caliber/price_per_round/retailer of every priced deal.
+
+    By default this is the scraper's real_ammo_prices.csv. With combined=True
+    it is the all-retailer feed from combine_prices.py, reading only those
+    three columns of its Parquet snapshot (or all_prices.csv without one).
+    """
+    csv_file = 'real_ammo_prices.csv'
+    if combined:
+        if price_snapshot.available():
+            df = price_snapshot.read_snapshot(
+                columns=['caliber', 'price_per_round', 'retailer'],
+                filter=price_snapshot.ds.field('price_per_round').is_valid()
+            )
+            if df is not None:
+                return df.to_dict('records')
+        csv_file = 'all_prices.csv'
+
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        return [row for row in csv.DictReader(f) if row['price_per_round']]
+
+def analyze_results(combined=False):
     """Analyze the scraped ammunition data"""
+    source = "the combined feed (prices_snapshot/ or all_prices.csv)" if combined else "'real_ammo_prices.csv'"
     
     try:
-        with open('real_ammo_prices.csv', 'r', encoding='utf-8') as f:
-            data = list(csv.DictReader(f))
+        data = load_deals(combined)
         
         if not data:
-            print("No data found in CSV file")
+            print(f"No data found in {source}")
             return
         
         print("🎯 AMMUNITION DEAL ANALYSIS")
@@ -75,12 +99,13 @@ def analyze_results():
         for retailer, count in sorted(retailers.items(), key=lambda x: x[1], reverse=True):
             print(f"{retailer}: {count} deals")
         
-        print(f"\n✅ Analysis complete! Data saved in 'real_ammo_prices.csv'")
+        print(f"\n✅ Analysis complete! Data read from {source}")
         
     except FileNotFoundError:
-        print("❌ real_ammo_prices.csv not found. Run the scraper first!")
+        print(f"❌ {source} not found. Run the scraper first!")
     except Exception as e:
         print(f"❌ Error analyzing data: {e}")
 
 if __name__ == "__main__":
-    analyze_results() 
\ No newline at end of file
+    # --combined: analyse every retailer's prices from combine_prices.py instead
+    analyze_results(combined='--combined' in sys.argv) 
\ No newline at end of file
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from urllib.parse import urlparse
+
+from config import SCRAPING_CONFIG
+from http_cache import response_cache
+from rate_limiter import rate_limiter, retry_delay
+
+
+class AsyncFetcher:
+    """Fetch many URLs concurrently, never running more than
+    SCRAPING_CONFIG['concurrent_limit'] requests against the same host.
+    Request pacing comes from the shared per-domain rate limiter and
+    responses go through the shared on-disk cache."""
+
+    def __init__(self, headers=None, proxy=None, concurrent_limit=None, retries=None, timeout=None, logger=None):
+        self.headers = headers or {}
+        self.proxy = proxy
+        self.concurrent_limit = concurrent_limit or SCRAPING_CONFIG['concurrent_limit']
+        self.retries = SCRAPING_CONFIG['retries'] if retries is None else retries
+        self.timeout = timeout or SCRAPING_CONFIG['timeout']
+        self.logger = logger or logging.getLogger(__name__)
+        self._semaphores = {}
+
+    def _get_semaphore(self, url):
+        """Get the semaphore bounding concurrency for the URL's host"""
+        host = urlparse(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.concurrent_limit)
+        return self._semaphores[host]
+
+    async def fetch(self, session, url):
+        """Fetch a single URL with retries, holding the host's slot for every attempt"""
+        async with self._get_semaphore(url):
+            for attempt in range(self.retries + 1):
+                try:
+                    entry, cached, extra_headers = response_cache.begin(url)
+                    if cached:
+                        return cached
+
+                    await rate_limiter.acquire_async(url)
+                    async with session.get(url, headers=extra_headers, allow_redirects=True,
+                                           proxy=self.proxy) as response:
+                        response.raise_for_status()
+                        body = await response.read()
+                        return response_cache.finish(url, entry, response.status, body,
+                                                     dict(response.headers), response.charset)
+
+                except Exception as e:
+                    self.logger.warning(f"Request attempt {attempt + 1} failed for {url}: {e}")
+                    if attempt >= self.retries:
+                        raise
+                    await asyncio.sleep(retry_delay(attempt))
+
+    async def _fetch_or_error(self, session, url):
+        try:
+            return url, await self.fetch(session, url)
+        except Exception as e:
+            return url, e
+
+    async def fetch_all(self, urls):
+        """Fetch all URLs concurrently, yielding (url, response) pairs as they complete.
+
+        Failed URLs are yielded with the final exception in place of a response.
+        """
+        import aiohttp
+
+        self._semaphores = {}
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(headers=self.headers, timeout=timeout) as session:
+            tasks = [asyncio.ensure_future(self._fetch_or_error(session, url)) for url in urls]
+            try:
+                for task in asyncio.as_completed(tasks):
+                    yield await task
+            finally:
+                for task in tasks:
+                    task.cancel()
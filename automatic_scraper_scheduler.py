@@ -6,25 +6,66 @@ Runs ammunition price scraper at regular intervals
 
 import schedule
 import time
-import subprocess
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
 import json
 
+# ScraperRunner reused across runs by run_scraper_runner_job
+_scraper_runner = None
+
+def run_direct_retailer_job():
+    """direct_retailer_scraper.py, in-process; returns per-retailer product counts"""
+    from direct_retailer_scraper import RetailerScraper
+    return RetailerScraper().run()
+
+def run_scraper_runner_job():
+    """ScraperRunner over every enabled retailer.
+
+    The scraper objects are kept between runs; each scrape_products() sets up
+    a fresh HTTP session and closes it when the scrape ends.
+    """
+    global _scraper_runner
+    from scraper_runner import ScraperRunner
+    if _scraper_runner is None:
+        _scraper_runner = ScraperRunner()
+    for scraper in _scraper_runner.scrapers.values():
+        scraper.products_found = scraper.products_updated = scraper.products_new = 0
+        scraper.errors = []
+    _scraper_runner.run_all_scrapers()
+    return {
+        retailer_name: scraper.products_found
+        for retailer_name, scraper in _scraper_runner.scrapers.items()
+    }
+
+# Jobs the scheduler can run; each returns {retailer: products found}
+JOBS = {
+    'direct_retailer': run_direct_retailer_job,
+    'scraper_runner': run_scraper_runner_job,
+}
+
 class AmmoScraperScheduler:
     def __init__(self):
         self.setup_logging()
         self.config = {
-            "scraper_script": "direct_retailer_scraper.py",
+            "job": "direct_retailer",  # Key of JOBS to run
             "interval_minutes": 30,  # Run every 30 minutes
+            "timeout_seconds": 300,  # Runs taking longer are recorded as timed out
             "max_failures": 5,       # Stop after 5 consecutive failures
             "log_file": "scraper_scheduler.log",
-            "stats_file": "scheduler_stats.json"
+            "stats_file": "scheduler_stats.json",
+            "results_file": "scheduler_runs.jsonl"  # One JSON result per run
         }
         self.consecutive_failures = 0
         self.total_runs = 0
         self.successful_runs = 0
+        self.last_result = None
+        
+        # Jobs run on one long-lived worker thread, so module-level HTTP/DB
+        # pools and caches stay warm between runs
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scraper-job')
+        self.running = None
         
     def setup_logging(self):
         """Setup logging configuration"""
@@ -39,60 +80,68 @@ class AmmoScraperScheduler:
         self.logger = logging.getLogger(__name__)
         
     def run_scraper(self):
-        """Run the ammunition scraper"""
+        """Run the configured scraper job in-process and record its result"""
+        if self.running and not self.running.done():
+            self.logger.warning("⏭️  Previous scraper run is still going, skipping this interval")
+            return
+        
         self.total_runs += 1
         start_time = datetime.now()
+        job_name = self.config["job"]
         
-        self.logger.info(f"🚀 Starting scraper run #{self.total_runs}")
+        self.logger.info(f"🚀 Starting scraper run #{self.total_runs} ({job_name})")
         self.logger.info(f"⏰ Time: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
         
+        result = {
+            "run": self.total_runs,
+            "job": job_name,
+            "started_at": start_time.isoformat(),
+            "status": "failed",
+            "products": 0,
+            "retailers": {},
+            "error": None,
+        }
+        
         try:
-            # Run the scraper script
-            result = subprocess.run(
-                ["python", self.config["scraper_script"]], 
-                capture_output=True, 
-                text=True, 
-                timeout=300  # 5 minute timeout
-            )
+            self.running = self.executor.submit(JOBS[job_name])
+            counts = self.running.result(timeout=self.config["timeout_seconds"]) or {}
             
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
+            result["retailers"] = counts
+            result["products"] = sum(counts.values())
+            result["status"] = "success" if result["products"] else "empty"
             
-            if result.returncode == 0:
-                self.successful_runs += 1
-                self.consecutive_failures = 0
-                
-                # Check if CSV was updated
-                csv_updated = self.check_csv_updated()
-                
-                self.logger.info(f"✅ Scraper completed successfully in {duration:.1f}s")
-                if csv_updated:
-                    self.logger.info(f"📊 CSV file updated with fresh data")
-                else:
-                    self.logger.warning(f"⚠️  CSV file may not have been updated")
-                    
-                # Log any output from scraper
-                if result.stdout.strip():
-                    self.logger.info(f"📝 Scraper output: {result.stdout.strip()}")
-                    
-            else:
-                self.consecutive_failures += 1
-                self.logger.error(f"❌ Scraper failed with exit code {result.returncode}")
-                self.logger.error(f"Error output: {result.stderr}")
-                
-                # Stop if too many consecutive failures
-                if self.consecutive_failures >= self.config["max_failures"]:
-                    self.logger.critical(f"🛑 Stopping scheduler after {self.consecutive_failures} consecutive failures")
-                    self.save_stats()
-                    return schedule.CancelJob
-                    
-        except subprocess.TimeoutExpired:
-            self.consecutive_failures += 1
-            self.logger.error(f"⏱️  Scraper timed out after 5 minutes")
+        except FutureTimeoutError:
+            # A thread cannot be killed; later intervals are skipped until it finishes
+            result["status"] = "timeout"
+            result["error"] = f"Still running after {self.config['timeout_seconds']}s"
             
         except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        
+        result["duration_seconds"] = round((datetime.now() - start_time).total_seconds(), 1)
+        self.last_result = result
+        self.save_result(result)
+        
+        if result["status"] in ("success", "empty"):
+            self.successful_runs += 1
+            self.consecutive_failures = 0
+            self.logger.info(f"✅ Scraper completed successfully in {result['duration_seconds']:.1f}s")
+            if result["products"]:
+                self.logger.info(f"📊 {result['products']} products: {result['retailers']}")
+            else:
+                self.logger.warning(f"⚠️  Scraper found no products")
+        else:
             self.consecutive_failures += 1
-            self.logger.error(f"💥 Unexpected error running scraper: {str(e)}")
+            if result["status"] == "timeout":
+                self.logger.error(f"⏱️  Scraper timed out after {self.config['timeout_seconds']}s")
+            else:
+                self.logger.error(f"❌ Scraper failed: {result['error']}")
+            
+            # Stop if too many consecutive failures
+            if self.consecutive_failures >= self.config["max_failures"]:
+                self.logger.critical(f"🛑 Stopping scheduler after {self.consecutive_failures} consecutive failures")
+                self.save_stats()
+                return schedule.CancelJob
             
         # Update and save statistics
         self.save_stats()
@@ -102,18 +151,13 @@ class AmmoScraperScheduler:
         self.logger.info(f"📈 Stats: {self.successful_runs}/{self.total_runs} successful ({success_rate:.1f}%)")
         self.logger.info("="*60)
         
-    def check_csv_updated(self):
-        """Check if the CSV file was recently updated"""
-        csv_file = "direct_retailer_prices.csv"
+    def save_result(self, result):
+        """Append one run's structured result to the results file"""
         try:
-            if os.path.exists(csv_file):
-                file_mod_time = os.path.getmtime(csv_file)
-                current_time = time.time()
-                # Consider "updated" if modified within last 2 minutes
-                return (current_time - file_mod_time) < 120
-            return False
-        except:
-            return False
+            with open(self.config["results_file"], 'a') as f:
+                f.write(json.dumps(result) + "\n")
+        except Exception as e:
+            self.logger.error(f"Failed to save run result: {e}")
             
     def save_stats(self):
         """Save running statistics"""
@@ -123,6 +167,7 @@ class AmmoScraperScheduler:
             "consecutive_failures": self.consecutive_failures,
             "success_rate": (self.successful_runs / self.total_runs * 100) if self.total_runs > 0 else 0,
             "last_run": datetime.now().isoformat(),
+            "last_result": self.last_result,
             "config": self.config
         }
         
@@ -140,15 +185,16 @@ class AmmoScraperScheduler:
         self.logger.info("🎯 CheapAmmo Automatic Scraper Scheduler Starting")
         self.logger.info("="*60)
         self.logger.info(f"📂 Working directory: {os.getcwd()}")
-        self.logger.info(f"🐍 Scraper script: {self.config['scraper_script']}")
+        self.logger.info(f"🐍 Scraper job: {self.config['job']} (in-process)")
         self.logger.info(f"⏰ Interval: Every {self.config['interval_minutes']} minutes")
         self.logger.info(f"📋 Log file: {self.config['log_file']}")
         self.logger.info(f"📊 Stats file: {self.config['stats_file']}")
+        self.logger.info(f"🧾 Results file: {self.config['results_file']}")
         self.logger.info("="*60)
         
-        # Check if scraper script exists
-        if not os.path.exists(self.config["scraper_script"]):
-            self.logger.error(f"❌ Scraper script not found: {self.config['scraper_script']}")
+        # Check the job exists
+        if self.config["job"] not in JOBS:
+            self.logger.error(f"❌ Unknown scraper job: {self.config['job']} (choose from {', '.join(JOBS)})")
             return
             
         # Schedule the job
@@ -171,6 +217,9 @@ class AmmoScraperScheduler:
         except Exception as e:
             self.logger.error(f"💥 Scheduler error: {str(e)}")
             self.save_stats()
+            
+        finally:
+            self.executor.shutdown(wait=False)
 
 def main():
     """Main function with command line options"""
@@ -1,16 +1,18 @@
 import requests
+import asyncio
 import logging
 import time
 from abc import ABC, abstractmethod
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from utils import scraping_utils
 from database import db_manager
-from config import SCRAPING_CONFIG, PROXY_CONFIG
+from rate_limiter import rate_limiter, retry_delay
+from http_cache import response_cache, FetchedResponse
+from webdriver_pool import webdriver_pool
+from playwright_renderer import playwright_renderer
+from async_fetcher import AsyncFetcher
+from html_parsers import parse_html
+from recrawl import recrawl_scheduler
+from config import SCRAPING_CONFIG, PROXY_CONFIG, RECRAWL_CONFIG
 
 class BaseScraper(ABC):
     def __init__(self, retailer_config):
@@ -21,7 +23,18 @@ class BaseScraper(ABC):
         
         self.logger = logging.getLogger(f"{__name__}.{self.retailer_name}")
         self.session = requests.Session()
-        self.driver = None
+        
+        # Async mode fetches product pages concurrently (per-host bounded)
+        self.use_async = SCRAPING_CONFIG['async_enabled']
+        # Default renderer for make_request: None (plain HTTP), 'selenium' or 'playwright'
+        self.use_browser = retailer_config.get('use_browser')
+        # HTML parser backend for parse_html (see html_parsers.PARSERS)
+        self.parser = retailer_config.get('parser', SCRAPING_CONFIG['parser'])
+        # Only re-fetch known product pages when the recrawl scheduler says they are due
+        self.recrawl = retailer_config.get('recrawl', RECRAWL_CONFIG['enabled'])
+        self._prefetched = {}
+        # Products waiting for the next batched upsert
+        self._pending_products = []
         
         # Statistics
         self.products_found = 0
@@ -29,9 +42,12 @@ class BaseScraper(ABC):
         self.products_new = 0
         self.errors = []
         
-        # Get or create retailer in database
-        self.retailer_db = db_manager.add_retailer(
-            name=self.retailer_name,
+        # Fail at startup, not on every flush, if the schema can't be brought up to date
+        db_manager.ensure_schema()
+        
+        # Get or create retailer in database (cached process-wide)
+        self.retailer_id = db_manager.get_retailer_id(
+            self.retailer_name,
             website=self.base_url,
             base_url=self.base_url
         )
@@ -45,85 +61,84 @@ class BaseScraper(ABC):
             if proxy:
                 self.session.proxies.update(proxy)
     
-    def setup_selenium(self, headless=True):
-        """Setup Selenium WebDriver for JavaScript-heavy sites"""
-        try:
-            chrome_options = Options()
-            if headless:
-                chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument(f'--user-agent={scraping_utils.get_random_user_agent()}')
-            
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.set_page_load_timeout(SCRAPING_CONFIG['timeout'])
-            return True
-        except Exception as e:
-            self.logger.error(f"Failed to setup Selenium: {e}")
-            return False
-    
-    def make_request(self, url, use_selenium=False, retries=None):
-        """Make HTTP request with error handling and retries"""
+    def make_request(self, url, use_selenium=False, retries=None, use_browser=None):
+        """Make HTTP request with error handling and retries.
+        
+        use_browser selects a renderer for JavaScript-heavy pages: 'selenium'
+        (same as use_selenium=True) or 'playwright'. Defaults to the scraper's
+        use_browser setting.
+        """
         if retries is None:
             retries = SCRAPING_CONFIG['retries']
+        if use_selenium:
+            use_browser = 'selenium'
+        elif use_browser is None:
+            use_browser = self.use_browser
+        
+        # Pages already fetched by the async engine are served from memory
+        if url in self._prefetched:
+            return self._prefetched.pop(url)
         
         for attempt in range(retries + 1):
             try:
-                if use_selenium:
+                if use_browser == 'selenium':
                     return self._selenium_request(url)
+                elif use_browser == 'playwright':
+                    response = playwright_renderer.render(url)
+                    response.raise_for_status()
+                    return response
                 else:
                     return self._requests_request(url)
                     
             except Exception as e:
                 self.logger.warning(f"Request attempt {attempt + 1} failed for {url}: {e}")
-                if attempt < retries:
-                    scraping_utils.random_delay()
-                else:
+                if attempt >= retries:
                     self.logger.error(f"All {retries + 1} attempts failed for {url}")
                     self.errors.append(f"Request failed: {url} - {str(e)}")
                     return None
+                time.sleep(retry_delay(attempt))
     
     def _requests_request(self, url):
-        """Make request using requests library"""
-        response = self.session.get(
-            url, 
-            timeout=SCRAPING_CONFIG['timeout'],
-            allow_redirects=True
-        )
-        response.raise_for_status()
-        
-        # Add delay between requests
-        scraping_utils.random_delay()
+        """Make request using requests library, revalidating against the response cache"""
+        def send(extra_headers):
+            response = self.session.get(
+                url, 
+                headers=extra_headers,
+                timeout=SCRAPING_CONFIG['timeout'],
+                allow_redirects=True
+            )
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response.status_code, response.content, response.headers, response.encoding
         
-        return response
+        return response_cache.fetch(url, send)
     
     def _selenium_request(self, url):
-        """Make request using Selenium WebDriver"""
-        if not self.driver:
-            if not self.setup_selenium():
-                raise Exception("Selenium driver not available")
+        """Render page with a WebDriver leased from the shared pool"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
         
-        self.driver.get(url)
+        rate_limiter.acquire(url)
         
-        # Wait for page to load
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
-        
-        # Add delay between requests
-        scraping_utils.random_delay()
-        
-        return self.driver
+        with webdriver_pool.lease() as driver:
+            driver.get(url)
+            
+            # Wait for page to load
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.TAG_NAME, "body"))
+            )
+            
+            return FetchedResponse(driver.current_url, 200, driver.page_source)
     
     def parse_html(self, response):
-        """Parse HTML response into BeautifulSoup object"""
+        """Parse HTML response into a tree with the BeautifulSoup find/find_all/get_text API"""
         if hasattr(response, 'text'):
             # requests response
-            return BeautifulSoup(response.text, 'html.parser')
+            return parse_html(response.text, self.parser)
         elif hasattr(response, 'page_source'):
             # selenium response
-            return BeautifulSoup(response.page_source, 'html.parser')
+            return parse_html(response.page_source, self.parser)
         else:
             return None
     
@@ -134,7 +149,7 @@ class BaseScraper(ABC):
             product_data = self._extract_product_details(product_element, product_url)
             
             if product_data and self._validate_product_data(product_data):
-                product_data['retailer_id'] = self.retailer_db.id
+                product_data['retailer_id'] = self.retailer_id
                 return product_data
             
         except Exception as e:
@@ -161,15 +176,29 @@ class BaseScraper(ABC):
         return True
     
     def save_product(self, product_data):
-        """Save product data to database"""
+        """Queue product data for the database; written in batches of SCRAPING_CONFIG['db_batch_size']"""
+        product_data.setdefault('retailer_id', self.retailer_id)
+        self._pending_products.append(product_data)
+        
+        if len(self._pending_products) >= SCRAPING_CONFIG['db_batch_size']:
+            return self.flush_products()
+        return True
+    
+    def flush_products(self):
+        """Upsert all queued products in one transaction"""
+        if not self._pending_products:
+            return True
+        
+        batch, self._pending_products = self._pending_products, []
         try:
-            success = db_manager.upsert_product(product_data)
-            if success:
-                self.products_updated += 1
-                self.logger.debug(f"Saved product: {product_data['name']}")
-            return success
+            saved = db_manager.upsert_products(batch)
+            self.products_updated += saved
+            self.logger.debug(f"Saved {saved} of {len(batch)} products")
+            if not saved:
+                self.errors.append(f"Database error: batch of {len(batch)} products not saved")
+            return bool(saved)
         except Exception as e:
-            self.logger.error(f"Error saving product: {e}")
+            self.logger.error(f"Error saving products: {e}")
             self.errors.append(f"Database error: {str(e)}")
             return False
     
@@ -189,31 +218,70 @@ class BaseScraper(ABC):
             
             self.logger.info(f"Found {len(urls_to_scrape)} URLs to scrape")
             
+            if self.recrawl:
+                urls_to_scrape = recrawl_scheduler.filter_due(urls_to_scrape)
+                if not urls_to_scrape:
+                    self.logger.info("No product pages due for a recrawl")
+                    self.log_scraping_results()
+                    return
+            
             # Scrape each URL
-            for url in urls_to_scrape:
-                try:
-                    self.scrape_product_page(url)
-                except Exception as e:
-                    self.logger.error(f"Error scraping {url}: {e}")
-                    self.errors.append(f"Page scraping error: {url} - {str(e)}")
-                    continue
+            if self.use_async:
+                asyncio.run(self._scrape_urls_async(urls_to_scrape))
+            else:
+                for url in urls_to_scrape:
+                    self._scrape_url(url)
             
             # Log results
+            self.flush_products()
             self.log_scraping_results()
             
         except Exception as e:
             self.logger.error(f"Scraping failed: {e}")
             self.errors.append(f"Scraping failed: {str(e)}")
         finally:
+            self.flush_products()
             self.cleanup()
     
+    def _scrape_url(self, url):
+        """Scrape a single URL, recording any failure"""
+        try:
+            self.scrape_product_page(url)
+        except Exception as e:
+            self.logger.error(f"Error scraping {url}: {e}")
+            self.errors.append(f"Page scraping error: {url} - {str(e)}")
+    
+    async def _scrape_urls_async(self, urls):
+        """Fetch URLs concurrently and scrape each page as soon as it arrives"""
+        if self.use_browser == 'playwright':
+            fetcher = playwright_renderer
+        else:
+            fetcher = AsyncFetcher(
+                headers=dict(self.session.headers),
+                proxy=self.session.proxies.get('https') or self.session.proxies.get('http'),
+                logger=self.logger
+            )
+        
+        async for url, result in fetcher.fetch_all(urls):
+            if isinstance(result, Exception):
+                self.logger.error(f"All {fetcher.retries + 1} attempts failed for {url}")
+                self.errors.append(f"Request failed: {url} - {str(result)}")
+                continue
+            
+            # scrape_product_page picks the page up through make_request
+            self._prefetched[url] = result
+            try:
+                self._scrape_url(url)
+            finally:
+                self._prefetched.pop(url, None)
+    
     def log_scraping_results(self):
         """Log scraping session results"""
         status = "success" if not self.errors else "partial" if self.products_found > 0 else "failed"
         error_message = "; ".join(self.errors) if self.errors else None
         
         db_manager.log_scraping_session(
-            retailer_id=self.retailer_db.id,
+            retailer_id=self.retailer_id,
             status=status,
             products_found=self.products_found,
             products_updated=self.products_updated,
@@ -223,11 +291,14 @@ class BaseScraper(ABC):
         
         self.logger.info(f"Scraping completed - Found: {self.products_found}, "
                         f"Updated: {self.products_updated}, Errors: {len(self.errors)}")
+        
+        if webdriver_pool.leases:
+            self.logger.info(f"WebDriver pool: {webdriver_pool.get_stats()}")
+        if playwright_renderer.pages_rendered:
+            self.logger.info(f"Playwright: {playwright_renderer.get_stats()}")
     
     def cleanup(self):
-        """Cleanup resources"""
-        if self.driver:
-            self.driver.quit()
+        """Cleanup resources (pooled WebDrivers stay warm for the next scraper)"""
         if self.session:
             self.session.close()
     
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+combine_prices Benchmark
+Generates synthetic *_prices.csv inputs in a temporary directory and times a
+full merge against an incremental one after a single retailer's file changes,
+with the process's peak resident memory after each
+
+Usage: python benchmark_combine.py [retailers] [rows_per_retailer]
+"""
+
+import csv
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+import combine_prices
+
+def write_retailer(path, retailer, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as fh:
+        writer = csv.writer(fh)
+        writer.writerow(['name', 'caliber', 'price', 'quantity', 'price_per_round', 'retailer', 'in_stock', 'url', 'scraped_at'])
+        for i in range(rows):
+            price = round(random.uniform(10, 500), 2)
+            writer.writerow([f'{retailer} product {i}', '9mm', price, 50, round(price / 50, 4), retailer,
+                             random.choice(['True', 'False']), f'https://{retailer}.example/p/{i}', '2024-01-01 00:00:00'])
+
+def measure(label, full):
+    start = time.perf_counter()
+    rows = combine_prices.combine_files(combine_prices.discover_input_files(), full=full)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux
+    return label, rows, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def main():
+    retailers = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rows_per_retailer = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        for r in range(retailers):
+            write_retailer(f'retailer{r:03d}_prices.csv', f'retailer{r:03d}', rows_per_retailer)
+
+        results = [measure('full merge', full=True)]
+        results.append(measure('no input changed', full=False))
+        write_retailer('retailer000_prices.csv', 'retailer000', rows_per_retailer)
+        results.append(measure('one retailer changed', full=False))
+
+    print(f"📦 {retailers} retailers x {rows_per_retailer:,} rows")
+    print(f"{'Run':<24}{'Rows':>10}{'Seconds':>10}{'Max RSS MB':>12}")
+    for label, rows, elapsed, peak in results:
+        print(f"{label:<24}{rows:>10,}{elapsed:>10.2f}{peak / 1048576:>12.1f}")
+
+if __name__ == "__main__":
+    main()
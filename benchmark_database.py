@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Database Index Benchmark
+Builds a synthetic SQLite database (default: 20,000 products with 1,000,000
+price history rows) and times the hot queries without the composite indexes,
+then again after DatabaseManager.migrate() has added them
+
+Usage: python benchmark_database.py [history_rows] [products]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, text
+from config import DATA_CONFIG
+from database import DatabaseManager, Product, PriceHistory, Retailer
+
+CALIBERS = ['9mm', '.223', '5.56', '.308', '.45 ACP', '.40 S&W', '.380', '22LR', '7.62x39', '300 BLK', '12GA', '6.5 CM']
+
+def build_database(db, products, history_rows):
+    """Fill the database with random products and price history"""
+    random.seed(42)
+    now = datetime.utcnow()
+
+    with db.engine.begin() as conn:
+        conn.execute(insert(Retailer), [
+            {'id': i, 'name': f'Retailer {i}', 'website': f'https://r{i}.example', 'base_url': f'https://r{i}.example'}
+            for i in range(1, 6)
+        ])
+        conn.execute(insert(Product), [
+            {
+                'retailer_id': i % 5 + 1,
+                'name': f'Product {i}',
+                'caliber': random.choice(CALIBERS),
+                'price': round(random.uniform(10, 500), 2),
+                'quantity': 50,
+                'price_per_round': round(random.uniform(0.15, 2.5), 4),
+                'in_stock': random.random() < 0.6,
+            }
+            for i in range(products)
+        ])
+
+        chunk = 50000
+        for start in range(0, history_rows, chunk):
+            conn.execute(insert(PriceHistory), [
+                {
+                    'product_id': random.randint(1, products),
+                    'price': round(random.uniform(10, 500), 2),
+                    'price_per_round': round(random.uniform(0.15, 2.5), 4),
+                    'in_stock': True,
+                    'recorded_at': now - timedelta(minutes=random.randint(0, 525600)),
+                }
+                for _ in range(min(chunk, history_rows - start))
+            ])
+
+def drop_indexes(db):
+    """Drop every declared index, as on a database created before they existed"""
+    for table in (Product.__table__, PriceHistory.__table__):
+        for index in table.indexes:
+            index.drop(bind=db.engine, checkfirst=True)
+
+def time_queries(db, products, repeat=200):
+    """Average milliseconds per call for each hot query"""
+    random.seed(7)
+    results = {}
+    session = db.get_session()
+    try:
+        def timed(label, fn):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn()
+            results[label] = (time.perf_counter() - start) * 1000 / repeat
+
+        def natural_key_lookup():
+            i = random.randrange(products)
+            session.query(Product).filter_by(retailer_id=i % 5 + 1, name=f'Product {i}', caliber='9mm').first()
+
+        def product_history():
+            session.execute(text(
+                "SELECT price, recorded_at FROM price_history WHERE product_id = :id ORDER BY recorded_at DESC LIMIT 50"
+            ), {'id': random.randint(1, products)}).all()
+
+        timed('upsert lookup (retailer, name, caliber)', natural_key_lookup)
+        # Deeper than the best_prices leaderboard: ranks the products table
+        scan_limit = DATA_CONFIG['best_prices_per_caliber'] + 1
+        timed('get_best_prices(caliber) scan', lambda: db.get_best_prices(caliber=random.choice(CALIBERS), limit=scan_limit))
+        timed('get_best_prices() scan', lambda: db.get_best_prices(limit=scan_limit))
+        timed('get_best_prices(caliber) leaderboard', lambda: db.get_best_prices(caliber=random.choice(CALIBERS)))
+        timed('get_best_prices() leaderboard', lambda: db.get_best_prices())
+        timed('price history for one product', product_history)
+    finally:
+        session.close()
+    return results
+
+def main():
+    history_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    products = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        db = DatabaseManager(f'sqlite:///{path}')
+        db.create_tables()
+        drop_indexes(db)
+
+        print(f"🏗️ Building {products:,} products / {history_rows:,} price history rows...")
+        start = time.perf_counter()
+        build_database(db, products, history_rows)
+        print(f"   built in {time.perf_counter() - start:.1f}s")
+        db.rebuild_best_prices()
+
+        before = time_queries(db, products)
+
+        start = time.perf_counter()
+        db.migrate()
+        print(f"🔧 migrate() added indexes in {time.perf_counter() - start:.1f}s")
+
+        after = time_queries(db, products)
+
+        print(f"\n{'Query':<44}{'Before ms':>12}{'After ms':>12}{'Speedup':>10}")
+        for label in before:
+            print(f"{label:<44}{before[label]:>12.3f}{after[label]:>12.3f}{before[label] / after[label]:>9.0f}x")
+    finally:
+        os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+HTML Parser Benchmark
+Times each parse_html backend on saved pages or live URLs
+
+Usage: python benchmark_parsers.py page.html https://www.sgammo.com/catalog/rifle-ammo ...
+"""
+
+import sys
+import time
+import urllib.request
+from http_cache import cached_urlopen
+from html_parsers import PARSERS, parse_html
+
+def load_page(source):
+    """Read a saved page, or fetch a URL through the response cache"""
+    if source.startswith(('http://', 'https://')):
+        req = urllib.request.Request(source, headers={'User-Agent': 'Mozilla/5.0'})
+        return cached_urlopen(req, timeout=15).text
+    with open(source, encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+def time_backend(backend, pages, rounds):
+    """Average milliseconds per page to parse, and to parse plus get_text()"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for html in pages:
+            parse_html(html, backend)
+    parse_ms = (time.perf_counter() - start) * 1000 / (rounds * len(pages))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for html in pages:
+            parse_html(html, backend).get_text()
+    text_ms = (time.perf_counter() - start) * 1000 / (rounds * len(pages))
+
+    return parse_ms, text_ms
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.strip())
+        return
+
+    pages = [load_page(source) for source in sys.argv[1:]]
+    total_kb = sum(len(html) for html in pages) / 1024
+    rounds = 5
+
+    print(f"📄 {len(pages)} pages, {total_kb / len(pages):.0f} KB average, {rounds} rounds")
+    print(f"{'Backend':<14}{'Parse ms/page':>16}{'+ get_text ms/page':>22}")
+
+    for backend in PARSERS:
+        parse_ms, text_ms = time_backend(backend, pages, rounds)
+        print(f"{backend:<14}{parse_ms:>16.1f}{text_ms:>22.1f}")
+
+if __name__ == "__main__":
+    main()
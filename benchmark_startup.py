@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Startup Time Benchmark
+Runs `python -X importtime` on the main entry points in fresh interpreters
+and reports the median total import time, the slowest top-level imports,
+and the wall-clock time of `scraper_runner.py --help`
+
+Usage: python benchmark_startup.py [module ...] [--runs N]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = ['scraper_runner', 'test_scraper', 'base_scraper', 'sgammo_scraper', 'database', 'utils']
+
+def import_times(module):
+    """{imported module: cumulative microseconds} for one fresh `import module`"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    # Children are listed (indented two spaces deeper) before their parent
+    children = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name[1:]
+        if not name.startswith(' '):
+            if name == module:
+                children[module] = int(cumulative)
+                return children
+            children = {}
+        elif not name.startswith('   '):
+            children[name.strip()] = int(cumulative)
+    raise RuntimeError(f"import {module} not found in -X importtime output")
+
+def time_help(runs):
+    """Median wall-clock seconds of `scraper_runner.py --help`"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'scraper_runner.py', '--help'], capture_output=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    args = sys.argv[1:]
+    runs = 5
+    if '--runs' in args:
+        index = args.index('--runs')
+        runs = int(args[index + 1])
+        del args[index:index + 2]
+    modules = args or ENTRY_POINTS
+
+    print(f"⏱️ Import time, median of {runs} fresh interpreters")
+    print(f"{'Entry point':<20}{'Total ms':>10}   Slowest imports")
+    for module in modules:
+        samples = [import_times(module) for _ in range(runs)]
+        total = statistics.median(sample[module] for sample in samples) / 1000
+        children = {
+            name: statistics.median(sample.get(name, 0) for sample in samples) / 1000
+            for name in samples[0] if name != module
+        }
+        slowest = sorted(children.items(), key=lambda item: -item[1])[:3]
+        print(f"{module:<20}{total:>10.0f}   " + ', '.join(f"{name} {ms:.0f}" for name, ms in slowest))
+
+    print(f"\n🚀 scraper_runner.py --help: {time_help(runs) * 1000:.0f} ms wall clock")
+
+if __name__ == "__main__":
+    main()
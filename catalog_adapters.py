@@ -0,0 +1,158 @@
+import csv
+import json
+import logging
+import urllib.parse
+import urllib.request
+from datetime import datetime
+
+import extraction
+from config import CATALOG_CONFIG
+from http_cache import cached_urlopen
+
+CSV_FIELDS = ['name', 'caliber', 'price', 'quantity', 'price_per_round', 'retailer', 'in_stock', 'url', 'scraped_at']
+
+MAGENTO_PRODUCTS_QUERY = '''
+{
+  products(filter: %s, pageSize: %d, currentPage: %d) {
+    page_info { current_page total_pages }
+    items {
+      name
+      sku
+      url_key
+      url_suffix
+      stock_status
+      price_range { minimum_price { final_price { value currency } } }
+    }
+  }
+}
+'''
+
+
+class CatalogAdapter:
+    """Pulls a store's whole catalogue through its paginated JSON API.
+
+    Subclasses implement iter_items(), yielding (name, price, in_stock, url)
+    per purchasable item; products() turns those into the same product dicts
+    as EnhancedBulkAmmoScraper.scrape_category_page, keeping only ammunition
+    whose caliber can be identified.
+    """
+
+    def __init__(self, store, page_size=None, max_pages=None):
+        self.name = store['name']
+        self.base_url = store['base_url'].rstrip('/')
+        self.store = store
+        self.page_size = page_size or CATALOG_CONFIG['page_size']
+        self.max_pages = max_pages or CATALOG_CONFIG['max_pages']
+        self.pages_fetched = 0
+        self.logger = logging.getLogger(f"{__name__}.{self.name}")
+
+    def get_json(self, url):
+        """GET a JSON document through the shared response cache and rate limiter"""
+        req = urllib.request.Request(url)
+        req.add_header('User-Agent', CATALOG_CONFIG['user_agent'])
+        req.add_header('Accept', 'application/json')
+        response = cached_urlopen(req, timeout=30)
+        self.pages_fetched += 1
+        return json.loads(response.text)
+
+    def iter_items(self):
+        raise NotImplementedError
+
+    def products(self):
+        """Product dicts for every ammunition item in the catalogue"""
+        items = [item for item in self.iter_items() if item[1]]
+        details = extraction.extract_many([name for name, _, _, _ in items])
+        scraped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        products = []
+        for (name, price, in_stock, url), detail in zip(items, details):
+            if not detail['caliber']:
+                continue
+            quantity = detail['quantity']
+            products.append({
+                'name': name[:100],
+                'caliber': detail['caliber'],
+                'price': price,
+                'quantity': quantity,
+                'price_per_round': round(price / quantity, 4),
+                'retailer': self.name,
+                'in_stock': in_stock,
+                'url': url,
+                'scraped_at': scraped_at,
+            })
+        return products
+
+
+class ShopifyCatalog(CatalogAdapter):
+    """Shopify storefront: /products.json?limit=250&page=N, one item per variant"""
+
+    def iter_items(self):
+        for page in range(1, self.max_pages + 1):
+            data = self.get_json(f"{self.base_url}/products.json?limit={self.page_size}&page={page}")
+            page_products = data.get('products', [])
+
+            for product in page_products:
+                handle_url = f"{self.base_url}/products/{product['handle']}"
+                for variant in product.get('variants', []):
+                    name = product['title']
+                    if variant.get('title') and variant['title'] != 'Default Title':
+                        name = f"{name} - {variant['title']}"
+                    try:
+                        price = float(variant.get('price') or 0)
+                    except ValueError:
+                        continue
+                    url = f"{handle_url}?variant={variant['id']}" if len(product['variants']) > 1 else handle_url
+                    yield name, price, bool(variant.get('available')), url
+
+            if len(page_products) < self.page_size:
+                break
+
+
+class MagentoCatalog(CatalogAdapter):
+    """Magento 2 storefront: GraphQL `products` query sent as a cacheable GET"""
+
+    def iter_items(self):
+        product_filter = self.store.get('filter', '{price: {from: "0"}}')
+        for page in range(1, self.max_pages + 1):
+            query = MAGENTO_PRODUCTS_QUERY % (product_filter, self.page_size, page)
+            data = self.get_json(f"{self.base_url}/graphql?{urllib.parse.urlencode({'query': query})}")
+            if data.get('errors'):
+                raise ValueError(f"GraphQL error from {self.base_url}: {data['errors'][0].get('message')}")
+
+            result = data['data']['products']
+            for item in result['items']:
+                try:
+                    price = float(item['price_range']['minimum_price']['final_price']['value'] or 0)
+                except (KeyError, TypeError, ValueError):
+                    continue
+                url = f"{self.base_url}/{item['url_key']}{item.get('url_suffix') or '.html'}"
+                yield item['name'], price, item.get('stock_status') == 'IN_STOCK', url
+
+            if page >= (result.get('page_info') or {}).get('total_pages', page):
+                break
+
+
+def scrape_stores(adapter_class, stores, filename):
+    """Run an adapter over every configured store and write the combined CSV"""
+    products = []
+    for store in stores:
+        adapter = adapter_class(store)
+        print(f"🛒 {adapter.name}: fetching catalogue from {adapter.base_url}")
+        try:
+            store_products = adapter.products()
+        except Exception as e:
+            print(f"❌ {adapter.name}: {e}")
+            continue
+        print(f"✅ {adapter.name}: {len(store_products)} ammo products from {adapter.pages_fetched} JSON pages")
+        products.extend(store_products)
+
+    if not products:
+        print("⚠️ No products found")
+        return products
+
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(products)
+    print(f"✅ Saved {len(products)} products to {filename}")
+    return products
@@ -9,6 +9,8 @@ import urllib.request
 import re
 import time
 from datetime import datetime
+from http_cache import cached_urlopen
+import extraction
 
 def make_request(url):
     """Make HTTP request"""
@@ -20,8 +22,7 @@ def make_request(url):
             'Connection': 'keep-alive',
         }
         req = urllib.request.Request(url, headers=headers)
-        response = urllib.request.urlopen(req, timeout=20)
-        return response.read().decode('utf-8', errors='ignore')
+        return cached_urlopen(req, timeout=20).text
     except Exception as e:
         print(f"❌ Error accessing {url}: {e}")
         return None
@@ -145,57 +146,11 @@ def extract_product_from_link_context(html, link, link_text):
 
 def extract_caliber(text):
     """Extract caliber from text"""
-    text = text.upper()
-    calibers = {
-        '9MM': ['9MM', '9 MM', '9X19', '9 LUGER'],
-        '.223': ['.223', '223 REM', '223 REMINGTON'],
-        '5.56': ['5.56', '5.56X45', '5.56 NATO'],
-        '.308': ['.308', '308 WIN', '308 WINCHESTER'],
-        '.45 ACP': ['.45 ACP', '45 ACP', '.45 AUTO'],
-        '.40 S&W': ['.40 S&W', '40 S&W', '.40 SW'],
-        '.380': ['.380', '380 ACP', '380 AUTO'],
-        '22LR': ['22LR', '.22 LR', '22 LONG RIFLE'],
-        '7.62x39': ['7.62X39', '7.62 X 39'],
-        '300 BLK': ['300 BLK', '300 BLACKOUT', '.300 AAC'],
-        '6.5 CM': ['6.5 CM', '6.5 CREEDMOOR'],
-        '.30-06': ['.30-06', '30-06', '30.06'],
-        '12 GAUGE': ['12 GAUGE', '12GA', '12 GA'],
-        '20 GAUGE': ['20 GAUGE', '20GA', '20 GA'],
-    }
-    
-    for standard, variations in calibers.items():
-        for variation in variations:
-            if variation in text:
-                return standard
-    return "Unknown"
+    return extraction.extract_caliber(text, default="Unknown")
 
 def extract_quantity(text):
     """Extract quantity from text"""
-    patterns = [
-        r'(\d+)\s*ROUNDS?',
-        r'(\d+)\s*RDS?',
-        r'(\d+)\s*CT',
-        r'(\d+)\s*COUNT',
-        r'(\d{3,4})\s*PER',
-    ]
-    
-    text_upper = text.upper()
-    for pattern in patterns:
-        match = re.search(pattern, text_upper)
-        if match:
-            try:
-                qty = int(match.group(1))
-                if 10 <= qty <= 5000:
-                    return qty
-            except:
-                continue
-    
-    # Default estimates
-    if 'CASE' in text_upper:
-        return 1000
-    elif 'BOX' in text_upper:
-        return 50
-    return 50
+    return extraction.extract_quantity(text, min_qty=10, max_qty=5000, table=extraction.bulk_quantity_table)
 
 def scrape_category_pages():
     """Scrape multiple category pages"""
@@ -228,8 +183,6 @@ def scrape_category_pages():
         else:
             print("❌ Failed to load")
         
-        time.sleep(2)  # Be respectful
-        
         if len(all_products) >= 15:  # Stop when we have enough
             break
     
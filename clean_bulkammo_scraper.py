@@ -5,9 +5,10 @@ Clean BulkAmmo Scraper - Original Working Method + Filter Reviews URLs
 
 import urllib.request
 import re
-import time
 import random
 from datetime import datetime
+from http_cache import cached_urlopen
+import extraction
 
 def make_request(url):
     """Make HTTP request"""
@@ -24,13 +25,9 @@ def make_request(url):
         req.add_header('Connection', 'keep-alive')
         req.add_header('Cache-Control', 'no-cache')
         
-        with urllib.request.urlopen(req, timeout=15) as response:
-            if response.status == 200:
-                content = response.read()
-                if response.info().get('Content-Encoding') == 'gzip':
-                    import gzip
-                    content = gzip.decompress(content)
-                return content.decode('utf-8', errors='ignore')
+        response = cached_urlopen(req, timeout=15)
+        if response.status_code == 200:
+            return response.text
         return None
         
     except Exception as e:
@@ -39,84 +36,15 @@ def make_request(url):
 
 def extract_price(text):
     """Extract price from text"""
-    if not text:
-        return None
-    
-    patterns = [
-        r'\$\s*([0-9,]+\.?[0-9]*)',
-        r'Price[:\s]*\$\s*([0-9,]+\.?[0-9]*)',
-        r'([0-9,]+\.?[0-9]*)\s*USD',
-    ]
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            try:
-                price = float(match.replace(',', ''))
-                if 0.1 <= price <= 10000:
-                    return price
-            except ValueError:
-                continue
-    return None
+    return extraction.extract_price(text)
 
 def extract_caliber(text):
     """Extract caliber from product text"""
-    if not text:
-        return None
-    
-    text = text.upper()
-    
-    caliber_patterns = {
-        '9MM': [r'9\s*MM', r'9X19', r'9\s*LUGER'],
-        '.223': [r'\.223', r'223\s*REM'],
-        '5.56': [r'5\.56', r'5\.56X45', r'5\.56\s*NATO'],
-        '.308': [r'\.308', r'308\s*WIN', r'7\.62X51'],
-        '.45 ACP': [r'\.45\s*ACP', r'45\s*ACP'],
-        '.40 S&W': [r'\.40\s*S&W', r'40\s*S&W'],
-        '.380': [r'\.380', r'380\s*ACP'],
-        '22LR': [r'22\s*LR', r'\.22\s*LR'],
-        '7.62x39': [r'7\.62X39'],
-        '300 BLK': [r'300\s*BLK', r'300\s*BLACKOUT'],
-    }
-    
-    for standard, patterns in caliber_patterns.items():
-        for pattern in patterns:
-            if re.search(pattern, text):
-                return standard
-    return None
+    return extraction.extract_caliber(text)
 
 def extract_quantity(text):
     """Extract round count from text"""
-    if not text:
-        return 50
-    
-    text_upper = text.upper()
-    
-    patterns = [
-        r'(\d+)\s*ROUNDS?',
-        r'(\d+)\s*CT\b',
-        r'(\d+)\s*COUNT',
-        r'BOX\s*OF\s*(\d+)',
-        r'(\d+)/BOX',
-        r'(\d+)\s*RD',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text_upper)
-        if match:
-            try:
-                qty = int(match.group(1))
-                if 1 <= qty <= 10000:
-                    return qty
-            except ValueError:
-                continue
-    
-    if 'CASE' in text_upper:
-        return 1000
-    elif 'BOX' in text_upper:
-        return 50
-    
-    return 50
+    return extraction.extract_quantity(text)
 
 def extract_product_url(context):
     """Extract product URL from context, avoiding #reviews links"""
@@ -210,8 +138,6 @@ def scrape_bulkammo():
                             
                             if len(products) >= 8:
                                 break
-        
-        time.sleep(3)
     
     return products
 
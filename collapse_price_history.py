@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Collapse Price History
+One-off backfill for databases written before price history became
+change-only: deletes rows that repeat the previous row for the same product,
+then reclaims the freed space
+
+Usage: python collapse_price_history.py
+"""
+
+import os
+import time
+from sqlalchemy import func
+from database import db_manager, PriceHistory
+
+def count_rows():
+    session = db_manager.get_session()
+    try:
+        return session.query(func.count(PriceHistory.id)).scalar()
+    finally:
+        session.close()
+
+def database_size():
+    """Size in bytes of a SQLite database file, None for server databases"""
+    path = db_manager.engine.url.database
+    if db_manager.engine.dialect.name == 'sqlite' and path and os.path.exists(path):
+        return os.path.getsize(path)
+    return None
+
+def main():
+    print("🗜️ Collapsing repeated price history rows")
+    rows_before = count_rows()
+    size_before = database_size()
+
+    start = time.perf_counter()
+    db_manager.collapse_price_history()
+
+    # VACUUM cannot run inside a transaction
+    with db_manager.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.exec_driver_sql('VACUUM')
+
+    rows_after = count_rows()
+    print(f"✅ Done in {time.perf_counter() - start:.1f}s")
+    print(f"📊 Price history rows: {rows_before:,} → {rows_after:,}")
+
+    size_after = database_size()
+    if size_before and size_after:
+        print(f"💾 Database size: {size_before / 1048576:.1f} MB → {size_after / 1048576:.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -4,21 +4,42 @@ Combine ammunition pricing CSVs into a single master feed.
 
 Scans the current directory for any files that match the pattern `*_prices*.csv` as well as
 `direct_retailer_prices.csv`, normalises their columns, removes obvious duplicates,
-and writes the consolidated data to `all_prices.csv` (overwriting if it exists).
+and writes the consolidated data to `all_prices.csv`.
+
+The merge is incremental: each input is streamed row by row into a normalised
+partition under `.combine_cache/`, with duplicates found through a persistent
+SQLite key index rather than an in-memory set. Inputs whose size/mtime (or,
+failing that, content hash) are unchanged since the last run keep their
+partition, and `all_prices.csv` is rebuilt by streaming the partitions together.
+
+Whenever `all_prices.csv` is rewritten, a typed, zstd-compressed Parquet copy
+partitioned by caliber and scrape date is written to `prices_snapshot/` for
+analytics (see price_snapshot.py; skipped when pyarrow is not installed), and
+the admin dashboard's per-caliber/per-retailer JSON shards are republished
+under `price_feed/` (see price_feed.py).
 
 The output schema matches the admin dashboard:
     name,caliber,price,quantity,price_per_round,retailer,source,in_stock,url,scraped_at
 
 Run simply with:
-    python combine_prices.py
+    python combine_prices.py          # incremental
+    python combine_prices.py --full   # discard the cache and rebuild everything
 """
 import csv
 import glob
+import hashlib
+import json
 import os
+import shutil
+import sqlite3
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
 
+import price_feed
+import price_snapshot
+
 # Canonical column order expected by the dashboard
 COLUMNS = [
     "name",
@@ -40,7 +61,8 @@ def discover_input_files() -> List[Path]:
         for path in Path(".").glob(pat):
             if path.is_file() and path.name != "all_prices.csv":
                 files.append(path)
-    return sorted(files)
+    # direct_retailer_prices.csv also matches the glob; list each file once
+    return sorted(set(files))
 
 def normalise_row(row: Dict[str, str]) -> Dict[str, str]:
     """Ensure every column is present and trimmed; provide sane defaults."""
@@ -65,33 +87,221 @@ def unique_key(row: Dict[str, str]) -> Tuple[str, str, str]:
     """Return a tuple used to de-duplicate rows (url, retailer, price)."""
     return (row.get("url", ""), row.get("retailer", ""), row.get("price", ""))
 
-def combine_files(files: List[Path]) -> List[Dict[str, str]]:
-    all_rows: List[Dict[str, str]] = []
-    seen: Set[Tuple[str, str, str]] = set()
+OUTPUT_PATH = Path("all_prices.csv")
+CACHE_DIR = Path(".combine_cache")
+PARTITION_DIR = CACHE_DIR / "partitions"
+INDEX_PATH = CACHE_DIR / "keys.db"
+MANIFEST_PATH = CACHE_DIR / "manifest.json"
+
+# Positions of the unique_key columns in a partition row
+KEY_COLUMNS = [COLUMNS.index("url"), COLUMNS.index("retailer"), COLUMNS.index("price")]
+
+def encode_key(key: Tuple[str, str, str]) -> int:
+    """64-bit hash of a unique_key; keeps the persistent index small and fast to probe."""
+    digest = hashlib.blake2b("\x1f".join(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest() -> Dict:
+    """{"inputs": {source: {mtime, size, sha256, rows}}, "output": [sources in all_prices.csv]}"""
+    try:
+        with MANIFEST_PATH.open(encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {"inputs": {}, "output": None}
+
+def save_manifest(manifest: Dict):
+    tmp_path = MANIFEST_PATH.with_suffix(".tmp")
+    with tmp_path.open("w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+def open_index() -> sqlite3.Connection:
+    """Persistent (key, source) index: which inputs contain each unique_key."""
+    PARTITION_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(INDEX_PATH)
+    # A cache that --full rebuilds: no need to fsync every commit
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS row_keys (key INTEGER NOT NULL, source TEXT NOT NULL, "
+        "PRIMARY KEY (key, source)) WITHOUT ROWID"
+    )
+    return conn
+
+def partition_path(source: str) -> Path:
+    return PARTITION_DIR / source
+
+def build_partition(conn: sqlite3.Connection, path: Path) -> int:
+    """Stream one input into its normalised partition (no header), dropping repeats within the file."""
+    source = path.name
+    conn.execute("DELETE FROM row_keys WHERE source = ?", (source,))
+    rows = 0
+    tmp_path = partition_path(source).with_suffix(".tmp")
+    with path.open(newline="", encoding="utf-8") as fh, tmp_path.open("w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        for raw_row in csv.DictReader(fh):
+            if not raw_row:
+                continue
+            row = normalise_row(raw_row)
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO row_keys (key, source) VALUES (?, ?)",
+                (encode_key(unique_key(row)), source)
+            ).rowcount
+            if inserted:
+                writer.writerow([row[col] for col in COLUMNS])
+                rows += 1
+    os.replace(tmp_path, partition_path(source))
+    return rows
+
+def update_partitions(conn: sqlite3.Connection, files: List[Path], inputs: Dict[str, Dict]) -> List[str]:
+    """Rebuild the partitions of new or changed inputs and drop those of vanished ones; returns the rebuilt sources."""
+    rebuilt: List[str] = []
+    current = {path.name for path in files}
+
+    for source in list(inputs):
+        if source not in current:
+            conn.execute("DELETE FROM row_keys WHERE source = ?", (source,))
+            partition_path(source).unlink(missing_ok=True)
+            del inputs[source]
+            rebuilt.append(source)
+    # Committed on their own, so a failed build's rollback cannot bring the keys back
+    conn.commit()
+
     for path in files:
+        stat = path.stat()
+        entry = inputs.get(path.name)
+        if entry and partition_path(path.name).exists():
+            if entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                continue
+            digest = file_digest(path)
+            if entry["sha256"] == digest:
+                # Touched but identical: remember the new mtime, keep the partition
+                entry.update(mtime=stat.st_mtime, size=stat.st_size)
+                continue
+        else:
+            digest = file_digest(path)
+
         try:
-            with path.open(newline="", encoding="utf-8") as fh:
-                reader = csv.DictReader(fh)
-                for raw_row in reader:
-                    if not raw_row:
-                        continue
-                    row = normalise_row(raw_row)
-                    key = unique_key(row)
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    all_rows.append(row)
+            rows = build_partition(conn, path)
         except Exception as e:
             print(f"[!] Skipping {path.name}: {e}")
-    return all_rows
+            conn.rollback()
+            continue
+        conn.commit()
+        inputs[path.name] = {"mtime": stat.st_mtime, "size": stat.st_size, "sha256": digest, "rows": rows}
+        rebuilt.append(path.name)
+
+    conn.commit()
+    return rebuilt
+
+def shadowed_keys(conn: sqlite3.Connection, sources: List[str]) -> Dict[str, Set[int]]:
+    """Keys each source must drop because an earlier input (in merge order) already has them."""
+    position = {source: i for i, source in enumerate(sources)}
+    owners: Dict[int, List[str]] = {}
+    # One pass over the (key, source) primary key; only keys in several inputs come back
+    for key, source in conn.execute("""
+        SELECT key, source FROM row_keys
+        WHERE key IN (SELECT key FROM row_keys GROUP BY key HAVING COUNT(*) > 1)
+    """):
+        # Keys of a source not being merged (e.g. left behind by an interrupted run) shadow nothing
+        if source in position:
+            owners.setdefault(key, []).append(source)
+
+    shadowed: Dict[str, Set[int]] = {}
+    for key, key_sources in owners.items():
+        key_sources.sort(key=position.get)
+        for source in key_sources[1:]:
+            shadowed.setdefault(source, set()).add(key)
+    return shadowed
+
+def write_output(out, sources: List[str], shadowed: Dict[str, Set[int]]) -> int:
+    """Append every partition in merge order, minus cross-file duplicates; returns rows written.
+
+    Partitions without duplicates are copied as raw bytes.
+    """
+    rows = 0
+    writer = csv.writer(out)
+    for source in sources:
+        drop = shadowed.get(source)
+        with partition_path(source).open(newline="", encoding="utf-8") as fh:
+            if not drop:
+                shutil.copyfileobj(fh, out)
+                continue
+            for row in csv.reader(fh):
+                if encode_key(tuple(row[i] for i in KEY_COLUMNS)) in drop:
+                    continue
+                writer.writerow(row)
+                rows += 1
+    return rows
+
+def write_snapshot():
+    """Rewrite the Parquet snapshot by streaming all_prices.csv."""
+    with OUTPUT_PATH.open(newline="", encoding="utf-8") as fh:
+        reader = csv.reader(fh)
+        columns = next(reader)
+        if price_snapshot.write_snapshot(reader, columns):
+            print(f"[✓] Wrote Parquet snapshot → {price_snapshot.SNAPSHOT_DIR}/")
+        else:
+            print("[!] pyarrow not installed; skipping the Parquet snapshot")
 
-def save_output(rows: List[Dict[str, str]]):
-    out_path = Path("all_prices.csv")
-    with out_path.open("w", newline="", encoding="utf-8") as fh:
-        writer = csv.DictWriter(fh, fieldnames=COLUMNS)
-        writer.writeheader()
-        writer.writerows(rows)
-    print(f"[✓] Wrote {len(rows)} rows → {out_path}")
+def write_feed():
+    """Republish the dashboard's JSON shards by streaming all_prices.csv."""
+    with OUTPUT_PATH.open(newline="", encoding="utf-8") as fh:
+        reader = csv.reader(fh)
+        columns = next(reader)
+        manifest = price_feed.write_feed(reader, columns)
+    shards = len(price_feed.shard_files(manifest))
+    print(f"[✓] Published {shards} dashboard shards → {price_feed.FEED_DIR}/")
+
+def combine_files(files: List[Path], full: bool = False) -> int:
+    """Merge the inputs into all_prices.csv incrementally; returns the number of rows written (or kept)."""
+    if full and CACHE_DIR.exists():
+        shutil.rmtree(CACHE_DIR)
+
+    conn = open_index()
+    try:
+        manifest = load_manifest()
+        inputs = manifest["inputs"]
+        rebuilt = update_partitions(conn, files, inputs)
+        sources = [path.name for path in files if path.name in inputs]
+
+        if not rebuilt and OUTPUT_PATH.exists() and manifest["output"] == sources:
+            print("[=] No input changed since the last run; all_prices.csv is up to date")
+            if not price_snapshot.SNAPSHOT_DIR.exists():
+                write_snapshot()
+            if not (price_feed.FEED_DIR / price_feed.MANIFEST_NAME).exists():
+                write_feed()
+            return manifest["rows"]
+
+        for source in rebuilt:
+            print(f"   ↻ {source}")
+
+        shadowed = shadowed_keys(conn, sources)
+        rows = sum(
+            inputs[source]["rows"] for source in sources if source not in shadowed
+        )
+        tmp_path = OUTPUT_PATH.with_suffix(".tmp")
+        with tmp_path.open("w", newline="", encoding="utf-8") as fh:
+            csv.writer(fh).writerow(COLUMNS)
+            rows += write_output(fh, sources, shadowed)
+        os.replace(tmp_path, OUTPUT_PATH)
+
+        manifest.update(output=sources, rows=rows)
+        save_manifest(manifest)
+        print(f"[✓] Wrote {rows} rows → {OUTPUT_PATH} ({len(rebuilt)} of {len(sources)} inputs re-read)")
+        write_snapshot()
+        write_feed()
+        return rows
+    finally:
+        conn.close()
 
 def main():
     files = discover_input_files()
@@ -101,11 +311,9 @@ def main():
     print("[+] Combining the following files:")
     for f in files:
         print("   •", f.name)
-    rows = combine_files(files)
+    rows = combine_files(files, full="--full" in sys.argv)
     if not rows:
         print("[!] No rows combined – empty inputs?")
-        return
-    save_output(rows)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,9 +1,22 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import create_engine, inspect, insert, delete, func, text, tuple_, Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
-from datetime import datetime
+from datetime import datetime, timedelta
+import importlib
 import logging
-from config import DATABASE_URL
+import threading
+from config import DATABASE_URL, DATA_CONFIG, HISTORY_CONFIG
+from lazy import LazySingleton
+
+# Dialects with INSERT ... ON CONFLICT ... RETURNING support; each provides
+# sqlalchemy.dialects.<name>.insert, imported when the engine is first used
+UPSERT_DIALECTS = {'postgresql', 'sqlite'}
+
+# Rollup periods and how to truncate a timestamp to the start of its bucket
+ROLLUP_PERIODS = {
+    'hour': lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+    'day': lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0),
+}
 
 Base = declarative_base()
 
@@ -22,6 +35,13 @@ class Retailer(Base):
 
 class Product(Base):
     __tablename__ = 'products'
+    __table_args__ = (
+        # Natural key used by upsert_products' ON CONFLICT clause
+        Index('uq_products_natural_key', 'retailer_id', 'name', 'caliber', unique=True),
+        # get_best_prices: in-stock filter (optionally by caliber) ordered by price_per_round
+        Index('ix_products_best_price', 'in_stock', 'price_per_round'),
+        Index('ix_products_caliber_best_price', 'caliber', 'in_stock', 'price_per_round'),
+    )
     
     id = Column(Integer, primary_key=True)
     retailer_id = Column(Integer, ForeignKey('retailers.id'), nullable=False)
@@ -52,6 +72,7 @@ class Product(Base):
     first_seen = Column(DateTime, default=datetime.utcnow)
     last_updated = Column(DateTime, default=datetime.utcnow)
     last_scraped = Column(DateTime, default=datetime.utcnow)
+    verified_at = Column(DateTime)  # Last stock/price re-check of the product page (StockVerifier)
     
     # Relationships
     retailer = relationship("Retailer", back_populates="products")
@@ -59,6 +80,10 @@ class Product(Base):
 
 class PriceHistory(Base):
     __tablename__ = 'price_history'
+    __table_args__ = (
+        # A product's history in time order
+        Index('ix_price_history_product_recorded', 'product_id', 'recorded_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
@@ -71,6 +96,49 @@ class PriceHistory(Base):
     # Relationship
     product = relationship("Product", back_populates="price_history")
 
+class PriceRollup(Base):
+    """Hourly/daily min, max and mean price per round of one product"""
+    __tablename__ = 'price_rollups'
+    __table_args__ = (
+        Index('uq_price_rollups_bucket', 'product_id', 'period', 'bucket_start', unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
+    period = Column(String(10), nullable=False)  # hour, day
+    bucket_start = Column(DateTime, nullable=False)
+    
+    min_price_per_round = Column(Float, nullable=False)
+    max_price_per_round = Column(Float, nullable=False)
+    sum_price_per_round = Column(Float, nullable=False)  # mean = sum / samples
+    samples = Column(Integer, nullable=False)
+
+class CaliberPriceRollup(Base):
+    """Hourly/daily min, max and mean price per round across a caliber"""
+    __tablename__ = 'caliber_price_rollups'
+    __table_args__ = (
+        Index('uq_caliber_price_rollups_bucket', 'caliber', 'period', 'bucket_start', unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    caliber = Column(String(50), nullable=False)
+    period = Column(String(10), nullable=False)  # hour, day
+    bucket_start = Column(DateTime, nullable=False)
+    
+    min_price_per_round = Column(Float, nullable=False)
+    max_price_per_round = Column(Float, nullable=False)
+    sum_price_per_round = Column(Float, nullable=False)  # mean = sum / samples
+    samples = Column(Integer, nullable=False)
+
+class BestPrice(Base):
+    """Leaderboard of the cheapest in-stock offers per caliber, maintained by the upsert path"""
+    __tablename__ = 'best_prices'
+    
+    caliber = Column(String(50), primary_key=True)
+    rank = Column(Integer, primary_key=True)  # 1 = cheapest
+    product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
+    price_per_round = Column(Float, nullable=False)
+
 class ScrapingLog(Base):
     __tablename__ = 'scraping_logs'
     
@@ -93,16 +161,109 @@ class DatabaseManager:
         self.engine = create_engine(database_url)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         self.logger = logging.getLogger(__name__)
+        
+        # Retailer name -> id registry, loaded with one query on first lookup
+        self._retailer_ids = None
+        self._retailer_lock = threading.Lock()
+        
+        # create_tables()/migrate() run once per manager before the first write
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
     
     def create_tables(self):
-        """Create all database tables"""
+        """Create all database tables and bring existing ones up to date"""
         try:
             Base.metadata.create_all(bind=self.engine)
+            self.migrate()
+            self._schema_ready = True
             self.logger.info("Database tables created successfully")
         except Exception as e:
             self.logger.error(f"Error creating database tables: {e}")
             raise
     
+    def ensure_schema(self):
+        """Create missing tables and run migrate() once for this manager.
+        
+        upsert_products' ON CONFLICT clause needs the uq_products_natural_key
+        index, which older databases only get from migrate(). Writers call
+        this first so an un-migrated database is brought up to date, or the
+        error surfaces, before any product is lost.
+        """
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if not self._schema_ready:
+                self.create_tables()
+    
+    def migrate(self):
+        """Add columns and indexes missing from tables created by older versions.
+        
+        create_all only creates columns and indexes together with their
+        table, so nullable columns added to the models since are added with
+        ALTER TABLE and every declared index is created here if absent.
+        Duplicate products are merged first so the unique natural-key index
+        can be built.
+        """
+        self._add_missing_columns()
+        self._merge_duplicate_products()
+        
+        for table in (Product.__table__, PriceHistory.__table__):
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
+        
+        # Databases created before the leaderboard existed
+        session = self.get_session()
+        try:
+            needs_build = session.query(BestPrice.rank).first() is None and session.query(Product.id).first() is not None
+        finally:
+            session.close()
+        if needs_build:
+            self.rebuild_best_prices()
+    
+    def _add_missing_columns(self):
+        """ALTER TABLE ... ADD COLUMN for model columns an existing table lacks"""
+        inspector = inspect(self.engine)
+        with self.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                if not inspector.has_table(table.name):
+                    continue
+                existing = {column['name'] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name not in existing:
+                        column_type = column.type.compile(dialect=self.engine.dialect)
+                        conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+                        self.logger.info(f"Added column {table.name}.{column.name}")
+    
+    def _merge_duplicate_products(self):
+        """Keep the newest row per (retailer_id, name, caliber), moving other rows' price history onto it"""
+        session = self.get_session()
+        try:
+            duplicates = session.query(
+                Product.retailer_id, Product.name, Product.caliber, func.max(Product.id)
+            ).group_by(Product.retailer_id, Product.name, Product.caliber).having(func.count() > 1).all()
+            
+            for retailer_id, name, caliber, keep_id in duplicates:
+                stale_ids = [product_id for (product_id,) in session.query(Product.id).filter(
+                    Product.retailer_id == retailer_id, Product.name == name,
+                    Product.caliber == caliber, Product.id != keep_id
+                )]
+                session.query(PriceHistory).filter(PriceHistory.product_id.in_(stale_ids)).update(
+                    {PriceHistory.product_id: keep_id}, synchronize_session=False
+                )
+                session.query(Product).filter(Product.id.in_(stale_ids)).delete(synchronize_session=False)
+            
+            if duplicates:
+                self._refresh_best_prices(session, {caliber for _, _, caliber, _ in duplicates})
+            
+            session.commit()
+            if duplicates:
+                self.logger.info(f"Merged duplicate rows for {len(duplicates)} products")
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
     def get_session(self):
         """Get database session"""
         return self.SessionLocal()
@@ -123,6 +284,7 @@ class DatabaseManager:
             )
             session.add(retailer)
             session.commit()
+            session.refresh(retailer)  # load the id before the session closes
             self.logger.info(f"Added retailer: {name}")
             return retailer
         except Exception as e:
@@ -132,48 +294,71 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def load_retailers(self):
+        """(Re)load the retailer name -> id registry with a single query"""
+        session = self.get_session()
+        try:
+            retailer_ids = dict(session.query(Retailer.name, Retailer.id))
+        finally:
+            session.close()
+        with self._retailer_lock:
+            self._retailer_ids = retailer_ids
+        return retailer_ids
+    
+    def get_retailer_id(self, name, website=None, base_url=None):
+        """Id of the named retailer from the process-wide registry.
+        
+        The registry is loaded once; later lookups, including from
+        concurrent scrapers, are dictionary reads. A retailer missing from
+        the database is created (website/base_url required) and cached.
+        """
+        retailer_ids = self._retailer_ids
+        if retailer_ids is None:
+            retailer_ids = self.load_retailers()
+        if name in retailer_ids:
+            return retailer_ids[name]
+        
+        with self._retailer_lock:
+            if name not in self._retailer_ids:
+                if not website:
+                    raise KeyError(f"Unknown retailer: {name}")
+                retailer = self.add_retailer(name, website, base_url or website)
+                self._retailer_ids = {**self._retailer_ids, name: retailer.id}
+            return self._retailer_ids[name]
+    
     def upsert_product(self, product_data):
         """Insert or update product data"""
+        self.ensure_schema()
         session = self.get_session()
         try:
+            now = datetime.utcnow()
+            
             # Try to find existing product
-            existing = session.query(Product).filter_by(
+            product = session.query(Product).filter_by(
                 retailer_id=product_data['retailer_id'],
                 name=product_data['name'],
                 caliber=product_data['caliber']
             ).first()
             
-            if existing:
+            previous = {}
+            if product:
+                previous[product.id] = (product.price, product.price_per_round, product.in_stock)
+                
                 # Update existing product
                 for key, value in product_data.items():
-                    if hasattr(existing, key):
-                        setattr(existing, key, value)
-                existing.last_updated = datetime.utcnow()
-                existing.last_scraped = datetime.utcnow()
-                
-                # Add price history entry
-                price_history = PriceHistory(
-                    product_id=existing.id,
-                    price=product_data['price'],
-                    price_per_round=product_data['price_per_round'],
-                    in_stock=product_data['in_stock']
-                )
-                session.add(price_history)
-                
+                    if hasattr(product, key):
+                        setattr(product, key, value)
+                product.last_updated = now
+                product.last_scraped = now
             else:
                 # Create new product
                 product = Product(**product_data)
                 session.add(product)
-                session.flush()  # Get the ID
-                
-                # Add initial price history
-                price_history = PriceHistory(
-                    product_id=product.id,
-                    price=product_data['price'],
-                    price_per_round=product_data['price_per_round'],
-                    in_stock=product_data['in_stock']
-                )
-                session.add(price_history)
+            
+            session.flush()  # Get the ID and column defaults
+            self._record_observations(session, now, [
+                (product.id, product.caliber, product.price, product.price_per_round, bool(product.in_stock))
+            ], previous)
             
             session.commit()
             return True
@@ -185,6 +370,448 @@ class DatabaseManager:
         finally:
             session.close()
     
+    @staticmethod
+    def _price_state(product_data, previous=None):
+        """(price, price_per_round, in_stock) a write leaves the product in"""
+        in_stock = product_data.get('in_stock', previous[2] if previous else False)
+        return product_data['price'], product_data['price_per_round'], in_stock
+    
+    def upsert_products(self, batch):
+        """Insert or update many products and record price changes in one transaction.
+        
+        Uses INSERT ... ON CONFLICT (retailer_id, name, caliber) DO UPDATE
+        with RETURNING to get product ids, then inserts the price history rows
+        in one executemany. History is only written for new products and for
+        products whose price, price per round or stock changed; last_scraped
+        records when an unchanged price was last confirmed. Returns the number
+        of products saved. Databases without ON CONFLICT support fall back to
+        upsert_product per item.
+        """
+        if not batch:
+            return 0
+        self.ensure_schema()
+        
+        if self.engine.dialect.name not in UPSERT_DIALECTS:
+            return sum(1 for product_data in batch if self.upsert_product(product_data))
+        dialect_insert = importlib.import_module(f'sqlalchemy.dialects.{self.engine.dialect.name}').insert
+        
+        now = datetime.utcnow()
+        columns = set(Product.__table__.columns.keys()) - {'id'}
+        
+        # The last occurrence of a natural key wins; a statement may not update a row twice
+        rows = {}
+        for product_data in batch:
+            row = {key: value for key, value in product_data.items() if key in columns}
+            row.update(first_seen=now, last_updated=now, last_scraped=now)
+            rows[(row['retailer_id'], row['name'], row['caliber'])] = row
+        
+        # Multi-row VALUES needs the same columns in every row
+        groups = {}
+        for row in rows.values():
+            groups.setdefault(frozenset(row), []).append(row)
+        
+        session = self.get_session()
+        try:
+            # Current price state, to record history only on change
+            previous = {
+                (retailer_id, name, caliber): (price, price_per_round, in_stock)
+                for retailer_id, name, caliber, price, price_per_round, in_stock in session.query(
+                    Product.retailer_id, Product.name, Product.caliber,
+                    Product.price, Product.price_per_round, Product.in_stock
+                ).filter(tuple_(Product.retailer_id, Product.name, Product.caliber).in_(list(rows)))
+            }
+            
+            product_ids = {}
+            for keys, group in groups.items():
+                stmt = dialect_insert(Product).values(group)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['retailer_id', 'name', 'caliber'],
+                    set_={key: stmt.excluded[key] for key in keys if key != 'first_seen'}
+                ).returning(Product.id, Product.retailer_id, Product.name, Product.caliber)
+                
+                for product_id, retailer_id, name, caliber in session.execute(stmt):
+                    product_ids[(retailer_id, name, caliber)] = product_id
+            
+            # Every scrape is a price observation, changed or not
+            self._record_observations(session, now, [
+                (product_ids[key], row['caliber'], *self._price_state(row, previous.get(key)))
+                for key, row in rows.items()
+            ], {product_ids[key]: state for key, state in previous.items()})
+            
+            session.commit()
+            return len(rows)
+            
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"Error upserting {len(rows)} products: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    def _record_observations(self, session, observed_at, observations, previous):
+        """Record the price observations of one write, after the products themselves are written.
+        
+        observations are (product_id, caliber, price, price_per_round, in_stock)
+        as each product now stands; previous maps product_id to its (price,
+        price_per_round, in_stock) before the write and has no entry for new
+        products. Adds a history row for every new or changed product, folds
+        every observation into the rollups and keeps the leaderboard in step.
+        Shared by upsert_product, upsert_products and record_verification.
+        """
+        history = [
+            {'product_id': product_id, 'price': price, 'price_per_round': price_per_round,
+             'in_stock': in_stock, 'recorded_at': observed_at}
+            for product_id, _, price, price_per_round, in_stock in observations
+            if previous.get(product_id) != (price, price_per_round, in_stock)
+        ]
+        if history:
+            session.execute(insert(PriceHistory), history)
+        
+        changes = [
+            (product_id, caliber, price_per_round, in_stock)
+            for product_id, caliber, _, price_per_round, in_stock in observations
+        ]
+        self._merge_rollups(session, observed_at, changes)
+        self._update_best_prices(session, changes)
+    
+    def _merge_rollups(self, session, observed_at, observations):
+        """Fold (product_id, caliber, price_per_round, in_stock) observations into the hourly and daily rollups.
+        
+        Product rollups take every observation; caliber rollups only in-stock
+        offers, so their min/avg describe what could actually be bought.
+        """
+        if self.engine.dialect.name not in UPSERT_DIALECTS:
+            # Rollups are merged with ON CONFLICT; other databases only keep raw history
+            return
+        dialect_insert = importlib.import_module(f'sqlalchemy.dialects.{self.engine.dialect.name}').insert
+        
+        if self.engine.dialect.name == 'postgresql':
+            least, greatest = func.least, func.greatest
+        else:
+            # SQLite's multi-argument min()/max() are scalar
+            least, greatest = func.min, func.max
+        
+        product_rows, caliber_rows = [], {}
+        for period, truncate in ROLLUP_PERIODS.items():
+            bucket_start = truncate(observed_at)
+            for product_id, caliber, price_per_round, in_stock in observations:
+                product_rows.append({
+                    'product_id': product_id, 'period': period, 'bucket_start': bucket_start,
+                    'min_price_per_round': price_per_round, 'max_price_per_round': price_per_round,
+                    'sum_price_per_round': price_per_round, 'samples': 1,
+                })
+                if not in_stock:
+                    continue
+                row = caliber_rows.setdefault((caliber, period), {
+                    'caliber': caliber, 'period': period, 'bucket_start': bucket_start,
+                    'min_price_per_round': price_per_round, 'max_price_per_round': price_per_round,
+                    'sum_price_per_round': 0.0, 'samples': 0,
+                })
+                row['min_price_per_round'] = min(row['min_price_per_round'], price_per_round)
+                row['max_price_per_round'] = max(row['max_price_per_round'], price_per_round)
+                row['sum_price_per_round'] += price_per_round
+                row['samples'] += 1
+        
+        for model, key_columns, rows in (
+            (PriceRollup, ['product_id', 'period', 'bucket_start'], product_rows),
+            (CaliberPriceRollup, ['caliber', 'period', 'bucket_start'], list(caliber_rows.values())),
+        ):
+            if not rows:
+                continue
+            stmt = dialect_insert(model).values(rows)
+            stmt = stmt.on_conflict_do_update(index_elements=key_columns, set_={
+                'min_price_per_round': least(model.min_price_per_round, stmt.excluded.min_price_per_round),
+                'max_price_per_round': greatest(model.max_price_per_round, stmt.excluded.max_price_per_round),
+                'sum_price_per_round': model.sum_price_per_round + stmt.excluded.sum_price_per_round,
+                'samples': model.samples + stmt.excluded.samples,
+            })
+            session.execute(stmt)
+    
+    def _update_best_prices(self, session, changes):
+        """Refresh the leaderboard of every caliber a batch of writes can affect.
+        
+        changes are (product_id, caliber, price_per_round, in_stock) after the
+        write. A caliber is only re-ranked when a written product is already on
+        its board, or is in stock and would make the board (cheaper than its
+        last entry, or the board is not full); other writes leave it untouched.
+        """
+        size = DATA_CONFIG['best_prices_per_caliber']
+        calibers = {caliber for _, caliber, _, _ in changes}
+        if not calibers:
+            return
+        
+        boards = {}
+        for caliber, product_id, price_per_round in session.query(
+            BestPrice.caliber, BestPrice.product_id, BestPrice.price_per_round
+        ).filter(BestPrice.caliber.in_(calibers)):
+            board = boards.setdefault(caliber, {'product_ids': set(), 'worst': price_per_round})
+            board['product_ids'].add(product_id)
+            board['worst'] = max(board['worst'], price_per_round)
+        
+        stale = set()
+        for product_id, caliber, price_per_round, in_stock in changes:
+            board = boards.get(caliber)
+            if board is None:
+                if in_stock:
+                    stale.add(caliber)
+            elif product_id in board['product_ids']:
+                stale.add(caliber)
+            elif in_stock and (len(board['product_ids']) < size or price_per_round < board['worst']):
+                stale.add(caliber)
+        
+        self._refresh_best_prices(session, stale)
+    
+    def _refresh_best_prices(self, session, calibers):
+        """Re-rank the given calibers' leaderboards from the products table"""
+        size = DATA_CONFIG['best_prices_per_caliber']
+        for caliber in sorted(calibers):
+            if self.engine.dialect.name == 'postgresql':
+                # Scrapers running in parallel may re-rank the same caliber; take turns
+                session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:caliber))"), {'caliber': caliber})
+            session.execute(delete(BestPrice).where(BestPrice.caliber == caliber))
+            # Served by ix_products_caliber_best_price: an index range scan of at most `size` rows
+            top = session.query(Product.id, Product.price_per_round).filter(
+                Product.caliber == caliber, Product.in_stock == True
+            ).order_by(Product.price_per_round, Product.id).limit(size).all()
+            if top:
+                session.execute(insert(BestPrice), [
+                    {'caliber': caliber, 'rank': rank, 'product_id': product_id, 'price_per_round': price_per_round}
+                    for rank, (product_id, price_per_round) in enumerate(top, 1)
+                ])
+    
+    def rebuild_best_prices(self):
+        """Recompute the whole best_prices leaderboard from the products table"""
+        session = self.get_session()
+        try:
+            session.execute(delete(BestPrice))
+            calibers = [caliber for (caliber,) in session.query(Product.caliber).distinct()]
+            self._refresh_best_prices(session, calibers)
+            session.commit()
+            self.logger.info(f"Rebuilt best prices for {len(calibers)} calibers")
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def check_best_prices(self, repair=False):
+        """Compare the leaderboard against a from-scratch ranking.
+        
+        Returns the calibers whose board differs; with repair=True those
+        boards are rebuilt.
+        """
+        size = DATA_CONFIG['best_prices_per_caliber']
+        session = self.get_session()
+        try:
+            stored = {}
+            for caliber, product_id in session.query(BestPrice.caliber, BestPrice.product_id).order_by(BestPrice.caliber, BestPrice.rank):
+                stored.setdefault(caliber, []).append(product_id)
+            
+            calibers = set(stored) | {caliber for (caliber,) in session.query(Product.caliber).distinct()}
+            mismatched = []
+            for caliber in sorted(calibers):
+                expected = [product_id for (product_id,) in session.query(Product.id).filter(
+                    Product.caliber == caliber, Product.in_stock == True
+                ).order_by(Product.price_per_round, Product.id).limit(size)]
+                if stored.get(caliber, []) != expected:
+                    mismatched.append(caliber)
+            
+            if repair and mismatched:
+                self._refresh_best_prices(session, mismatched)
+                session.commit()
+                self.logger.info(f"Repaired best prices for {len(mismatched)} calibers")
+            return mismatched
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def get_verification_candidates(self, max_rank=None):
+        """Leaderboard entries to re-verify: (product_id, name, product_url, price, rank, last_checked).
+        
+        last_checked is the later of verified_at and last_scraped, since a
+        full scrape confirms price and stock as well as a verification does.
+        """
+        self.ensure_schema()
+        session = self.get_session()
+        try:
+            query = session.query(
+                Product.id, Product.name, Product.product_url, Product.price, BestPrice.rank,
+                Product.verified_at, Product.last_scraped
+            ).join(BestPrice, BestPrice.product_id == Product.id).filter(Product.product_url.isnot(None))
+            if max_rank:
+                query = query.filter(BestPrice.rank <= max_rank)
+            rows = query.all()
+        finally:
+            session.close()
+        
+        return [
+            (product_id, name, url, price, rank, max(filter(None, (verified_at, last_scraped)), default=None))
+            for product_id, name, url, price, rank, verified_at, last_scraped in rows
+        ]
+    
+    def record_verification(self, product_id, in_stock=None, price=None):
+        """Write a re-check of a product page back to its record.
+        
+        Sets verified_at, updates stock and/or price (price per round from the
+        stored quantity) when given, and records the check like a scrape:
+        a history row if either changed, the rollups and the best_prices
+        leaderboard. Returns True if the price or stock changed.
+        """
+        self.ensure_schema()
+        session = self.get_session()
+        try:
+            product = session.get(Product, product_id)
+            if product is None:
+                return False
+            
+            now = datetime.utcnow()
+            previous = (product.price, product.price_per_round, product.in_stock)
+            if price:
+                product.price = price
+                product.price_per_round = round(price / product.quantity, 4)
+            if in_stock is not None:
+                product.in_stock = in_stock
+            product.verified_at = now
+            
+            changed = (product.price, product.price_per_round, product.in_stock) != previous
+            if changed:
+                product.last_updated = now
+            
+            session.flush()
+            self._record_observations(session, now, [
+                (product.id, product.caliber, product.price, product.price_per_round, product.in_stock)
+            ], {product.id: previous})
+            session.commit()
+            return changed
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"Error recording verification of product {product_id}: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def get_product_change_stats(self):
+        """(product_url, observed_since, last_scraped, changes) per product with a URL.
+        
+        History is only written when price or stock changes, so a product's
+        history rows after the first are its observed changes. prune_history
+        drops old raw rows, so the changes are counted from the oldest
+        retained row, not from first_seen: observed_since is the later of
+        the two.
+        """
+        session = self.get_session()
+        try:
+            rows = session.query(
+                Product.product_url, Product.first_seen, func.min(PriceHistory.recorded_at),
+                Product.last_scraped, func.count(PriceHistory.id) - 1
+            ).outerjoin(PriceHistory, PriceHistory.product_id == Product.id).filter(
+                Product.product_url.isnot(None)
+            ).group_by(Product.id).all()
+        finally:
+            session.close()
+        
+        return [
+            (url, max(filter(None, (first_seen, oldest_retained)), default=None), last_scraped, changes)
+            for url, first_seen, oldest_retained, last_scraped, changes in rows
+        ]
+    
+    def get_price_rollups(self, product_id=None, caliber=None, period='day', since=None):
+        """Rollup buckets for a product or a caliber, oldest first, as dicts with min/avg/max price per round"""
+        if (product_id is None) == (caliber is None):
+            raise ValueError("Pass exactly one of product_id or caliber")
+        
+        model = PriceRollup if product_id is not None else CaliberPriceRollup
+        session = self.get_session()
+        try:
+            query = session.query(model).filter(model.period == period)
+            if product_id is not None:
+                query = query.filter(model.product_id == product_id)
+            else:
+                query = query.filter(model.caliber == caliber)
+            if since:
+                query = query.filter(model.bucket_start >= since)
+            
+            return [
+                {
+                    'bucket_start': rollup.bucket_start,
+                    'min_price_per_round': rollup.min_price_per_round,
+                    'avg_price_per_round': rollup.sum_price_per_round / rollup.samples,
+                    'max_price_per_round': rollup.max_price_per_round,
+                    'samples': rollup.samples,
+                }
+                for rollup in query.order_by(model.bucket_start)
+            ]
+        finally:
+            session.close()
+    
+    def prune_history(self, raw_retention_days=None, hourly_retention_days=None):
+        """Delete raw price history and hourly rollups past their retention age.
+        
+        Each product keeps its latest raw history row even when it is old,
+        since with change-only history that row holds the current price.
+        Daily rollups are never pruned. Returns (raw rows, hourly rollups) deleted.
+        """
+        now = datetime.utcnow()
+        raw_cutoff = now - timedelta(days=raw_retention_days or HISTORY_CONFIG['raw_retention_days'])
+        hourly_cutoff = now - timedelta(days=hourly_retention_days or HISTORY_CONFIG['hourly_retention_days'])
+        
+        session = self.get_session()
+        try:
+            latest = session.query(func.max(PriceHistory.id)).group_by(PriceHistory.product_id)
+            raw_deleted = session.query(PriceHistory).filter(
+                PriceHistory.recorded_at < raw_cutoff, PriceHistory.id.notin_(latest)
+            ).delete(synchronize_session=False)
+            
+            hourly_deleted = session.query(PriceRollup).filter(
+                PriceRollup.period == 'hour', PriceRollup.bucket_start < hourly_cutoff
+            ).delete(synchronize_session=False)
+            hourly_deleted += session.query(CaliberPriceRollup).filter(
+                CaliberPriceRollup.period == 'hour', CaliberPriceRollup.bucket_start < hourly_cutoff
+            ).delete(synchronize_session=False)
+            
+            session.commit()
+            self.logger.info(f"Pruned {raw_deleted} raw price history rows and {hourly_deleted} hourly rollups")
+            return raw_deleted, hourly_deleted
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"Error pruning price history: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def collapse_price_history(self):
+        """Delete history rows that repeat the previous row's price, price per round and stock.
+        
+        Backfill for databases written before history became change-only.
+        Each remaining row marks when a price started. Returns the number of
+        rows deleted.
+        """
+        session = self.get_session()
+        try:
+            result = session.execute(text("""
+                DELETE FROM price_history WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, price, price_per_round, in_stock,
+                            LAG(price) OVER (PARTITION BY product_id ORDER BY recorded_at, id) AS prev_price,
+                            LAG(price_per_round) OVER (PARTITION BY product_id ORDER BY recorded_at, id) AS prev_price_per_round,
+                            LAG(in_stock) OVER (PARTITION BY product_id ORDER BY recorded_at, id) AS prev_in_stock
+                        FROM price_history
+                    ) runs
+                    WHERE price = prev_price AND price_per_round = prev_price_per_round AND in_stock = prev_in_stock
+                )
+            """))
+            session.commit()
+            self.logger.info(f"Collapsed {result.rowcount} repeated price history rows")
+            return result.rowcount
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"Error collapsing price history: {e}")
+            raise
+        finally:
+            session.close()
+    
     def log_scraping_session(self, retailer_id, status, products_found=0, products_updated=0, products_new=0, error_message=None):
         """Log scraping session results"""
         session = self.get_session()
@@ -216,9 +843,19 @@ class DatabaseManager:
             session.close()
     
     def get_best_prices(self, caliber=None, limit=50):
-        """Get best prices, optionally filtered by caliber"""
+        """Get best prices, optionally filtered by caliber.
+        
+        Served from the best_prices leaderboard when it is deep enough:
+        the overall top N is always within the per-caliber top Ns.
+        """
         session = self.get_session()
         try:
+            if limit <= DATA_CONFIG['best_prices_per_caliber']:
+                query = session.query(Product).join(BestPrice, BestPrice.product_id == Product.id)
+                if caliber:
+                    return query.filter(BestPrice.caliber == caliber).order_by(BestPrice.rank).limit(limit).all()
+                return query.order_by(BestPrice.price_per_round, Product.id).limit(limit).all()
+            
             query = session.query(Product).filter_by(in_stock=True)
             if caliber:
                 query = query.filter_by(caliber=caliber)
@@ -227,5 +864,5 @@ class DatabaseManager:
         finally:
             session.close()
 
-# Initialize database manager
-db_manager = DatabaseManager() 
\ No newline at end of file
+# Database manager, connected on first use
+db_manager = LazySingleton(DatabaseManager) 
\ No newline at end of file
@@ -8,12 +8,21 @@ import urllib.request
 import urllib.parse
 import csv
 import re
-import time
 import random
 from datetime import datetime
 from html.parser import HTMLParser
+from http_cache import cached_urlopen, response_cache
+import extraction
+from stock_status import StockMatcher
 
 class RetailerScraper:
+    stock_matcher = StockMatcher(
+        out_of_stock=['OUT OF STOCK', 'SOLD OUT', 'UNAVAILABLE', 'BACKORDER',
+                      'NOTIFY WHEN AVAILABLE', 'TEMPORARILY UNAVAILABLE'],
+        in_stock=['IN STOCK', 'AVAILABLE', 'ADD TO CART', 'BUY NOW',
+                  'ORDER NOW', 'SHIPS', 'READY TO SHIP'],
+    )
+    
     def __init__(self):
         self.products = []
         self.user_agents = [
@@ -34,16 +43,11 @@ class RetailerScraper:
             req.add_header('Connection', 'keep-alive')
             req.add_header('Cache-Control', 'no-cache')
             
-            with urllib.request.urlopen(req, timeout=15) as response:
-                if response.status == 200:
-                    content = response.read()
-                    # Handle gzip encoding
-                    if response.info().get('Content-Encoding') == 'gzip':
-                        import gzip
-                        content = gzip.decompress(content)
-                    return content.decode('utf-8', errors='ignore')
-                else:
-                    print(f"⚠ HTTP {response.status} for {url}")
+            response = cached_urlopen(req, timeout=15)
+            if response.status_code == 200:
+                return response.text
+            else:
+                print(f"⚠ HTTP {response.status_code} for {url}")
             return None
             
         except Exception as e:
@@ -52,114 +56,25 @@ class RetailerScraper:
     
     def extract_price(self, text):
         """Extract price from text"""
-        if not text:
-            return None
-        
-        # More comprehensive price patterns
-        patterns = [
-            r'\$\s*([0-9,]+\.?[0-9]*)',  # $24.99, $1,299.99
-            r'Price[:\s]*\$\s*([0-9,]+\.?[0-9]*)',  # Price: $24.99
-            r'([0-9,]+\.?[0-9]*)\s*USD',  # 24.99 USD
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    price = float(match.replace(',', ''))
-                    if 0.1 <= price <= 10000:  # Reasonable range
-                        return price
-                except ValueError:
-                    continue
-        return None
+        return extraction.extract_price(text)
     
     def extract_caliber(self, text):
         """Extract caliber from product text"""
-        if not text:
-            return None
-        
-        text = text.upper()
-        
-        # Comprehensive caliber detection
-        caliber_patterns = {
-            '9MM': [r'9\s*MM', r'9X19', r'9\s*LUGER'],
-            '.223': [r'\.223', r'223\s*REM'],
-            '5.56': [r'5\.56', r'5\.56X45', r'5\.56\s*NATO'],
-            '.308': [r'\.308', r'308\s*WIN', r'7\.62X51'],
-            '.45 ACP': [r'\.45\s*ACP', r'45\s*ACP'],
-            '.40 S&W': [r'\.40\s*S&W', r'40\s*S&W'],
-            '.380': [r'\.380', r'380\s*ACP'],
-            '22LR': [r'22\s*LR', r'\.22\s*LR'],
-            '7.62x39': [r'7\.62X39'],
-            '300 BLK': [r'300\s*BLK', r'300\s*BLACKOUT'],
-        }
-        
-        for standard, patterns in caliber_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text):
-                    return standard
-        return None
+        return extraction.extract_caliber(text)
     
     def extract_quantity(self, text):
         """Extract round count from text"""
-        if not text:
-            return 50  # Default
-        
-        text_upper = text.upper()
-        
-        patterns = [
-            r'(\d+)\s*ROUNDS?',
-            r'(\d+)\s*CT\b',
-            r'(\d+)\s*COUNT',
-            r'BOX\s*OF\s*(\d+)',
-            r'(\d+)/BOX',
-            r'(\d+)\s*RD',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text_upper)
-            if match:
-                try:
-                    qty = int(match.group(1))
-                    if 1 <= qty <= 10000:
-                        return qty
-                except ValueError:
-                    continue
-        
-        # Defaults based on keywords
-        if 'CASE' in text_upper:
-            return 1000
-        elif 'BOX' in text_upper:
-            return 50
-        
-        return 50
+        return extraction.extract_quantity(text)
     
     def is_in_stock(self, text):
         """Check stock status"""
         if not text:
             return False
         
-        text_upper = text.upper()
-        
-        # Out of stock indicators
-        out_indicators = [
-            'OUT OF STOCK', 'SOLD OUT', 'UNAVAILABLE', 'BACKORDER',
-            'NOTIFY WHEN AVAILABLE', 'TEMPORARILY UNAVAILABLE'
-        ]
-        
-        for indicator in out_indicators:
-            if indicator in text_upper:
-                return False
-        
-        # In stock indicators
-        in_indicators = [
-            'IN STOCK', 'AVAILABLE', 'ADD TO CART', 'BUY NOW',
-            'ORDER NOW', 'SHIPS', 'READY TO SHIP'
-        ]
-        
-        for indicator in in_indicators:
-            if indicator in text_upper:
-                return True
+        # Out of stock indicators are checked first (more specific)
+        in_stock = self.stock_matcher.is_in_stock(text)
+        if in_stock is not None:
+            return in_stock
         
         # If we see a price, assume it's in stock
         return self.extract_price(text) is not None
@@ -223,8 +138,6 @@ class RetailerScraper:
                             
                             if found_count >= 10:  # Limit results per category
                                 break
-            
-            time.sleep(2)  # Be respectful
         
         return found_count
     
@@ -303,8 +216,6 @@ class RetailerScraper:
                                 
                                 if found_count >= 10:
                                     break
-            
-            time.sleep(3)  # Be respectful
         
         return found_count
     
@@ -376,8 +287,6 @@ class RetailerScraper:
                                 
                                 if found_count >= 8:
                                     break
-            
-            time.sleep(3)
         
         return found_count
     
@@ -426,7 +335,7 @@ Status: {stock_status}
 {'-'*60}""")
     
     def run(self):
-        """Run the direct retailer scraper"""
+        """Run the direct retailer scraper, returning per-retailer product counts"""
         print("🚀 Starting DIRECT RETAILER Ammunition Scraper")
         print("="*60)
         
@@ -452,6 +361,7 @@ Status: {stock_status}
         print(f"SG Ammo: {sgammo_count}")
         print(f"Bulk Ammo: {bulkammo_count}")
         print(f"Total products: {total_found}")
+        print(f"HTTP cache: {response_cache.get_stats()}")
         
         if total_found > 0:
             self.display_results()
@@ -463,6 +373,12 @@ Status: {stock_status}
             print("- Retailers may have anti-bot protection")
             print("- Website structures may have changed")
             print("- Network connectivity issues")
+        
+        return {
+            'Academy Sports': academy_count,
+            'SG Ammo': sgammo_count,
+            'Bulk Ammo': bulkammo_count,
+        }
 
 def main():
     """Main function"""
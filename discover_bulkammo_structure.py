@@ -8,6 +8,8 @@ import urllib.request
 import re
 import time
 from datetime import datetime
+from http_cache import cached_urlopen
+import extraction
 
 def make_request(url):
     """Make HTTP request with better error handling"""
@@ -19,8 +21,7 @@ def make_request(url):
             'Connection': 'keep-alive',
         }
         req = urllib.request.Request(url, headers=headers)
-        response = urllib.request.urlopen(req, timeout=20)
-        return response.read().decode('utf-8', errors='ignore')
+        return cached_urlopen(req, timeout=20).text
     except Exception as e:
         print(f"❌ Error: {e}")
         return None
@@ -104,33 +105,11 @@ def extract_product_data(html, url):
 
 def extract_caliber_simple(text):
     """Simple caliber extraction"""
-    text = text.upper()
-    
-    # Common calibers
-    calibers = ['9MM', '.223', '5.56', '.308', '.45', '.40', '.380', '22LR', '7.62', '300', '6.5', '.30-06', '12GA', '20GA']
-    
-    for caliber in calibers:
-        if caliber in text:
-            return caliber
-    
-    return "Unknown"
+    return extraction.extract_caliber(text, default="Unknown")
 
 def extract_quantity_simple(text):
     """Simple quantity extraction"""
-    text = text.upper()
-    
-    # Look for numbers followed by rounds/rds
-    patterns = [r'(\d+)\s*ROUNDS?', r'(\d+)\s*RDS?', r'(\d+)\s*CT']
-    
-    for pattern in patterns:
-        match = re.search(pattern, text)
-        if match:
-            try:
-                return int(match.group(1))
-            except:
-                continue
-    
-    return 50  # Default
+    return extraction.extract_quantity(text, keywords=False)  # Default 50
 
 def main():
     """Main discovery function"""
@@ -11,8 +11,20 @@ import re
 import time
 import random
 from datetime import datetime
+from http_cache import cached_urlopen, response_cache
+import extraction
+from stock_status import StockMatcher
+from page_fingerprint import page_fingerprints
 
 class EnhancedBulkAmmoScraper:
+    stock_matcher = StockMatcher(
+        out_of_stock=['OUT OF STOCK', 'SOLD OUT', 'UNAVAILABLE', 'BACKORDER',
+                      'NOTIFY WHEN AVAILABLE', 'TEMPORARILY UNAVAILABLE',
+                      'DISCONTINUED'],
+        in_stock=['IN STOCK', 'AVAILABLE', 'ADD TO CART', 'BUY NOW',
+                  'ORDER NOW', 'SHIPS', 'READY TO SHIP', 'QUICK VIEW'],
+    )
+    
     def __init__(self):
         self.products = []
         self.user_agents = [
@@ -44,15 +56,11 @@ class EnhancedBulkAmmoScraper:
             req.add_header('Cache-Control', 'no-cache')
             req.add_header('Referer', 'https://www.bulkammo.com/')
             
-            with urllib.request.urlopen(req, timeout=20) as response:
-                if response.status == 200:
-                    content = response.read()
-                    if response.info().get('Content-Encoding') == 'gzip':
-                        import gzip
-                        content = gzip.decompress(content)
-                    return content.decode('utf-8', errors='ignore')
-                else:
-                    print(f"⚠ HTTP {response.status} for {url}")
+            response = cached_urlopen(req, timeout=20)
+            if response.status_code == 200:
+                return response.text
+            else:
+                print(f"⚠ HTTP {response.status_code} for {url}")
             return None
             
         except Exception as e:
@@ -61,115 +69,25 @@ class EnhancedBulkAmmoScraper:
     
     def extract_price(self, text):
         """Extract price from text"""
-        if not text:
-            return None
-        
-        patterns = [
-            r'\$\s*([0-9,]+\.?[0-9]*)',
-            r'Price[:\s]*\$\s*([0-9,]+\.?[0-9]*)',
-            r'([0-9,]+\.?[0-9]*)\s*USD',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    price = float(match.replace(',', ''))
-                    if 1 <= price <= 10000:
-                        return price
-                except ValueError:
-                    continue
-        return None
+        return extraction.extract_price(text, min_price=1)
     
     def extract_caliber(self, text):
         """Extract caliber from product text"""
-        if not text:
-            return None
-        
-        text = text.upper()
-        
-        caliber_patterns = {
-            '9MM': [r'9\s*MM', r'9X19', r'9\s*LUGER'],
-            '.223': [r'\.223', r'223\s*REM'],
-            '5.56': [r'5\.56', r'5\.56X45', r'5\.56\s*NATO'],
-            '.308': [r'\.308', r'308\s*WIN', r'7\.62X51'],
-            '.45 ACP': [r'\.45\s*ACP', r'45\s*ACP'],
-            '.40 S&W': [r'\.40\s*S&W', r'40\s*S&W'],
-            '.380': [r'\.380', r'380\s*ACP'],
-            '22LR': [r'22\s*LR', r'\.22\s*LR'],
-            '7.62x39': [r'7\.62X39'],
-            '300 BLK': [r'300\s*BLK', r'300\s*BLACKOUT'],
-            '.357': [r'\.357', r'357\s*MAG'],
-            '.44': [r'\.44', r'44\s*MAG'],
-            '12GA': [r'12\s*GA', r'12\s*GAUGE'],
-            '20GA': [r'20\s*GA', r'20\s*GAUGE'],
-            '.17 HMR': [r'\.17\s*HMR'],
-            '.22 WMR': [r'\.22\s*WMR', r'22\s*MAG'],
-        }
-        
-        for standard, patterns in caliber_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text):
-                    return standard
-        return None
+        return extraction.extract_caliber(text)
     
     def extract_quantity(self, text):
         """Extract round count from text"""
-        if not text:
-            return 50
-        
-        text_upper = text.upper()
-        
-        patterns = [
-            r'(\d+)\s*ROUNDS?',
-            r'(\d+)\s*CT\b',
-            r'(\d+)\s*COUNT',
-            r'BOX\s*OF\s*(\d+)',
-            r'(\d+)/BOX',
-            r'(\d+)\s*RD',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text_upper)
-            if match:
-                try:
-                    qty = int(match.group(1))
-                    if 1 <= qty <= 10000:
-                        return qty
-                except ValueError:
-                    continue
-        
-        if 'CASE' in text_upper:
-            return 1000
-        elif 'BOX' in text_upper:
-            return 50
-        
-        return 50
+        return extraction.extract_quantity(text)
     
     def is_in_stock(self, text):
         """Check stock status"""
         if not text:
             return False
         
-        text_upper = text.upper()
-        
-        out_indicators = [
-            'OUT OF STOCK', 'SOLD OUT', 'UNAVAILABLE', 'BACKORDER',
-            'NOTIFY WHEN AVAILABLE', 'TEMPORARILY UNAVAILABLE', 'DISCONTINUED'
-        ]
-        
-        for indicator in out_indicators:
-            if indicator in text_upper:
-                return False
-        
-        in_indicators = [
-            'IN STOCK', 'AVAILABLE', 'ADD TO CART', 'BUY NOW',
-            'ORDER NOW', 'SHIPS', 'READY TO SHIP', 'QUICK VIEW'
-        ]
-        
-        for indicator in in_indicators:
-            if indicator in text_upper:
-                return True
+        # Out of stock indicators are checked first (more specific)
+        in_stock = self.stock_matcher.is_in_stock(text)
+        if in_stock is not None:
+            return in_stock
         
         return self.extract_price(text) is not None
     
@@ -201,7 +119,18 @@ class EnhancedBulkAmmoScraper:
         if not html:
             return 0
         
+        # Reuse last run's products when the page is unchanged apart from volatile tokens
+        fingerprint, cached_products = page_fingerprints.lookup(url, html, __name__)
+        if cached_products is not None:
+            scraped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            for product in cached_products:
+                product['scraped_at'] = scraped_at
+                self.products.append(product)
+            print(f"♻️ {category} page {page_num} unchanged - reused {len(cached_products)} products")
+            return len(cached_products)
+        
         found_count = 0
+        page_products = []
         
         # Split HTML into manageable chunks around product containers
         # Look for common BulkAmmo product container patterns
@@ -228,6 +157,7 @@ class EnhancedBulkAmmoScraper:
         
         print(f"📦 Found {len(product_chunks)} potential product chunks in {category} page {page_num}")
         
+        candidates = []
         for chunk in product_chunks:
             if len(chunk) < 50:  # Skip tiny chunks
                 continue
@@ -258,13 +188,17 @@ class EnhancedBulkAmmoScraper:
             if not name:
                 continue
             
-            # Extract caliber
-            caliber = self.extract_caliber(name)
+            candidates.append((chunk, price, name))
+        
+        # Caliber and round count for every named product on the page in one batch
+        details = extraction.extract_many([name for _, _, name in candidates])
+        
+        for (chunk, price, name), detail in zip(candidates, details):
+            caliber = detail['caliber']
             if not caliber:
                 continue
             
-            # Extract quantity
-            quantity = self.extract_quantity(name)
+            quantity = detail['quantity']
             
             # Extract product URL
             product_url = self.extract_product_url(chunk, url)
@@ -285,11 +219,13 @@ class EnhancedBulkAmmoScraper:
             }
             
             self.products.append(product)
+            page_products.append(product)
             found_count += 1
             
             stock_emoji = "✅" if in_stock else "❌"
             print(f"{stock_emoji} {category.upper()}: {caliber} - ${price} (${product['price_per_round']}/round) - {name[:50]}...")
         
+        page_fingerprints.remember(url, fingerprint, page_products)
         return found_count
     
     def scrape_all_categories(self):
@@ -311,15 +247,9 @@ class EnhancedBulkAmmoScraper:
                 if page_count == 0:
                     print(f"   ⚠️ No products found on page {page}, stopping category")
                     break
-                
-                # Be respectful - delay between pages
-                time.sleep(random.uniform(2, 4))
             
             print(f"   ✅ {category.upper()} total: {category_total} products")
             total_found += category_total
-            
-            # Delay between categories
-            time.sleep(random.uniform(3, 5))
         
         return total_found
     
@@ -384,6 +314,8 @@ class EnhancedBulkAmmoScraper:
         end_time = time.time()
         
         print(f"\n⏱️ Scraping completed in {end_time - start_time:.1f} seconds")
+        print(f"HTTP cache: {response_cache.get_stats()}")
+        print(f"Page fingerprints: {page_fingerprints.get_stats()}")
         print(f"📦 Total products collected: {total_found}")
         
         if total_found > 0:
@@ -11,8 +11,20 @@ import re
 import time
 import random
 from datetime import datetime
+from http_cache import cached_urlopen
+import extraction
+from stock_status import StockMatcher
+import structured_data
+from page_fingerprint import page_fingerprints
 
 class EnhancedRetailerScraper:
+    stock_matcher = StockMatcher(
+        out_of_stock=['OUT OF STOCK', 'SOLD OUT', 'UNAVAILABLE', 'BACKORDER',
+                      'NOTIFY WHEN AVAILABLE', 'TEMPORARILY UNAVAILABLE'],
+        in_stock=['IN STOCK', 'AVAILABLE', 'ADD TO CART', 'BUY NOW',
+                  'ORDER NOW', 'SHIPS', 'READY TO SHIP'],
+    )
+    
     def __init__(self):
         self.products = []
         self.user_agents = [
@@ -32,15 +44,11 @@ class EnhancedRetailerScraper:
             req.add_header('Accept-Language', 'en-US,en;q=0.5')
             req.add_header('Connection', 'keep-alive')
             
-            with urllib.request.urlopen(req, timeout=15) as response:
-                if response.status == 200:
-                    content = response.read()
-                    if response.info().get('Content-Encoding') == 'gzip':
-                        import gzip
-                        content = gzip.decompress(content)
-                    return content.decode('utf-8', errors='ignore')
-                else:
-                    print(f"⚠ HTTP {response.status}")
+            response = cached_urlopen(req, timeout=15)
+            if response.status_code == 200:
+                return response.text
+            else:
+                print(f"⚠ HTTP {response.status_code}")
             return None
             
         except Exception as e:
@@ -49,109 +57,25 @@ class EnhancedRetailerScraper:
     
     def extract_price(self, text):
         """Extract price from text"""
-        if not text:
-            return None
-        
-        patterns = [
-            r'\$\s*([0-9,]+\.?[0-9]*)',
-            r'Price[:\s]*\$\s*([0-9,]+\.?[0-9]*)',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    price = float(match.replace(',', ''))
-                    if 5 <= price <= 10000:  # Reasonable range
-                        return price
-                except ValueError:
-                    continue
-        return None
+        return extraction.extract_price(text, min_price=5)  # Reasonable range
     
     def extract_caliber(self, text):
         """Extract caliber from product text"""
-        if not text:
-            return None
-        
-        text = text.upper()
-        
-        caliber_patterns = {
-            '9MM': [r'9\s*MM', r'9X19', r'9\s*LUGER'],
-            '.223': [r'\.223', r'223\s*REM'],
-            '5.56': [r'5\.56', r'5\.56X45', r'5\.56\s*NATO'],
-            '.308': [r'\.308', r'308\s*WIN', r'7\.62X51'],
-            '.45 ACP': [r'\.45\s*ACP', r'45\s*ACP'],
-            '.40 S&W': [r'\.40\s*S&W', r'40\s*S&W'],
-            '.380': [r'\.380', r'380\s*ACP'],
-            '22LR': [r'22\s*LR', r'\.22\s*LR'],
-            '7.62x39': [r'7\.62X39'],
-            '300 BLK': [r'300\s*BLK', r'300\s*BLACKOUT'],
-        }
-        
-        for standard, patterns in caliber_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text):
-                    return standard
-        return None
+        return extraction.extract_caliber(text)
     
     def extract_quantity(self, text):
         """Extract round count from text"""
-        if not text:
-            return 50
-        
-        text_upper = text.upper()
-        
-        patterns = [
-            r'(\d+)\s*ROUNDS?',
-            r'(\d+)\s*CT\b',
-            r'(\d+)\s*COUNT',
-            r'BOX\s*OF\s*(\d+)',
-            r'(\d+)/BOX',
-            r'(\d+)\s*RD',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text_upper)
-            if match:
-                try:
-                    qty = int(match.group(1))
-                    if 1 <= qty <= 10000:
-                        return qty
-                except ValueError:
-                    continue
-        
-        # Defaults based on keywords
-        if 'CASE' in text_upper:
-            return 1000
-        elif 'BOX' in text_upper:
-            return 50
-        
-        return 50
+        return extraction.extract_quantity(text)
     
     def is_in_stock(self, text):
         """Check stock status"""
         if not text:
             return False
         
-        text_upper = text.upper()
-        
-        out_indicators = [
-            'OUT OF STOCK', 'SOLD OUT', 'UNAVAILABLE', 'BACKORDER',
-            'NOTIFY WHEN AVAILABLE', 'TEMPORARILY UNAVAILABLE'
-        ]
-        
-        for indicator in out_indicators:
-            if indicator in text_upper:
-                return False
-        
-        in_indicators = [
-            'IN STOCK', 'AVAILABLE', 'ADD TO CART', 'BUY NOW',
-            'ORDER NOW', 'SHIPS', 'READY TO SHIP'
-        ]
-        
-        for indicator in in_indicators:
-            if indicator in text_upper:
-                return True
+        # Out of stock indicators are checked first (more specific)
+        in_stock = self.stock_matcher.is_in_stock(text)
+        if in_stock is not None:
+            return in_stock
         
         return self.extract_price(text) is not None
     
@@ -216,11 +140,6 @@ class EnhancedRetailerScraper:
                     self.products.append(product_data)
                     found_count += 1
                     print(f"✓ Product {found_count}: {product_data['caliber']} - ${product_data['price']} (${product_data['price_per_round']}/round)")
-                
-                # Be respectful with delays
-                time.sleep(1.5)
-            
-            time.sleep(2)  # Delay between categories
         
         return found_count
     
@@ -231,36 +150,64 @@ class EnhancedRetailerScraper:
             if not html:
                 return None
             
-            # Extract product details from the individual page
-            product_name = self.extract_product_name(html, title_hint)
-            price = self.extract_price(html)
+            # Reuse last run's record when the page is unchanged apart from volatile tokens
+            fingerprint, cached_records = page_fingerprints.lookup(product_url, html, __name__)
+            if cached_records is not None:
+                if not cached_records:
+                    return None
+                product = cached_records[0]
+                product['scraped_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                return product
             
-            if not product_name or not price:
-                return None
-            
-            caliber = self.extract_caliber(product_name + " " + html[:2000])
-            if not caliber:
-                return None
-            
-            quantity = self.extract_quantity(product_name + " " + html[:2000])
-            price_per_round = round(price / quantity, 4)
-            
-            return {
-                'name': product_name[:100],
-                'caliber': caliber,
-                'price': price,
-                'quantity': quantity,
-                'price_per_round': price_per_round,
-                'retailer': 'Bulk Ammo',
-                'in_stock': self.is_in_stock(html[:3000]),
-                'product_url': product_url,  # Individual product URL!
-                'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
+            product = self._parse_product_page(html, product_url, title_hint)
+            page_fingerprints.remember(product_url, fingerprint, [product] if product else [])
+            return product
             
         except Exception as e:
             print(f"❌ Error scraping product page {product_url}: {e}")
             return None
     
+    def _parse_product_page(self, html, product_url, title_hint=""):
+        """Extract product details from a product page's HTML"""
+        # JSON-LD / microdata Product markup is exact; the page heuristics are the fallback
+        structured = structured_data.extract_product(html)
+        if structured:
+            product_name = structured['name'] or self.extract_product_name(html, title_hint)
+            price = structured['price']
+            details = f"{product_name} {structured['description'] or ''}"
+            in_stock = structured['in_stock']
+        else:
+            # Extract product details from the individual page
+            product_name = self.extract_product_name(html, title_hint)
+            price = self.extract_price(html)
+            details = f"{product_name} {html[:2000]}"
+            in_stock = None
+        
+        if not product_name or not price:
+            return None
+        
+        caliber = self.extract_caliber(details)
+        if not caliber:
+            return None
+        
+        quantity = self.extract_quantity(details)
+        price_per_round = round(price / quantity, 4)
+        
+        if in_stock is None:
+            in_stock = self.is_in_stock(html[:3000])
+        
+        return {
+            'name': product_name[:100],
+            'caliber': caliber,
+            'price': price,
+            'quantity': quantity,
+            'price_per_round': price_per_round,
+            'retailer': 'Bulk Ammo',
+            'in_stock': in_stock,
+            'product_url': product_url,  # Individual product URL!
+            'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+    
     def extract_product_name(self, html, title_hint=""):
         """Extract product name from product page"""
         # Try multiple patterns for product name
@@ -326,10 +273,6 @@ class EnhancedRetailerScraper:
                     self.products.append(product_data)
                     found_count += 1
                     print(f"✓ Academy Product {found_count}: {product_data['caliber']} - ${product_data['price']}")
-                
-                time.sleep(2)  # Be respectful
-            
-            time.sleep(3)
         
         return found_count
     
@@ -0,0 +1,219 @@
+import re
+
+# Standard caliber names and their spellings (upper case), most important
+# first: when a text mentions several calibers the earliest entry wins
+CALIBER_PATTERNS = [
+    ('9MM', [r'9\s*MM', r'9X19', r'9\s*LUGER', r'9\s*PARA']),
+    ('.223', [r'\.223', r'223\s*REM']),
+    ('5.56', [r'5\.56']),
+    ('.308', [r'\.308', r'308\s*WIN', r'7\.62X51']),
+    ('.45 ACP', [r'45\s*ACP', r'\.45\s*AUTO']),
+    ('.40 S&W', [r'40\s*S&W', r'\.40\s*SW']),
+    ('.380', [r'\.380', r'380\s*ACP', r'380\s*AUTO']),
+    ('22LR', [r'22\s*LR', r'22\s*LONG\s*RIFLE']),
+    ('7.62x39', [r'7\.62\s*X\s*39']),
+    ('300 BLK', [r'300\s*BLK', r'300\s*BLACKOUT', r'300\s*AAC']),
+    ('6.5 CM', [r'6\.5\s*CM', r'6\.5\s*CREEDMOOR']),
+    ('.30-06', [r'30-06', r'30\.06']),
+    ('12GA', [r'12\s*GA']),
+    ('20GA', [r'20\s*GA']),
+    ('.357', [r'\.357', r'357\s*MAG']),
+    ('.44', [r'\.44', r'44\s*MAG']),
+    ('.17 HMR', [r'17\s*HMR']),
+    ('.22 WMR', [r'22\s*WMR', r'22\s*MAG']),
+    ('.38', [r'\.38', r'38\s*SPECIAL']),
+    ('10MM', [r'10\s*MM']),
+    ('.243', [r'\.243', r'243\s*WIN']),
+    ('7MM', [r'7\s*MM']),
+]
+
+# Round count patterns in priority order; each captures the count. Entries
+# with a fixed value are keyword fallbacks used when no count is found.
+# "RD" right after a number ending in 3 (but not 13) is an ordinal, as in
+# "3RD GEN", not a round count.
+QUANTITY_PATTERNS = [
+    (None, [r'(\d+)\s*ROUNDS?']),
+    (None, [r'(\d+)(?:\s+|(?<!(?<!1)3))RDS?\b']),
+    (None, [r'(\d+)\s*CT\b']),
+    (None, [r'(\d+)\s*COUNT']),
+    (None, [r'BOX\s*OF\s*(\d+)']),
+    (None, [r'(\d+)/BOX']),
+    (None, [r'(\d+)\s*PCS?\b', r'(\d+)\s*PIECES?\b']),
+    (None, [r'QTY[:\s]*(\d+)']),
+    (1000, [r'CASE']),
+    (50, [r'BOX']),
+]
+
+# Bulk-listing pages (category and BulkAmmo product pages) also spell counts
+# as "1000 PER CASE" or "BULK 500"; too loose for product names elsewhere
+BULK_QUANTITY_PATTERNS = QUANTITY_PATTERNS[:-3] + [
+    (None, [r'(\d{3,4})\s*PER']),
+    (None, [r'BULK\s*(\d+)']),
+] + QUANTITY_PATTERNS[-3:]
+
+# Bullet types, most specific first so "JHP" is not reported as "HP"
+BULLET_TYPE_PATTERNS = [
+    ('JHP', [r'JHP', r'JACKETED HOLLOW\s*POINT']),
+    ('JSP', [r'JSP', r'JACKETED SOFT\s*POINT']),
+    ('FMJ', [r'FMJ', r'FULL METAL JACKET']),
+    ('TMJ', [r'TMJ', r'TOTAL METAL JACKET']),
+    ('HP', [r'HP\b', r'HOLLOW\s*POINT']),
+    ('SP', [r'SP\b', r'SOFT\s*POINT']),
+    ('LRN', [r'LRN', r'LEAD ROUND NOSE']),
+    ('LSWC', [r'LSWC', r'LEAD SEMI WADCUTTER']),
+    ('MATCH', [r'MATCH']),
+    ('BALL', [r'BALL\b']),
+]
+
+GRAIN_PATTERNS = [
+    (None, [r'(\d+)\s*GR']),
+]
+
+# Prices in priority order: "$24.99", "Price: 24.99", "24.99 USD"
+PRICE_PATTERNS = [
+    re.compile(r'\$\s*([0-9,]+\.?[0-9]*)'),
+    re.compile(r'PRICE:?\s*([0-9][0-9,]*\.?[0-9]*)', re.IGNORECASE),
+    re.compile(r'([0-9][0-9,]*\.?[0-9]*)\s*(?:USD|DOLLARS?)\b', re.IGNORECASE),
+]
+
+
+class PatternTable:
+    """A priority-ordered table of (value, [regex, ...]) entries, compiled once.
+
+    All spellings are compiled into one alternation, each tagged with a named
+    group, so a text is scanned in a single pass. match() returns the value of the matching entry
+    that comes first in table order; accept(value, captured) can reject a hit
+    (e.g. an out-of-range count), in which case other hits are considered.
+    """
+
+    def __init__(self, table):
+        self.values = [value for value, _ in table]
+        alternatives = []
+        spellings = []
+        for index, (_, patterns) in enumerate(table):
+            for pattern in patterns:
+                # The named group is an empty marker at the end of the spelling,
+                # so spellings still start with a literal and the engine can
+                # skip ahead to positions where one of those characters occurs
+                name = f's{len(spellings)}'
+                alternatives.append(f'{pattern}(?P<{name}>)')
+                spellings.append((name, index, re.compile(pattern).groups))
+        self.regex = re.compile('|'.join(alternatives))
+        # Marker name -> (entry index, number of the spelling's first capture or None)
+        self.spellings = {
+            name: (index, self.regex.groupindex[name] - groups if groups else None)
+            for name, index, groups in spellings
+        }
+
+    def match(self, text, default=None, accept=None):
+        """Return (value, captured) of the highest-priority accepted hit, or (default, None)"""
+        if not text:
+            return default, None
+
+        best_index, best_captured = None, None
+        for match in self.regex.finditer(text.upper()):
+            index, group = self.spellings[match.lastgroup]
+            if best_index is not None and index >= best_index:
+                continue
+            captured = match.group(group) if group else None
+            if accept is None or accept(self.values[index], captured):
+                best_index, best_captured = index, captured
+                if index == 0:
+                    break
+        if best_index is None:
+            return default, None
+        return self.values[best_index], best_captured
+
+
+class CaliberMatcher:
+    """Maps text to a standard caliber name"""
+
+    def __init__(self, table=None):
+        self.patterns = PatternTable(CALIBER_PATTERNS if table is None else table)
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """Build from a {standard: [literal spellings]} mapping such as DATA_CONFIG['caliber_mapping']"""
+        return cls([(label, [re.escape(v.upper()) for v in variations]) for label, variations in mapping.items()])
+
+    def match(self, text, default=None):
+        return self.patterns.match(text, default)[0]
+
+
+caliber_matcher = CaliberMatcher()
+bullet_type_matcher = CaliberMatcher(BULLET_TYPE_PATTERNS)
+quantity_table = PatternTable(QUANTITY_PATTERNS)
+bulk_quantity_table = PatternTable(BULK_QUANTITY_PATTERNS)
+grain_table = PatternTable(GRAIN_PATTERNS)
+
+
+def _quantity_filter(min_qty, max_qty, keywords):
+    """accept() for quantity_table: counts must be in range, keywords optional"""
+    def accept(value, captured):
+        if value is not None:
+            return keywords
+        return min_qty <= int(captured) <= max_qty
+    return accept
+
+
+def _count(value, captured):
+    """Value of a quantity/grain table hit: the captured number or the fixed fallback"""
+    return int(captured) if captured is not None and value is None else value
+
+
+def extract_price(text, min_price=0.1, max_price=10000):
+    """Extract the first price within range from text"""
+    if not text:
+        return None
+
+    for regex in PRICE_PATTERNS:
+        for match in regex.finditer(text):
+            try:
+                price = float(match.group(1).replace(',', ''))
+            except ValueError:
+                continue
+            if min_price <= price <= max_price:
+                return price
+    return None
+
+
+def extract_caliber(text, default=None):
+    """Extract the standard caliber name from text"""
+    return caliber_matcher.match(text, default)
+
+
+def extract_quantity(text, default=50, min_qty=1, max_qty=10000, keywords=True, table=None):
+    """Extract round count from text.
+
+    Counts outside [min_qty, max_qty] are ignored. With keywords, a text
+    mentioning a CASE (1000) or BOX (50) falls back to that size. table
+    defaults to quantity_table; bulk listing pages pass bulk_quantity_table.
+    """
+    table = quantity_table if table is None else table
+    return _count(*table.match(text, default, _quantity_filter(min_qty, max_qty, keywords)))
+
+
+def extract_grain_weight(text):
+    """Extract grain weight from text"""
+    return _count(*grain_table.match(text))
+
+
+def extract_bullet_type(text):
+    """Extract bullet type abbreviation from text"""
+    return bullet_type_matcher.match(text)
+
+
+def extract_many(names, default_quantity=50, min_qty=1, max_qty=10000, keywords=True):
+    """Extract caliber, quantity, grain weight and bullet type for many product
+    names; names repeated across pages are only scanned once"""
+    accept = _quantity_filter(min_qty, max_qty, keywords)
+    results = {}
+    for name in names:
+        if name not in results:
+            results[name] = {
+                'caliber': caliber_matcher.match(name),
+                'quantity': _count(*quantity_table.match(name, default_quantity, accept)),
+                'grain_weight': _count(*grain_table.match(name)),
+                'bullet_type': bullet_type_matcher.match(name),
+            }
+    return [dict(results[name]) for name in names]
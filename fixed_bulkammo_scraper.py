@@ -6,9 +6,10 @@ Hovers over the right elements to get main product page URLs
 
 import urllib.request
 import re
-import time
 import random
 from datetime import datetime
+from http_cache import cached_urlopen
+import extraction
 
 def make_request(url):
     """Make HTTP request"""
@@ -24,12 +25,7 @@ def make_request(url):
         req.add_header('Accept-Language', 'en-US,en;q=0.5')
         req.add_header('Connection', 'keep-alive')
         
-        with urllib.request.urlopen(req, timeout=15) as response:
-            content = response.read()
-            if response.info().get('Content-Encoding') == 'gzip':
-                import gzip
-                content = gzip.decompress(content)
-            return content.decode('utf-8', errors='ignore')
+        return cached_urlopen(req, timeout=15).text
             
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -37,78 +33,15 @@ def make_request(url):
 
 def extract_price(text):
     """Extract price from text"""
-    if not text:
-        return None
-    
-    patterns = [
-        r'\$\s*([0-9,]+\.?[0-9]*)',
-        r'Price[:\s]*\$\s*([0-9,]+\.?[0-9]*)',
-    ]
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            try:
-                price = float(match.replace(',', ''))
-                if 15 <= price <= 3000:  # Reasonable ammo price
-                    return price
-            except ValueError:
-                continue
-    return None
+    return extraction.extract_price(text, min_price=15, max_price=3000)  # Reasonable ammo price
 
 def extract_caliber(text):
     """Extract caliber from text"""
-    if not text:
-        return None
-    
-    text = text.upper()
-    caliber_patterns = {
-        '9MM': [r'9\s*MM', r'9X19', r'9\s*LUGER'],
-        '.223': [r'\.223', r'223\s*REM'],
-        '5.56': [r'5\.56', r'5\.56X45', r'5\.56\s*NATO'],
-        '.308': [r'\.308', r'308\s*WIN'],
-        '.45 ACP': [r'\.45\s*ACP', r'45\s*ACP'],
-        '.40 S&W': [r'\.40\s*S&W', r'40\s*S&W'],
-        '.380': [r'\.380', r'380\s*ACP'],
-        '22LR': [r'22\s*LR', r'\.22\s*LR'],
-        '7.62x39': [r'7\.62X39'],
-        '300 BLK': [r'300\s*BLK', r'300\s*BLACKOUT'],
-    }
-    
-    for standard, patterns in caliber_patterns.items():
-        for pattern in patterns:
-            if re.search(pattern, text):
-                return standard
-    return None
+    return extraction.extract_caliber(text)
 
 def extract_quantity(text):
     """Extract quantity from text"""
-    if not text:
-        return 50
-    
-    text_upper = text.upper()
-    patterns = [
-        r'(\d+)\s*ROUNDS?',
-        r'(\d+)\s*CT\b',
-        r'(\d+)\s*COUNT',
-        r'BOX\s*OF\s*(\d+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text_upper)
-        if match:
-            try:
-                qty = int(match.group(1))
-                if 10 <= qty <= 5000:
-                    return qty
-            except ValueError:
-                continue
-    
-    if 'CASE' in text_upper:
-        return 1000
-    elif 'BOX' in text_upper:
-        return 50
-    return 50
+    return extraction.extract_quantity(text, min_qty=10, max_qty=5000)
 
 def find_product_links_properly(html):
     """Find product links by targeting titles and images, not review buttons"""
@@ -237,8 +170,6 @@ def scrape_bulkammo_fixed():
         products = find_product_links_properly(html)
         all_products.extend(products)
         
-        time.sleep(3)  # Be respectful
-        
         if len(all_products) >= 12:
             break
     
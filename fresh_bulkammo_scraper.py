@@ -6,86 +6,43 @@ Gets 10 new/different products for manual verification
 
 import urllib.request
 import re
-import time
 import random
 from datetime import datetime
+from http_cache import cached_urlopen
+import extraction
+from stock_status import StockMatcher
 
 def make_request(url):
     """Make HTTP request"""
     try:
         ua = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         req = urllib.request.Request(url, headers={'User-Agent': ua})
-        response = urllib.request.urlopen(req, timeout=15)
-        return response.read().decode('utf-8', errors='ignore')
+        return cached_urlopen(req, timeout=15).text
     except Exception as e:
         print(f"❌ Error: {e}")
         return None
 
+# Out of stock indicators are checked first
+stock_matcher = StockMatcher(
+    out_of_stock=['out of stock', 'sold out', 'unavailable', 'backorder',
+                  'notify when available'],
+    in_stock=['add to cart', 'buy now', 'in stock', 'available'],
+)
+
 def detect_stock_status(html):
     """Detect stock status with improved logic"""
-    if not html:
+    in_stock = stock_matcher.is_in_stock(html)
+    if in_stock is None:
         return "Unknown"
-    
-    html_lower = html.lower()
-    
-    # Check for out of stock first
-    out_indicators = ['out of stock', 'sold out', 'unavailable', 'backorder', 'notify when available']
-    for indicator in out_indicators:
-        if indicator in html_lower:
-            return "OUT OF STOCK"
-    
-    # Check for in stock indicators
-    in_indicators = ['add to cart', 'buy now', 'in stock', 'available']
-    for indicator in in_indicators:
-        if indicator in html_lower:
-            return "IN STOCK"
-    
-    return "Unknown"
+    return "IN STOCK" if in_stock else "OUT OF STOCK"
 
 def extract_caliber(text):
     """Extract caliber from text"""
-    text = text.upper()
-    calibers = {
-        '9MM': ['9MM', '9 MM', '9X19', '9 LUGER'],
-        '.223': ['.223', '223 REM', '223 REMINGTON'],
-        '5.56': ['5.56', '5.56X45', '5.56 NATO'],
-        '.308': ['.308', '308 WIN', '308 WINCHESTER'],
-        '.45 ACP': ['.45 ACP', '45 ACP', '.45 AUTO'],
-        '.40 S&W': ['.40 S&W', '40 S&W', '.40 SW'],
-        '.380': ['.380', '380 ACP', '380 AUTO'],
-        '22LR': ['22LR', '.22 LR', '22 LONG RIFLE'],
-        '7.62x39': ['7.62X39', '7.62 X 39'],
-        '300 BLK': ['300 BLK', '300 BLACKOUT', '300 AAC'],
-        '6.5 CM': ['6.5 CM', '6.5 CREEDMOOR'],
-        '.30-06': ['.30-06', '30-06', '30.06'],
-        '12 GAUGE': ['12 GAUGE', '12GA', '12 GA'],
-        '20 GAUGE': ['20 GAUGE', '20GA', '20 GA'],
-    }
-    
-    for standard, variations in calibers.items():
-        for variation in variations:
-            if variation in text:
-                return standard
-    return "Unknown"
+    return extraction.extract_caliber(text, default="Unknown")
 
 def extract_quantity(text):
     """Extract quantity from text"""
-    patterns = [r'(\d+)\s*ROUNDS?', r'(\d+)\s*CT', r'(\d+)\s*COUNT', r'(\d+)\s*RDS?']
-    text_upper = text.upper()
-    
-    for pattern in patterns:
-        match = re.search(pattern, text_upper)
-        if match:
-            try:
-                return int(match.group(1))
-            except:
-                continue
-    
-    if 'CASE' in text_upper:
-        return 1000
-    elif 'BOX' in text_upper:
-        return 50
-    return 50
+    return extraction.extract_quantity(text)
 
 def scrape_fresh_products():
     """Scrape fresh products from BulkAmmo"""
@@ -179,10 +136,6 @@ def scrape_fresh_products():
             
             all_products.append(product)
             print(f"✅ Found: {caliber} - ${price}")
-            
-            time.sleep(1)  # Be respectful
-        
-        time.sleep(2)  # Between categories
     
     # Return first 10 unique products
     unique_products = []
@@ -0,0 +1,132 @@
+import lxml.html
+from lxml import etree
+from bs4 import BeautifulSoup
+
+from config import SCRAPING_CONFIG
+
+# Text nodes bs4's get_text() would return: script and style contents are skipped
+TEXT_XPATH = etree.XPath('.//text()[not(parent::script or parent::style)]')
+
+
+def _matches(value, expected):
+    """BeautifulSoup-style filter: True (present), regex (search), list (any of) or string (equal)"""
+    if expected is True:
+        return value is not None
+    if value is None:
+        return False
+    if hasattr(expected, 'search'):
+        return expected.search(value) is not None
+    if isinstance(expected, (list, tuple, set)):
+        return value in expected
+    return value == expected
+
+
+class LxmlNode:
+    """A BeautifulSoup-compatible view of an lxml element.
+
+    Covers the part of the Tag API the scrapers use: find/find_all by tag
+    name, class_, attributes and string, get_text, get, [] and name. Tag and
+    attribute-presence filtering runs as XPath inside lxml; only the value
+    checks run in Python.
+    """
+
+    def __init__(self, element):
+        self.element = element
+
+    @classmethod
+    def parse(cls, html):
+        if not html or not html.strip():
+            html = '<html></html>'
+        try:
+            return cls(lxml.html.document_fromstring(html))
+        except ValueError:
+            # Unicode strings with an encoding declaration must be parsed as bytes
+            return cls(lxml.html.document_fromstring(html.encode('utf-8')))
+
+    @property
+    def name(self):
+        return self.element.tag
+
+    @property
+    def attrs(self):
+        return dict(self.element.attrib)
+
+    def get(self, key, default=None):
+        return self.element.get(key, default)
+
+    def __getitem__(self, key):
+        return self.element.attrib[key]
+
+    def __str__(self):
+        return lxml.html.tostring(self.element, encoding='unicode')
+
+    def get_text(self, separator='', strip=False):
+        """Text of the element and its descendants, skipping scripts and styles like bs4 does"""
+        strings = TEXT_XPATH(self.element)
+        if strip:
+            strings = [s.strip() for s in strings if s.strip()]
+        return separator.join(strings)
+
+    @property
+    def text(self):
+        return self.get_text()
+
+    def find_all(self, name=None, attrs=None, recursive=True, string=None, limit=None, class_=None, text=None, **kwargs):
+        string = string if string is not None else text
+        attrs = dict(attrs or {}, **kwargs)
+        if class_ is not None:
+            attrs['class'] = class_
+
+        # Like bs4, a string filter with nothing else returns matching text nodes
+        if string is not None and name is None and not attrs:
+            results = [s for s in self.element.xpath('.//text()') if _matches(str(s), string)]
+            return [str(s) for s in results[:limit]]
+
+        names = [name] if isinstance(name, str) else None if name is True else name
+        axis = './/' if recursive else './'
+        xpath = ' | '.join(axis + tag for tag in (names or ['*']))
+        required = ''.join(f'[@{key}]' for key, value in attrs.items() if value is not None and value is not False)
+        if required:
+            xpath = f'({xpath}){required}' if len(names or []) > 1 else xpath + required
+
+        results = []
+        for element in self.element.xpath(xpath):
+            if not all(self._attr_matches(element, key, expected) for key, expected in attrs.items()):
+                continue
+            # bs4's .string only exists on tags without child tags
+            if string is not None and (len(element) or not _matches(element.text_content(), string)):
+                continue
+            results.append(LxmlNode(element))
+            if limit and len(results) >= limit:
+                break
+        return results
+
+    def find(self, name=None, attrs=None, recursive=True, string=None, **kwargs):
+        results = self.find_all(name, attrs, recursive, string, limit=1, **kwargs)
+        return results[0] if results else None
+
+    @staticmethod
+    def _attr_matches(element, key, expected):
+        value = element.get(key)
+        if expected is None:
+            return True
+        if expected is False:
+            return value is None
+        if key == 'class' and value is not None:
+            # Multi-valued: any single class may match, as may the whole attribute
+            return _matches(value, expected) or any(_matches(c, expected) for c in value.split())
+        return _matches(value, expected)
+
+
+PARSERS = {
+    'lxml': LxmlNode.parse,
+    'html.parser': lambda html: BeautifulSoup(html, 'html.parser'),
+}
+
+
+def parse_html(html, backend=None):
+    """Parse an HTML string with the named backend (SCRAPING_CONFIG['parser'] by default)"""
+    backend = backend or SCRAPING_CONFIG['parser']
+    if backend not in PARSERS:
+        raise ValueError(f"Unknown HTML parser backend: {backend} (choose from {', '.join(PARSERS)})")
+    return PARSERS[backend](html)
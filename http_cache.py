@@ -0,0 +1,305 @@
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from config import CACHE_CONFIG
+from rate_limiter import rate_limiter
+
+
+class FetchedResponse:
+    """Minimal response object exposing the parts of requests.Response the scrapers use"""
+
+    def __init__(self, url, status_code, text, headers=None, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        # True when the body was served from the on-disk cache (fresh hit or 304)
+        self.from_cache = from_cache
+
+    @property
+    def content(self):
+        return self.text.encode('utf-8')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception(f"HTTP {self.status_code} for {self.url}")
+
+
+class StaleCacheError(Exception):
+    """A server answered 304 Not Modified but the cached body it refers to is gone"""
+
+
+class ResponseCache:
+    """On-disk HTTP response cache with ETag / Last-Modified revalidation.
+
+    Bodies are stored gzip-compressed under their SHA-256, so identical pages
+    share one file; a small SQLite index maps URLs to bodies and validators.
+    The least recently used entries are evicted once the bodies exceed
+    CACHE_CONFIG['max_size_mb'].
+    """
+
+    def __init__(self, directory=None, max_size_mb=None, fresh_seconds=None, enabled=None):
+        self.directory = directory or CACHE_CONFIG['directory']
+        self.max_size = int((max_size_mb or CACHE_CONFIG['max_size_mb']) * 1024 * 1024)
+        self.fresh_seconds = CACHE_CONFIG['fresh_seconds'] if fresh_seconds is None else fresh_seconds
+        self.enabled = CACHE_CONFIG['enabled'] if enabled is None else enabled
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.Lock()
+        self._conn = None
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            os.makedirs(os.path.join(self.directory, 'bodies'), exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.directory, 'index.sqlite'), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    url TEXT PRIMARY KEY,
+                    body_hash TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    encoding TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_last_access ON entries (last_access)")
+            self._conn.commit()
+        return self._conn
+
+    def _body_path(self, body_hash):
+        return os.path.join(self.directory, 'bodies', body_hash[:2], f"{body_hash}.gz")
+
+    def lookup(self, url):
+        """Get the index entry for a URL, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body_hash, size, encoding, etag, last_modified, fetched_at FROM entries WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if not row:
+            return None
+        return dict(zip(('body_hash', 'size', 'encoding', 'etag', 'last_modified', 'fetched_at'), row))
+
+    def conditional_headers(self, entry):
+        """Revalidation headers for a cached entry"""
+        headers = {}
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load_body(self, entry):
+        """Read and decompress a cached body"""
+        with open(self._body_path(entry['body_hash']), 'rb') as fh:
+            return gzip.decompress(fh.read())
+
+    def store(self, url, body, headers=None, encoding=None):
+        """Store a 200 response body and its validators"""
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._body_path(body_hash)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as fh:
+                fh.write(gzip.compress(body))
+            os.replace(tmp_path, path)
+
+        now = time.time()
+        with self.lock:
+            previous = self.conn.execute("SELECT body_hash FROM entries WHERE url = ?", (url,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, body_hash, os.path.getsize(path), encoding,
+                 headers.get('etag'), headers.get('last-modified'), now, now)
+            )
+            self.conn.commit()
+            if previous and previous[0] != body_hash:
+                self._delete_unreferenced(previous[0])
+        self._evict()
+
+    def _touch(self, url, revalidated):
+        now = time.time()
+        with self.lock:
+            if revalidated:
+                self.conn.execute("UPDATE entries SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url))
+            else:
+                self.conn.execute("UPDATE entries SET last_access = ? WHERE url = ?", (now, url))
+            self.conn.commit()
+
+    def _delete_unreferenced(self, body_hash):
+        """Remove a body file once no URL points at it (caller holds the lock)"""
+        in_use = self.conn.execute("SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone()
+        if not in_use:
+            try:
+                os.remove(self._body_path(body_hash))
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_size"""
+        with self.lock:
+            # Bodies shared by several URLs only take up space once
+            total = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT body_hash, size FROM entries)"
+            ).fetchone()[0]
+            if total <= self.max_size:
+                return
+
+            for url, body_hash, size in self.conn.execute(
+                "SELECT url, body_hash, size FROM entries ORDER BY last_access"
+            ).fetchall():
+                self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                in_use = self.conn.execute(
+                    "SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)
+                ).fetchone()
+                if not in_use:
+                    total -= size
+                    self._delete_unreferenced(body_hash)
+                if total <= self.max_size:
+                    break
+            self.conn.commit()
+
+    def _is_fresh(self, entry):
+        return self.fresh_seconds > 0 and time.time() - entry['fetched_at'] < self.fresh_seconds
+
+    def _cached_response(self, url, entry, revalidated):
+        """Build a response from a cached body, or None if the body file is gone"""
+        try:
+            body = self.load_body(entry)
+        except OSError:
+            return None
+
+        self.hits += 1
+        if revalidated:
+            self.revalidations += 1
+        self._touch(url, revalidated)
+        text = body.decode(entry['encoding'] or 'utf-8', errors='ignore')
+        return FetchedResponse(url, 200, text, from_cache=True)
+
+    def begin(self, url):
+        """Start a fetch: returns (entry, fresh_response, conditional_headers).
+
+        fresh_response is set when the cached copy can be used without touching
+        the network; otherwise the caller sends its request with the returned
+        headers and passes the outcome to finish().
+        """
+        if not self.enabled:
+            return None, None, {}
+
+        entry = self.lookup(url)
+        if entry and self._is_fresh(entry):
+            response = self._cached_response(url, entry, revalidated=False)
+            if response:
+                return entry, response, {}
+        return entry, None, self.conditional_headers(entry)
+
+    def forget(self, url):
+        """Drop a URL's index entry so its next fetch is unconditional"""
+        with self.lock:
+            row = self.conn.execute("SELECT body_hash FROM entries WHERE url = ?", (url,)).fetchone()
+            self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self.conn.commit()
+            if row:
+                self._delete_unreferenced(row[0])
+
+    def finish(self, url, entry, status, body, headers=None, encoding=None):
+        """Complete a fetch started with begin(), turning a 304 into the cached body.
+
+        Raises StaleCacheError, after forgetting the entry, when a 304 refers
+        to a body that is no longer on disk; a bare 304 is never returned.
+        """
+        if status == 304:
+            response = self._cached_response(url, entry, revalidated=True) if entry else None
+            if response:
+                return response
+            if self.enabled:
+                self.forget(url)
+            raise StaleCacheError(f"304 for {url} but no cached body to serve")
+
+        if self.enabled:
+            self.misses += 1
+            if status == 200:
+                self.store(url, body, headers, encoding)
+
+        text = body.decode(encoding or 'utf-8', errors='ignore')
+        return FetchedResponse(url, status, text, headers)
+
+    def fetch(self, url, send):
+        """Fetch a URL through the cache.
+
+        send(extra_headers) performs the network request and returns
+        (status, body_bytes, headers, encoding). It is only called, after
+        waiting on the shared rate limiter, when the cached copy is missing or
+        stale.
+        """
+        entry, response, extra_headers = self.begin(url)
+        if response:
+            return response
+
+        rate_limiter.acquire(url)
+        status, body, headers, encoding = send(extra_headers)
+        try:
+            return self.finish(url, entry, status, body, headers, encoding)
+        except StaleCacheError:
+            # The entry is gone now; ask again without validators
+            self.logger.warning(f"Cached body for {url} missing after 304; refetching")
+            rate_limiter.acquire(url)
+            status, body, headers, encoding = send({})
+            return self.finish(url, None, status, body, headers, encoding)
+
+    def get_stats(self):
+        """Hit/miss counters for this process"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'hit_rate': round(self.hits / total * 100, 1) if total else 0.0,
+        }
+
+
+def cached_urlopen(req, timeout=15):
+    """urllib equivalent of urlopen + read + gzip decode, going through the shared cache.
+
+    Returns a FetchedResponse; HTTP errors other than 304 propagate as usual.
+    """
+    def send(extra_headers):
+        # A resend after a stale 304 must not carry the earlier validators
+        for name in ('If-None-Match', 'If-Modified-Since'):
+            req.remove_header(name.capitalize())
+        for name, value in extra_headers.items():
+            req.add_header(name, value)
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                content = response.read()
+                if response.info().get('Content-Encoding') == 'gzip':
+                    content = gzip.decompress(content)
+                return response.status, content, dict(response.info()), response.info().get_content_charset()
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return 304, b'', dict(e.headers), None
+            raise
+
+    return response_cache.fetch(req.full_url, send)
+
+
+# Initialize shared response cache
+response_cache = ResponseCache()
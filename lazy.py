@@ -0,0 +1,40 @@
+import threading
+
+
+class LazySingleton:
+    """Module-level singleton built on first attribute access.
+
+    `from database import db_manager` keeps working unchanged, but the
+    object behind it (and whatever its constructor connects to or loads)
+    is only created when something actually uses it.
+    """
+
+    def __init__(self, factory, *args, **kwargs):
+        object.__setattr__(self, '_factory', lambda: factory(*args, **kwargs))
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _get_instance(self):
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, '_instance', instance)
+        return instance
+
+    @property
+    def is_initialized(self):
+        return self._instance is not None
+
+    def __getattr__(self, name):
+        return getattr(self._get_instance(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._get_instance(), name, value)
+
+    def __repr__(self):
+        if self._instance is None:
+            return "<LazySingleton (not yet built)>"
+        return repr(self._instance)
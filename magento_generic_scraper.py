@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Generic Magento Catalogue Scraper
+Pulls every configured Magento 2 store's catalogue through the GraphQL
+`products` query instead of paging HTML category listings
+"""
+
+from catalog_adapters import MagentoCatalog, scrape_stores
+from config import CATALOG_CONFIG
+from http_cache import response_cache
+
+def main():
+    """Main function"""
+    print("🚀 Starting Magento catalogue scraper")
+    scrape_stores(MagentoCatalog, CATALOG_CONFIG['magento_stores'], 'magento_prices.csv')
+    print(f"HTTP cache: {response_cache.get_stats()}")
+
+if __name__ == "__main__":
+    main()
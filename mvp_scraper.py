@@ -13,6 +13,8 @@ import time
 import random
 from datetime import datetime
 from html.parser import HTMLParser
+from http_cache import cached_urlopen
+import extraction
 
 class SimpleAmmoParser(HTMLParser):
     """Simple HTML parser to extract product data"""
@@ -83,9 +85,9 @@ class MVPScraper:
             req.add_header('User-Agent', random.choice(self.user_agents))
             req.add_header('Accept', 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8')
             
-            with urllib.request.urlopen(req, timeout=15) as response:
-                if response.status == 200:
-                    return response.read().decode('utf-8', errors='ignore')
+            response = cached_urlopen(req, timeout=15)
+            if response.status_code == 200:
+                return response.text
             return None
         except Exception as e:
             print(f"Request failed for {url}: {e}")
@@ -93,68 +95,15 @@ class MVPScraper:
     
     def extract_price(self, price_text):
         """Extract price from text"""
-        if not price_text:
-            return None
-        
-        # Find price pattern
-        price_match = re.search(r'\$([0-9,]+\.?[0-9]*)', price_text)
-        if price_match:
-            try:
-                return float(price_match.group(1).replace(',', ''))
-            except ValueError:
-                pass
-        return None
+        return extraction.extract_price(price_text)
     
     def extract_caliber(self, text):
         """Extract caliber from text"""
-        if not text:
-            return None
-        
-        text = text.upper()
-        
-        # Common calibers
-        calibers = {
-            '9MM': ['9MM', '9 MM', '9X19'],
-            '.223': ['.223', '223 REM'],
-            '5.56': ['5.56', '5.56X45', '5.56 NATO'],
-            '.308': ['.308', '308 WIN'],
-            '.45 ACP': ['.45 ACP', '45 ACP'],
-            '.40 S&W': ['.40 S&W', '40 S&W'],
-            '.380': ['.380', '380 ACP'],
-            '22LR': ['22LR', '.22 LR', '22 LONG RIFLE'],
-        }
-        
-        for standard, variations in calibers.items():
-            for variation in variations:
-                if variation in text:
-                    return standard
-        
-        return None
+        return extraction.extract_caliber(text)
     
     def extract_quantity(self, text):
         """Extract quantity from text"""
-        if not text:
-            return None
-        
-        # Look for quantity patterns
-        patterns = [
-            r'(\d+)\s*ROUNDS?',
-            r'(\d+)\s*CT',
-            r'(\d+)\s*COUNT',
-            r'BOX OF (\d+)',
-            r'(\d+)/BOX',
-        ]
-        
-        text_upper = text.upper()
-        for pattern in patterns:
-            match = re.search(pattern, text_upper)
-            if match:
-                try:
-                    return int(match.group(1))
-                except ValueError:
-                    continue
-        
-        return 50  # Default assumption
+        return extraction.extract_quantity(text, keywords=False)  # Default assumption: 50
     
     def scrape_ammoseek_api(self):
         """Scrape using a simple approach - look for public data"""
@@ -331,9 +280,6 @@ Status: {stock_status}
         # Try to get some real data
         real_count = self.scrape_gun_deals_reddit()
         
-        # Add small delay to be respectful
-        time.sleep(1)
-        
         print(f"\n📊 Scraping completed!")
         print(f"Sample products: {sample_count}")
         print(f"Real deals found: {real_count}")
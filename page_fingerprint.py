@@ -0,0 +1,129 @@
+import functools
+import hashlib
+import importlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+from config import CACHE_CONFIG
+
+# Markup that changes on every request without the products changing
+VOLATILE_PATTERNS = [
+    r'<!--.*?-->',  # Comments (render timings, cache keys)
+    r'<input[^>]+name=["\'](?:form_key|_token|csrf[^"\']*|authenticity_token)["\'][^>]*>',
+    r'<meta[^>]+name=["\']csrf-[^"\']*["\'][^>]*>',
+    r'\s(?:nonce|data-csrf|data-token|data-timestamp|data-time)=["\'][^"\']*["\']',
+    r'["\'](?:form_key|formKey|csrf_token|csrfToken|nonce)["\']\s*:\s*["\'][^"\']*["\']',
+    r'/(?:form_key|uenc)/[^/"\']+',  # Magento add-to-cart URLs
+    r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?',  # ISO timestamps
+    r'\b1\d{9}(?:\d{3})?\b',  # Unix timestamps (seconds or milliseconds)
+]
+
+# Shared extraction code: a change to any of these files invalidates every remembered page
+EXTRACTOR_MODULES = ['extraction', 'structured_data', 'stock_status', 'html_parsers', 'catalog_adapters', 'utils']
+
+# Bump to invalidate remembered records after a change the hashed sources do not cover
+EXTRACTOR_VERSION = 1
+
+VOLATILE_REGEX = re.compile('|'.join(VOLATILE_PATTERNS), re.IGNORECASE | re.DOTALL)
+WHITESPACE_REGEX = re.compile(r'\s+')
+
+
+def normalize_html(html):
+    """Strip volatile tokens and collapse whitespace so equivalent pages compare equal"""
+    return WHITESPACE_REGEX.sub(' ', VOLATILE_REGEX.sub('', html))
+
+
+@functools.lru_cache(maxsize=None)
+def extractor_salt(extractor=None):
+    """Hash of EXTRACTOR_VERSION and the source of the extraction modules (plus the
+    caller's own module, by name), so records extracted by older code never match"""
+    digest = hashlib.sha256(str(EXTRACTOR_VERSION).encode())
+    for name in EXTRACTOR_MODULES + ([extractor] if extractor else []):
+        module = sys.modules.get(name) or importlib.import_module(name)
+        path = getattr(module, '__file__', None)
+        if path:
+            with open(path, 'rb') as fh:
+                digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def fingerprint_html(html, extractor=None):
+    """SHA-256 of the normalized page, salted with the extractor code that parses it"""
+    digest = hashlib.sha256(extractor_salt(extractor).encode())
+    digest.update(normalize_html(html).encode('utf-8', errors='ignore'))
+    return digest.hexdigest()
+
+
+class FingerprintStore:
+    """Remembers, per URL, the fingerprint of the last page seen and the
+    product records extracted from it, so unchanged pages are not re-parsed"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(CACHE_CONFIG['directory'], 'fingerprints.sqlite')
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.Lock()
+        self._conn = None
+
+        # Statistics
+        self.reused = 0
+        self.parsed = 0
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    fingerprint TEXT NOT NULL,
+                    records TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def lookup(self, url, html, extractor=None):
+        """Fingerprint a page and return (fingerprint, records).
+
+        records is the list extracted last time if neither the page nor the
+        extraction code (the shared modules and the `extractor` module name,
+        usually the caller's __name__) changed; otherwise None and the caller
+        should parse the page and remember() it.
+        """
+        fingerprint = fingerprint_html(html, extractor)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT fingerprint, records FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+
+        if row and row[0] == fingerprint:
+            self.reused += 1
+            return fingerprint, json.loads(row[1])
+
+        self.parsed += 1
+        return fingerprint, None
+
+    def remember(self, url, fingerprint, records):
+        """Store the records extracted from a page with the given fingerprint"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                (url, fingerprint, json.dumps(records), time.time())
+            )
+            self.conn.commit()
+
+    def get_stats(self):
+        """Reused/parsed page counters for this process"""
+        return {'reused': self.reused, 'parsed': self.parsed}
+
+
+# Initialize shared fingerprint store
+page_fingerprints = FingerprintStore()
@@ -0,0 +1,168 @@
+import asyncio
+import atexit
+import logging
+import threading
+
+from config import PLAYWRIGHT_CONFIG, SCRAPING_CONFIG
+from http_cache import FetchedResponse
+from rate_limiter import rate_limiter, retry_delay
+from utils import scraping_utils
+
+
+class PlaywrightRenderer:
+    """Render JavaScript-heavy pages with one Chromium process and several
+    isolated browser contexts, so pages render concurrently.
+
+    Playwright objects belong to the event loop that created them, so the
+    browser lives on a dedicated background loop; synchronous callers use
+    render() and asyncio callers on any loop use render_async() / fetch_all().
+    """
+
+    def __init__(self, contexts=None, allowed_resource_types=None, retries=None):
+        self.context_count = contexts or PLAYWRIGHT_CONFIG['contexts']
+        self.allowed_resource_types = set(allowed_resource_types or PLAYWRIGHT_CONFIG['allowed_resource_types'])
+        self.retries = SCRAPING_CONFIG['retries'] if retries is None else retries
+        self.logger = logging.getLogger(__name__)
+
+        self.lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._browser = None
+        self._contexts = None
+
+        # Statistics
+        self.pages_rendered = 0
+        self.requests_blocked = 0
+
+    def _ensure_started(self):
+        """Start the background loop and browser on first use"""
+        with self.lock:
+            if self._loop:
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='playwright-renderer', daemon=True)
+            thread.start()
+            try:
+                asyncio.run_coroutine_threadsafe(self._start(), loop).result()
+            except Exception:
+                loop.call_soon_threadsafe(loop.stop)
+                raise
+
+            self._loop, self._thread = loop, thread
+            return loop
+
+    async def _start(self):
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        self._contexts = asyncio.Queue()
+
+        for _ in range(self.context_count):
+            context = await self._browser.new_context(user_agent=scraping_utils.get_random_user_agent())
+            await context.route('**/*', self._route)
+            self._contexts.put_nowait(context)
+
+        self.logger.info(f"Started Chromium with {self.context_count} contexts")
+
+    async def _route(self, route):
+        """Only let the document and the requests that build its data through"""
+        if route.request.resource_type in self.allowed_resource_types:
+            await route.continue_()
+        else:
+            self.requests_blocked += 1
+            await route.abort()
+
+    async def _render(self, url):
+        """Render a page in the next free context (runs on the renderer loop)"""
+        context = await self._contexts.get()
+        page = await context.new_page()
+        try:
+            response = await page.goto(
+                url,
+                wait_until=PLAYWRIGHT_CONFIG['wait_until'],
+                timeout=SCRAPING_CONFIG['timeout'] * 1000
+            )
+            status = response.status if response else 200
+            html = await page.content()
+            self.pages_rendered += 1
+            return FetchedResponse(page.url, status, html)
+        finally:
+            await page.close()
+            self._contexts.put_nowait(context)
+
+    def render(self, url):
+        """Render a page, blocking the calling thread"""
+        loop = self._ensure_started()
+        rate_limiter.acquire(url)
+        return asyncio.run_coroutine_threadsafe(self._render(url), loop).result()
+
+    async def render_async(self, url):
+        """Render a page from a coroutine running on any event loop"""
+        loop = self._ensure_started()
+        await rate_limiter.acquire_async(url)
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._render(url), loop))
+
+    async def _render_or_error(self, url):
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self.render_async(url)
+                response.raise_for_status()
+                return url, response
+            except Exception as e:
+                self.logger.warning(f"Render attempt {attempt + 1} failed for {url}: {e}")
+                if attempt >= self.retries:
+                    return url, e
+                await asyncio.sleep(retry_delay(attempt))
+
+    async def fetch_all(self, urls):
+        """Render all URLs concurrently (bounded by the number of contexts),
+        yielding (url, response) pairs as they complete.
+
+        Same contract as AsyncFetcher.fetch_all: failed URLs are yielded with
+        the final exception in place of a response.
+        """
+        # Start the browser before fanning out so tasks don't race to launch it
+        await asyncio.get_running_loop().run_in_executor(None, self._ensure_started)
+
+        tasks = [asyncio.ensure_future(self._render_or_error(url)) for url in urls]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _close(self):
+        while not self._contexts.empty():
+            await self._contexts.get_nowait().close()
+        await self._browser.close()
+        await self._playwright.stop()
+
+    def get_stats(self):
+        """Rendering counters for this process"""
+        return {
+            'contexts': self.context_count,
+            'pages_rendered': self.pages_rendered,
+            'requests_blocked': self.requests_blocked,
+        }
+
+    def shutdown(self):
+        """Close the browser and stop the background loop"""
+        with self.lock:
+            loop, self._loop = self._loop, None
+        if not loop:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), loop).result(timeout=10)
+        except Exception as e:
+            self.logger.debug(f"Error closing Playwright: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+
+
+# Initialize shared renderer (the browser starts on first render)
+playwright_renderer = PlaywrightRenderer()
+atexit.register(playwright_renderer.shutdown)
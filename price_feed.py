@@ -0,0 +1,212 @@
+"""
+Pre-sharded JSON feed of the master price feed for admin_dashboard.html.
+
+combine_prices.py publishes `price_feed/` next to all_prices.csv:
+
+    price_feed/manifest.json            totals, facet counts and shard filenames
+    price_feed/shards/_cheapest-<hash>.json
+    price_feed/shards/<caliber>-<hash>.json
+    price_feed/shards/<caliber>--<retailer>-<hash>.json
+
+There is one shard per caliber and one per caliber/retailer pair, plus a
+small `_cheapest` shard with the CHEAPEST_ROWS cheapest rows overall that the
+dashboard shows until a facet is picked. Each is pre-sorted by
+price_per_round (unpriced rows last) and stored as
+{"columns": [...], "rows": [[...], ...]}. Shard filenames embed a hash of
+their content, so an unchanged shard keeps its name across runs and can be
+served with `Cache-Control: immutable`; only manifest.json has to be
+revalidated. Shards the new manifest no longer references are removed.
+
+Rows are staged in a temporary SQLite table so memory is bounded by the
+largest shard, not the whole feed.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+FEED_DIR = Path("price_feed")
+# Stand-in for an empty caliber or retailer, shared with price_snapshot so
+# the feed and the snapshot group such rows the same way (and "" stays "All")
+UNKNOWN = "unknown"
+SHARD_DIR_NAME = "shards"
+MANIFEST_NAME = "manifest.json"
+# Rows in the default (no facet picked) shard
+CHEAPEST_ROWS = 200
+
+# Shard column order, matching the dashboard table
+COLUMNS = [
+    "name",
+    "caliber",
+    "price",
+    "quantity",
+    "price_per_round",
+    "retailer",
+    "source",
+    "in_stock",
+    "url",
+    "scraped_at",
+]
+
+
+def _float(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _int(value: str) -> Optional[int]:
+    number = _float(value)
+    return int(number) if number is not None else None
+
+
+def slugify(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-") or UNKNOWN
+
+
+def _stage(conn: sqlite3.Connection, rows: Iterable[List[str]], columns: List[str]):
+    """Load the feed rows, typed, into a temporary table"""
+    index = {col: i for i, col in enumerate(columns)}
+    conn.execute("""
+        CREATE TEMP TABLE feed (
+            name TEXT, caliber TEXT, price REAL, quantity INTEGER, price_per_round REAL,
+            retailer TEXT, source TEXT, in_stock INTEGER, url TEXT, scraped_at TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO feed VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                row[index["name"]],
+                row[index["caliber"]] or UNKNOWN,
+                _float(row[index["price"]]),
+                _int(row[index["quantity"]]),
+                _float(row[index["price_per_round"]]),
+                row[index["retailer"]] or UNKNOWN,
+                row[index["source"]],
+                row[index["in_stock"]] == "True",
+                row[index["url"]],
+                row[index["scraped_at"]],
+            )
+            for row in rows
+        ),
+    )
+
+
+def _write_shard(shard_dir: Path, stem: str, rows: List[tuple]) -> str:
+    """Write one shard under a content-hashed name (skipped if it already exists); returns the filename"""
+    body = json.dumps(
+        {
+            "columns": COLUMNS,
+            "rows": [
+                [name, caliber, price or 0, quantity or 0, ppr or 0, retailer, source, bool(in_stock), url, scraped_at]
+                for name, caliber, price, quantity, ppr, retailer, source, in_stock, url, scraped_at in rows
+            ],
+        },
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+    filename = f"{stem}-{hashlib.sha256(body).hexdigest()[:12]}.json"
+    path = shard_dir / filename
+    if not path.exists():
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, path)
+    return filename
+
+
+def shard_files(manifest: Dict) -> Set[str]:
+    """Every shard filename a manifest references"""
+    files = {manifest["cheapest"]["file"]}
+    files.update(entry["file"] for entry in manifest["calibers"].values())
+    files.update(
+        retailer["file"] for entry in manifest["calibers"].values() for retailer in entry["retailers"].values()
+    )
+    return files
+
+
+def write_feed(rows: Iterable[List[str]], columns: List[str], directory: Path = FEED_DIR) -> Dict:
+    """Publish the sharded feed for the given rows (lists in `columns` order); returns the manifest"""
+    shard_dir = directory / SHARD_DIR_NAME
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect("")
+    try:
+        _stage(conn, rows, columns)
+        order = "price_per_round IS NULL, price_per_round, price"
+
+        total, in_stock, avg_ppr, last_updated = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(in_stock), 0), AVG(COALESCE(price_per_round, 0)), MAX(scraped_at) FROM feed"
+        ).fetchone()
+        manifest = {
+            "generated_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+            "total": total,
+            "in_stock": in_stock,
+            "avg_price_per_round": round(avg_ppr or 0, 4),
+            "last_updated": last_updated,
+            "retailers": {
+                retailer: count
+                for retailer, count in conn.execute(
+                    "SELECT retailer, COUNT(*) FROM feed GROUP BY retailer ORDER BY retailer"
+                )
+            },
+            "calibers": {},
+        }
+
+        # The leading underscore keeps it apart from slugify()'d caliber names
+        cheapest = conn.execute(f"SELECT * FROM feed ORDER BY {order} LIMIT ?", (CHEAPEST_ROWS,)).fetchall()
+        manifest["cheapest"] = {"count": len(cheapest), "file": _write_shard(shard_dir, "_cheapest", cheapest)}
+
+        calibers = conn.execute(
+            "SELECT caliber, COUNT(*), SUM(in_stock) FROM feed GROUP BY caliber ORDER BY caliber"
+        ).fetchall()
+        for caliber, count, caliber_in_stock in calibers:
+            stem = slugify(caliber)
+            entry = {
+                "count": count,
+                "in_stock": caliber_in_stock,
+                "file": _write_shard(
+                    shard_dir, stem,
+                    conn.execute(f"SELECT * FROM feed WHERE caliber = ? ORDER BY {order}", (caliber,)).fetchall(),
+                ),
+                "retailers": {},
+            }
+            retailers = conn.execute(
+                "SELECT retailer, COUNT(*) FROM feed WHERE caliber = ? GROUP BY retailer ORDER BY retailer", (caliber,)
+            ).fetchall()
+            for retailer, retailer_count in retailers:
+                if retailer_count == count:
+                    # Single-retailer caliber: the retailer shard would be byte-identical
+                    entry["retailers"][retailer] = {"count": count, "file": entry["file"]}
+                    continue
+                entry["retailers"][retailer] = {
+                    "count": retailer_count,
+                    "file": _write_shard(
+                        shard_dir, f"{stem}--{slugify(retailer)}",
+                        conn.execute(
+                            f"SELECT * FROM feed WHERE caliber = ? AND retailer = ? ORDER BY {order}",
+                            (caliber, retailer),
+                        ).fetchall(),
+                    ),
+                }
+            manifest["calibers"][caliber] = entry
+    finally:
+        conn.close()
+
+    manifest_path = directory / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, manifest_path)
+
+    # Old shards are dropped only after the manifest stops pointing at them
+    referenced = shard_files(manifest)
+    for path in shard_dir.iterdir():
+        if path.name not in referenced:
+            path.unlink()
+
+    return manifest
@@ -0,0 +1,148 @@
+"""
+Typed, compressed Parquet snapshot of the master price feed.
+
+combine_prices.py writes `prices_snapshot/` next to all_prices.csv: one
+zstd-compressed Parquet dataset, hive-partitioned by caliber and scrape date,
+with price/price_per_round as floats, quantity as an integer, in_stock as a
+boolean and scraped_at as a timestamp. Readers ask for the columns and rows
+they need and pyarrow only opens the matching partitions and column chunks:
+
+    from price_snapshot import read_snapshot
+    df = read_snapshot(columns=['retailer', 'price_per_round'],
+                       filter=(ds.field('caliber') == '9mm') & ds.field('in_stock'))
+
+pyarrow is optional: without it the snapshot is skipped and readers fall
+back to the CSV.
+"""
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from price_feed import UNKNOWN
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # pragma: no cover - optional dependency
+    pa = ds = None
+
+SNAPSHOT_DIR = Path("prices_snapshot")
+BATCH_ROWS = 50_000
+
+# Feed columns (combine_prices.COLUMNS) and their Arrow types; scraped_date is derived
+SCHEMA = pa.schema([
+    ("name", pa.string()),
+    ("caliber", pa.string()),
+    ("price", pa.float64()),
+    ("quantity", pa.int32()),
+    ("price_per_round", pa.float64()),
+    ("retailer", pa.string()),
+    ("source", pa.string()),
+    ("in_stock", pa.bool_()),
+    ("url", pa.string()),
+    ("scraped_at", pa.timestamp("s")),
+    ("scraped_date", pa.date32()),
+]) if pa else None
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("caliber", pa.string()), ("scraped_date", pa.date32())]), flavor="hive"
+) if pa else None
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def _float(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _int(value: str) -> Optional[int]:
+    number = _float(value)
+    return int(number) if number is not None else None
+
+
+def _bool(value: str) -> Optional[bool]:
+    return {"True": True, "False": False}.get(value)
+
+
+def _timestamp(value: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _batches(rows: Iterable[List[str]], columns: List[str]) -> Iterable["pa.RecordBatch"]:
+    """Typed record batches of BATCH_ROWS feed rows (lists in `columns` order)"""
+    index = {col: i for i, col in enumerate(columns)}
+    chunk: List[List[str]] = []
+
+    def convert(chunk):
+        scraped_at = [_timestamp(row[index["scraped_at"]]) for row in chunk]
+        arrays = {
+            "name": [row[index["name"]] for row in chunk],
+            "caliber": [row[index["caliber"]] or UNKNOWN for row in chunk],
+            "price": [_float(row[index["price"]]) for row in chunk],
+            "quantity": [_int(row[index["quantity"]]) for row in chunk],
+            "price_per_round": [_float(row[index["price_per_round"]]) for row in chunk],
+            "retailer": [row[index["retailer"]] or UNKNOWN for row in chunk],
+            "source": [row[index["source"]] or None for row in chunk],
+            "in_stock": [_bool(row[index["in_stock"]]) for row in chunk],
+            "url": [row[index["url"]] for row in chunk],
+            "scraped_at": scraped_at,
+            "scraped_date": [ts.date() if ts else None for ts in scraped_at],
+        }
+        return pa.RecordBatch.from_pydict(arrays, schema=SCHEMA)
+
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= BATCH_ROWS:
+            yield convert(chunk)
+            chunk = []
+    if chunk:
+        yield convert(chunk)
+
+
+def write_snapshot(rows: Iterable[List[str]], columns: List[str], directory: Path = SNAPSHOT_DIR) -> bool:
+    """Replace the snapshot with the given feed rows, streamed in batches. Returns False without pyarrow."""
+    if not available():
+        return False
+
+    tmp_dir = directory.with_name(directory.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    ds.write_dataset(
+        _batches(rows, columns),
+        tmp_dir,
+        schema=SCHEMA,
+        format="parquet",
+        partitioning=PARTITIONING,
+        file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+        max_rows_per_group=BATCH_ROWS,
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+    # Swap the finished snapshot in; readers never see a half-written one
+    old_dir = directory.with_name(directory.name + ".old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if directory.exists():
+        os.replace(directory, old_dir)
+    os.replace(tmp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return True
+
+
+def open_snapshot(directory: Path = SNAPSHOT_DIR) -> "ds.Dataset":
+    return ds.dataset(directory, format="parquet", partitioning=PARTITIONING)
+
+
+def read_snapshot(columns: Optional[List[str]] = None, filter=None, directory: Path = SNAPSHOT_DIR):
+    """pandas DataFrame of the requested columns and rows, or None if there is no snapshot"""
+    if not available() or not directory.exists():
+        return None
+    return open_snapshot(directory).to_table(columns=columns, filter=filter).to_pandas()
@@ -10,66 +10,30 @@ import re
 import time
 import random
 from datetime import datetime
+from http_cache import cached_urlopen
+import extraction
 
 def make_request(url):
     """Make HTTP request"""
     try:
         ua = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         req = urllib.request.Request(url, headers={'User-Agent': ua})
-        response = urllib.request.urlopen(req, timeout=15)
-        return response.read().decode('utf-8', errors='ignore')
+        return cached_urlopen(req, timeout=15).text
     except Exception as e:
         print(f"❌ Error fetching {url}: {e}")
         return None
 
 def extract_price(text):
     """Extract price from text"""
-    matches = re.findall(r'\$([0-9,]+\.?[0-9]*)', text)
-    for match in matches:
-        try:
-            price = float(match.replace(',', ''))
-            if 10 <= price <= 5000:  # Reasonable range
-                return price
-        except ValueError:
-            continue
-    return None
+    return extraction.extract_price(text, min_price=10, max_price=5000)  # Reasonable range
 
 def extract_caliber(text):
     """Extract caliber"""
-    text = text.upper()
-    calibers = {
-        '9MM': ['9MM', '9 MM', '9X19'],
-        '.223': ['.223', '223 REM'],
-        '5.56': ['5.56', '5.56X45'],
-        '.308': ['.308', '308 WIN'],
-        '.45 ACP': ['.45 ACP', '45 ACP'],
-        '22LR': ['22LR', '.22 LR'],
-    }
-    
-    for standard, variations in calibers.items():
-        for variation in variations:
-            if variation in text:
-                return standard
-    return None
+    return extraction.extract_caliber(text)
 
 def extract_quantity(text):
     """Extract quantity"""
-    patterns = [r'(\d+)\s*ROUNDS?', r'(\d+)\s*CT', r'(\d+)\s*COUNT']
-    text_upper = text.upper()
-    
-    for pattern in patterns:
-        match = re.search(pattern, text_upper)
-        if match:
-            try:
-                qty = int(match.group(1))
-                if 1 <= qty <= 10000:
-                    return qty
-            except ValueError:
-                continue
-    
-    if 'CASE' in text_upper:
-        return 1000
-    return 50
+    return extraction.extract_quantity(text)
 
 def scrape_bulkammo_products():
     """Scrape BulkAmmo and get individual product URLs"""
@@ -158,9 +122,6 @@ def scrape_bulkammo_products():
         products.append(product)
         print(f"✅ Product {i}: {caliber} - ${price} (${product['price_per_round']}/round)")
         print(f"   🔗 URL: {product_url}")
-        
-        # Be respectful - delay between requests
-        time.sleep(2)
     
     return products
 
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from config import RATE_LIMIT_CONFIG, SCRAPING_CONFIG
+
+
+class TokenBucket:
+    """Token bucket allowing `burst` back-to-back requests, refilled at `rate` tokens per second"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how many seconds the caller must wait before using it.
+
+        Tokens may go negative, so concurrent callers queue up behind each
+        other instead of all waking at the same instant.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+def retry_delay(attempt):
+    """Seconds to wait after failed attempt number `attempt` (0-based): exponential with jitter.
+
+    Separate from the token bucket, which only paces new requests; this
+    keeps retries against an erroring or throttling host from going out
+    back-to-back.
+    """
+    delay = min(SCRAPING_CONFIG['retry_backoff'] * 2 ** attempt, SCRAPING_CONFIG['retry_backoff_max'])
+    return delay * random.uniform(0.5, 1.0)
+
+
+class DomainRateLimiter:
+    """Per-domain request pacing shared by every scraper in the process"""
+
+    def __init__(self, requests_per_second=None, burst=None, domains=None):
+        self.requests_per_second = requests_per_second or RATE_LIMIT_CONFIG['requests_per_second']
+        self.burst = burst or RATE_LIMIT_CONFIG['burst']
+        self.domains = RATE_LIMIT_CONFIG['domains'] if domains is None else domains
+        self.buckets = {}
+        self.waited = {}
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def _get_domain(self, url):
+        return (urlparse(url).hostname or url).lower()
+
+    def _get_bucket(self, domain):
+        """Get or create the bucket for a domain, applying any per-domain overrides"""
+        with self.lock:
+            if domain not in self.buckets:
+                override = self.domains.get(domain, {})
+                self.buckets[domain] = TokenBucket(
+                    override.get('requests_per_second', self.requests_per_second),
+                    override.get('burst', self.burst)
+                )
+                self.waited[domain] = 0.0
+            return self.buckets[domain]
+
+    def _reserve(self, url):
+        domain = self._get_domain(url)
+        wait = self._get_bucket(domain).reserve()
+        if wait:
+            self.waited[domain] += wait
+            self.logger.debug(f"Rate limit for {domain}: waiting {wait:.2f}s")
+        return wait
+
+    def acquire(self, url):
+        """Block until a request to the URL's domain is within budget"""
+        wait = self._reserve(url)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url):
+        """Non-blocking equivalent of acquire for asyncio callers"""
+        wait = self._reserve(url)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def get_stats(self):
+        """Total seconds spent waiting, per domain"""
+        return {domain: round(waited, 2) for domain, waited in self.waited.items()}
+
+
+# Initialize shared rate limiter
+rate_limiter = DomainRateLimiter()
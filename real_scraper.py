@@ -13,8 +13,21 @@ import time
 import random
 from datetime import datetime
 from html.parser import HTMLParser
+from http_cache import cached_urlopen
+import extraction
+from stock_status import StockMatcher
 
 class RealAmmoScraper:
+    stock_matcher = StockMatcher(
+        out_of_stock=['OUT OF STOCK', 'SOLD OUT', 'UNAVAILABLE', 'BACKORDER',
+                      'NOTIFY WHEN AVAILABLE', 'EMAIL WHEN AVAILABLE',
+                      'TEMPORARILY UNAVAILABLE', 'DISCONTINUED',
+                      'NO LONGER AVAILABLE'],
+        in_stock=['IN STOCK', 'AVAILABLE', 'ADD TO CART', 'BUY NOW',
+                  'PURCHASE', 'ORDER NOW', 'SHIPS', 'READY TO SHIP',
+                  'IMMEDIATE SHIPPING', 'QUICK SHIP'],
+    )
+    
     def __init__(self):
         self.products = []
         self.user_agents = [
@@ -36,17 +49,11 @@ class RealAmmoScraper:
             req.add_header('Connection', 'keep-alive')
             req.add_header('Upgrade-Insecure-Requests', '1')
             
-            with urllib.request.urlopen(req, timeout=15) as response:
-                if response.status == 200:
-                    # Handle gzip encoding
-                    content = response.read()
-                    if response.info().get('Content-Encoding') == 'gzip':
-                        import gzip
-                        content = gzip.decompress(content)
-                    
-                    return content.decode('utf-8', errors='ignore')
-                else:
-                    print(f"⚠ HTTP {response.status} for {url}")
+            response = cached_urlopen(req, timeout=15)
+            if response.status_code == 200:
+                return response.text
+            else:
+                print(f"⚠ HTTP {response.status_code} for {url}")
             return None
             
         except Exception as e:
@@ -55,129 +62,28 @@ class RealAmmoScraper:
     
     def extract_price(self, text):
         """Extract price from text"""
-        if not text:
-            return None
-        
-        # Multiple price patterns
-        patterns = [
-            r'\$([0-9,]+\.?[0-9]*)',  # $24.99
-            r'([0-9,]+\.?[0-9]*)\s*dollars?',  # 24.99 dollars
-            r'Price[:\s]*\$?([0-9,]+\.?[0-9]*)',  # Price: $24.99
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    price_str = match.group(1).replace(',', '')
-                    price = float(price_str)
-                    if 0.1 <= price <= 10000:  # Reasonable price range
-                        return price
-                except ValueError:
-                    continue
-        return None
+        return extraction.extract_price(text)
     
     def extract_caliber(self, text):
         """Extract caliber from text"""
-        if not text:
-            return None
-        
-        text = text.upper()
-        
-        # Comprehensive caliber patterns
-        caliber_patterns = {
-            '9MM': [r'9\s*MM', r'9X19', r'9\s*LUGER', r'9\s*PARA'],
-            '.223': [r'\.223', r'223\s*REM', r'223\s*REMINGTON'],
-            '5.56': [r'5\.56', r'5\.56X45', r'5\.56\s*NATO'],
-            '.308': [r'\.308', r'308\s*WIN', r'308\s*WINCHESTER', r'7\.62X51'],
-            '.45 ACP': [r'\.45\s*ACP', r'45\s*ACP', r'\.45\s*AUTO'],
-            '.40 S&W': [r'\.40\s*S&W', r'40\s*S&W', r'\.40\s*SW'],
-            '.380': [r'\.380', r'380\s*ACP', r'380\s*AUTO'],
-            '22LR': [r'22\s*LR', r'\.22\s*LR', r'22\s*LONG\s*RIFLE'],
-            '7.62x39': [r'7\.62X39', r'7\.62\s*X\s*39'],
-            '300 BLK': [r'300\s*BLK', r'300\s*BLACKOUT', r'300\s*AAC'],
-            '6.5 CM': [r'6\.5\s*CM', r'6\.5\s*CREEDMOOR'],
-            '.30-06': [r'\.30-06', r'30-06', r'30\.06'],
-        }
-        
-        for standard, patterns in caliber_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text):
-                    return standard
-        
-        return None
+        return extraction.extract_caliber(text)
     
     def extract_quantity(self, text):
         """Extract quantity from text"""
-        if not text:
-            return None
-        
-        text_upper = text.upper()
-        
-        # Quantity patterns
-        patterns = [
-            r'(\d+)\s*ROUNDS?',
-            r'(\d+)\s*CT\b',
-            r'(\d+)\s*COUNT',
-            r'(\d+)\s*PCS?',
-            r'BOX\s*OF\s*(\d+)',
-            r'(\d+)/BOX',
-            r'(\d+)\s*PIECE',
-            r'QTY[:\s]*(\d+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text_upper)
-            if match:
-                try:
-                    qty = int(match.group(1))
-                    if 1 <= qty <= 10000:  # Reasonable quantity range
-                        return qty
-                except ValueError:
-                    continue
-        
-        # Default quantities based on common patterns
-        if 'CASE' in text_upper:
-            return 1000
-        elif 'BOX' in text_upper:
-            return 50
-        
-        return 20  # Conservative default
+        return extraction.extract_quantity(text, default=20)  # Conservative default
     
     def is_in_stock(self, text):
         """Determine stock status"""
         if not text:
             return False
         
-        text_upper = text.upper()
-        
-        # Out of stock indicators (check first - more specific)
-        out_indicators = [
-            'OUT OF STOCK', 'SOLD OUT', 'UNAVAILABLE', 'BACKORDER',
-            'NOTIFY WHEN AVAILABLE', 'EMAIL WHEN AVAILABLE', 'TEMPORARILY UNAVAILABLE',
-            'DISCONTINUED', 'NO LONGER AVAILABLE'
-        ]
-        
-        for indicator in out_indicators:
-            if indicator in text_upper:
-                return False
-        
-        # In stock indicators
-        in_indicators = [
-            'IN STOCK', 'AVAILABLE', 'ADD TO CART', 'BUY NOW',
-            'PURCHASE', 'ORDER NOW', 'SHIPS', 'READY TO SHIP',
-            'IMMEDIATE SHIPPING', 'QUICK SHIP'
-        ]
-        
-        for indicator in in_indicators:
-            if indicator in text_upper:
-                return True
+        # Out of stock indicators are checked first (more specific)
+        in_stock = self.stock_matcher.is_in_stock(text)
+        if in_stock is not None:
+            return in_stock
         
         # If price is shown, likely in stock
-        if self.extract_price(text):
-            return True
-        
-        return False
+        return self.extract_price(text) is not None
     
     def scrape_gun_deals_reddit(self):
         """Scrape Reddit gun deals for real ammunition posts"""
@@ -421,15 +327,10 @@ URL: {product.get('url', 'N/A')}
         reddit_count = self.scrape_gun_deals_reddit()
         total_found += reddit_count
         
-        # Add delay between requests
-        time.sleep(2)
-        
         print("\n2️⃣ Attempting AmmoSeek search...")
         ammoseek_count = self.scrape_ammoseek_search("9mm")
         total_found += ammoseek_count
         
-        time.sleep(2)
-        
         print("\n3️⃣ Checking GunBroker completed auctions...")
         gunbroker_count = self.scrape_gun_broker_completed()
         total_found += gunbroker_count
@@ -0,0 +1,124 @@
+import logging
+import math
+from datetime import datetime, timedelta
+
+from config import RECRAWL_CONFIG
+from lazy import LazySingleton
+
+
+class RecrawlScheduler:
+    """Decides when each known product URL is next worth fetching.
+
+    Price and stock changes are modelled as a Poisson process per URL. Its
+    rate is estimated from the retained change-only price history (changes
+    since the oldest row prune_history kept) with a gamma prior
+    (prior_changes per prior_hours), so new products start at the prior and
+    drift towards their own behaviour as history accumulates.
+
+    The global requests_per_hour budget is split across URLs in proportion to
+    the square root of their change rate, within [min_interval, max_interval].
+    Square-root allocation gives volatile URLs more visits without letting
+    them starve stable ones, which is where proportional allocation ends up.
+    """
+
+    def __init__(self, requests_per_hour=None, min_interval_minutes=None, max_interval_hours=None,
+                 prior_changes=None, prior_hours=None, db=None):
+        self.requests_per_hour = requests_per_hour or RECRAWL_CONFIG['requests_per_hour']
+        self.min_interval = (min_interval_minutes or RECRAWL_CONFIG['min_interval_minutes']) / 60
+        self.max_interval = max_interval_hours or RECRAWL_CONFIG['max_interval_hours']
+        self.prior_changes = RECRAWL_CONFIG['prior_changes'] if prior_changes is None else prior_changes
+        self.prior_hours = prior_hours or RECRAWL_CONFIG['prior_hours']
+        # DatabaseManager to read change history from; the shared one by default
+        self.db = db
+        self.logger = logging.getLogger(__name__)
+
+    def estimate_rate(self, changes, observed_hours):
+        """Posterior mean changes per hour after `changes` changes in `observed_hours`"""
+        return (max(changes, 0) + self.prior_changes) / (max(observed_hours, 0) + self.prior_hours)
+
+    def allocate(self, rates):
+        """Revisit interval in hours for each rate, spending at most requests_per_hour in total"""
+        if not rates:
+            return []
+
+        min_frequency, max_frequency = 1 / self.max_interval, 1 / self.min_interval
+        weights = [math.sqrt(rate) for rate in rates]
+
+        def frequencies(scale):
+            return [min(max(scale * weight, min_frequency), max_frequency) for weight in weights]
+
+        if len(rates) * min_frequency >= self.requests_per_hour:
+            self.logger.warning(f"{len(rates)} URLs need more than {self.requests_per_hour} requests/hour "
+                                f"at the {self.max_interval}h maximum interval; visiting all at that interval")
+            return [self.max_interval] * len(rates)
+
+        # A zero rate (prior_changes=0, no changes seen) always gets the maximum interval
+        positive = [weight for weight in weights if weight > 0]
+        if not positive:
+            return [self.max_interval] * len(rates)
+
+        # Find the scale whose clamped frequencies use the budget (total is monotonic in scale)
+        low, high = 0.0, max_frequency / min(positive)
+        if sum(frequencies(high)) <= self.requests_per_hour:
+            low = high
+        else:
+            for _ in range(60):
+                middle = (low + high) / 2
+                if sum(frequencies(middle)) > self.requests_per_hour:
+                    high = middle
+                else:
+                    low = middle
+
+        return [1 / frequency for frequency in frequencies(low)]
+
+    def estimate_rates(self, now=None):
+        """{product_url: (last_scraped, changes per hour)} for every product in the database"""
+        if self.db is None:
+            from database import db_manager
+            self.db = db_manager
+
+        now = now or datetime.utcnow()
+        urls = {}
+        for url, observed_since, last_scraped, changes in self.db.get_product_change_stats():
+            observed_since = observed_since or now
+            last_scraped = last_scraped or observed_since
+            seen = urls.get(url)
+            if seen:
+                # Variants sharing a page: pool their changes, the page is as stale as its stalest variant
+                seen[0] = min(seen[0], observed_since)
+                seen[1] = min(seen[1], last_scraped)
+                seen[2] += max(changes, 0)
+            else:
+                urls[url] = [observed_since, last_scraped, max(changes, 0)]
+
+        return {
+            url: (last_scraped, self.estimate_rate(changes, (last_scraped - observed_since).total_seconds() / 3600))
+            for url, (observed_since, last_scraped, changes) in urls.items()
+        }
+
+    def plan(self, now=None):
+        """{product_url: next visit time} for every product in the database"""
+        rates = self.estimate_rates(now)
+        intervals = self.allocate([rate for _, rate in rates.values()])
+
+        return {
+            url: last_scraped + timedelta(hours=interval)
+            for (url, (last_scraped, _)), interval in zip(rates.items(), intervals)
+        }
+
+    def filter_due(self, urls, now=None):
+        """The URLs worth fetching now: unknown ones first, then known ones past their next visit, most overdue first"""
+        now = now or datetime.utcnow()
+        next_visits = self.plan(now)
+
+        new_urls = [url for url in urls if url not in next_visits]
+        due_urls = sorted(
+            (url for url in dict.fromkeys(urls) if url in next_visits and next_visits[url] <= now),
+            key=lambda url: next_visits[url]
+        )
+        self.logger.info(f"Recrawl: {len(new_urls)} new and {len(due_urls)} due of {len(urls)} URLs")
+        return new_urls + due_urls
+
+
+# Initialize shared recrawl scheduler (built on first use)
+recrawl_scheduler = LazySingleton(RecrawlScheduler)
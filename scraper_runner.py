@@ -6,10 +6,9 @@ Main scraper runner for ammunition price aggregation
 import logging
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from config import RETAILERS, LOGGING_CONFIG
-from database import db_manager
-from sgammo_scraper import SGAmmoScraper
 
 # Setup logging
 logging.basicConfig(
@@ -24,14 +23,21 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class ScraperRunner:
-    def __init__(self):
+    def __init__(self, use_async=False, parallel=1):
         self.scrapers = {}
+        self.use_async = use_async
+        # Retailers crawled at once; each scraper has its own HTTP session and
+        # every database call opens its own connection from the engine's pool
+        self.parallel = max(1, parallel)
         self.setup_scrapers()
     
     def setup_scrapers(self):
         """Initialize all enabled scrapers"""
         logger.info("Setting up scrapers...")
         
+        # Scraper modules pull in the HTTP/browser and database stacks; import them only when running
+        from sgammo_scraper import SGAmmoScraper
+        
         # SGAmmo scraper
         if RETAILERS['sgammo']['enabled']:
             self.scrapers['sgammo'] = SGAmmoScraper(RETAILERS['sgammo'])
@@ -41,36 +47,75 @@ class ScraperRunner:
         # if RETAILERS['bulkammo']['enabled']:
         #     self.scrapers['bulkammo'] = BulkAmmoScraper(RETAILERS['bulkammo'])
         
+        if self.use_async:
+            for scraper in self.scrapers.values():
+                scraper.use_async = True
+            logger.info("Async fetch mode enabled")
+        
         logger.info(f"Initialized {len(self.scrapers)} scrapers")
     
+    def _run_scraper(self, retailer_name, scraper):
+        """Run one scraper, returning (products, errors, seconds)"""
+        logger.info(f"Starting scraper for {retailer_name}")
+        started = datetime.now()
+        
+        try:
+            scraper.scrape_products()
+            products, errors = scraper.products_found, len(scraper.errors)
+            
+            logger.info(f"Completed {retailer_name}: "
+                      f"{scraper.products_found} products, "
+                      f"{len(scraper.errors)} errors")
+            
+        except Exception as e:
+            logger.error(f"Scraper {retailer_name} failed: {e}")
+            products, errors = 0, 1
+        
+        return products, errors, (datetime.now() - started).total_seconds()
+    
     def run_all_scrapers(self):
-        """Run all enabled scrapers"""
-        logger.info("Starting scraping session for all retailers")
+        """Run all enabled scrapers, up to self.parallel retailers at a time"""
+        logger.info(f"Starting scraping session for all retailers (parallel={self.parallel})")
         start_time = datetime.now()
         
-        total_products = 0
-        total_errors = 0
+        if self.parallel > 1 and len(self.scrapers) <= 1:
+            # Only SGAmmo has a BaseScraper implementation so far
+            logger.warning(f"--parallel {self.parallel} has no effect with {len(self.scrapers)} enabled "
+                           f"scraper(s); running serially")
         
-        for retailer_name, scraper in self.scrapers.items():
-            logger.info(f"Starting scraper for {retailer_name}")
-            
-            try:
-                scraper.scrape_products()
-                total_products += scraper.products_found
-                total_errors += len(scraper.errors)
-                
-                logger.info(f"Completed {retailer_name}: "
-                          f"{scraper.products_found} products, "
-                          f"{len(scraper.errors)} errors")
-                
-            except Exception as e:
-                logger.error(f"Scraper {retailer_name} failed: {e}")
-                total_errors += 1
+        if self.parallel > 1 and len(self.scrapers) > 1:
+            with ThreadPoolExecutor(max_workers=self.parallel, thread_name_prefix='retailer') as executor:
+                futures = {
+                    retailer_name: executor.submit(self._run_scraper, retailer_name, scraper)
+                    for retailer_name, scraper in self.scrapers.items()
+                }
+                results = {retailer_name: future.result() for retailer_name, future in futures.items()}
+        else:
+            results = {
+                retailer_name: self._run_scraper(retailer_name, scraper)
+                for retailer_name, scraper in self.scrapers.items()
+            }
+        
+        total_products = sum(products for products, _, _ in results.values())
+        total_errors = sum(errors for _, errors, _ in results.values())
+        retailer_durations = {retailer_name: round(seconds, 1) for retailer_name, (_, _, seconds) in results.items()}
+        # The slowest retailer bounds a parallel run; a serial run costs the sum
+        critical_path = max(retailer_durations.values(), default=0.0)
+        
+        # Raw history past its retention age is only needed as rollups
+        from database import db_manager
+        try:
+            db_manager.prune_history()
+        except Exception as e:
+            logger.error(f"Pruning price history failed: {e}")
         
         end_time = datetime.now()
         duration = end_time - start_time
         
         logger.info(f"Scraping session completed in {duration}")
+        for retailer_name, seconds in retailer_durations.items():
+            logger.info(f"  {retailer_name}: {seconds}s")
+        logger.info(f"Critical path: {critical_path}s (serial total {sum(retailer_durations.values()):.1f}s)")
         logger.info(f"Total products found: {total_products}")
         logger.info(f"Total errors: {total_errors}")
         
@@ -78,7 +123,9 @@ class ScraperRunner:
             'duration': duration,
             'total_products': total_products,
             'total_errors': total_errors,
-            'scrapers_run': len(self.scrapers)
+            'scrapers_run': len(self.scrapers),
+            'retailer_durations': retailer_durations,
+            'critical_path_seconds': critical_path,
         }
     
     def run_single_scraper(self, retailer_name):
@@ -133,6 +180,8 @@ class ScraperRunner:
 
 def setup_database():
     """Initialize database tables"""
+    from database import db_manager
+    
     try:
         logger.info("Setting up database...")
         db_manager.create_tables()
@@ -149,6 +198,10 @@ def main():
     parser.add_argument('--scraper', type=str, help='Run specific scraper (sgammo, bulkammo, etc.)')
     parser.add_argument('--test', type=str, help='Test specific scraper with limited pages')
     parser.add_argument('--all', action='store_true', help='Run all enabled scrapers')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Fetch product pages concurrently (bounded per host by concurrent_limit)')
+    parser.add_argument('--parallel', type=int, default=1, metavar='N',
+                        help='Run up to N retailers at the same time with --all (needs more than one enabled scraper)')
     
     args = parser.parse_args()
     
@@ -161,7 +214,7 @@ def main():
             sys.exit(0)
     
     # Initialize scraper runner
-    runner = ScraperRunner()
+    runner = ScraperRunner(use_async=args.use_async, parallel=args.parallel)
     
     if not runner.scrapers:
         logger.error("No scrapers enabled. Check configuration.")
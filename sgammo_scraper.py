@@ -1,5 +1,7 @@
 from base_scraper import BaseScraper
 from utils import scraping_utils
+from page_fingerprint import page_fingerprints
+import structured_data
 import re
 from urllib.parse import urljoin
 
@@ -83,12 +85,30 @@ class SGAmmoScraper(BaseScraper):
             if not response:
                 return
             
-            soup = self.parse_html(response)
-            if not soup:
-                return
+            # Unchanged pages reuse the record extracted last time
+            fingerprint, cached_records = None, None
+            if hasattr(response, 'text'):
+                fingerprint, cached_records = page_fingerprints.lookup(url, response.text, __name__)
             
-            # Extract product data
-            product_data = self._extract_product_details(soup, url)
+            if cached_records is not None:
+                product_data = cached_records[0] if cached_records else None
+            else:
+                # JSON-LD / microdata Product markup skips the DOM parse entirely
+                product_data = None
+                structured = structured_data.extract_product(response.text) if hasattr(response, 'text') else None
+                if structured:
+                    product_data = self._extract_structured_details(structured, url, response)
+                
+                if product_data is None:
+                    soup = self.parse_html(response)
+                    if not soup:
+                        return
+                    
+                    # Extract product data
+                    product_data = self._extract_product_details(soup, url)
+                
+                if fingerprint:
+                    page_fingerprints.remember(url, fingerprint, [product_data] if product_data else [])
             
             if product_data:
                 self.products_found += 1
@@ -136,6 +156,56 @@ class SGAmmoScraper(BaseScraper):
                 self.logger.warning(f"No price found for {product_data.get('name', 'Unknown')}")
                 return None
             
+            # Stock status
+            stock_text = soup.get_text()
+            product_data['in_stock'] = scraping_utils.is_in_stock(stock_text)
+            
+            # Product URL
+            product_data['product_url'] = product_url
+            
+            # Try to find product image
+            img_element = soup.find('img', class_=['product-image', 'main-image']) or soup.find('img')
+            if img_element and img_element.get('src'):
+                product_data['image_url'] = scraping_utils.build_absolute_url(
+                    self.base_url, img_element['src']
+                )
+            
+            return self._complete_product_details(product_data)
+            
+        except Exception as e:
+            self.logger.error(f"Error extracting product details: {e}")
+            return None
+    
+    def _extract_structured_details(self, structured, product_url=None, response=None):
+        """Build product details from structured_data.extract_product() output"""
+        if not structured.get('name'):
+            return None
+        
+        product_data = {
+            'name': scraping_utils.clean_text(structured['name']),
+            'price': structured['price'],
+            'product_url': product_url,
+        }
+        if structured.get('description'):
+            product_data['description'] = scraping_utils.clean_text(structured['description'])
+        if structured.get('image_url'):
+            product_data['image_url'] = scraping_utils.build_absolute_url(self.base_url, structured['image_url'])
+        if structured.get('brand'):
+            product_data['manufacturer'] = structured['brand']
+        
+        # Availability is only missing when the offer omits it; then read the
+        # page text like _extract_product_details does (descriptions rarely mention stock)
+        if structured.get('in_stock') is not None:
+            product_data['in_stock'] = structured['in_stock']
+        else:
+            soup = self.parse_html(response) if response is not None else None
+            product_data['in_stock'] = scraping_utils.is_in_stock(soup.get_text()) if soup else False
+        
+        return self._complete_product_details(product_data)
+    
+    def _complete_product_details(self, product_data):
+        """Derive caliber, quantity, price per round and manufacturer from name/description"""
+        try:
             # Extract caliber from name/description
             full_text = f"{product_data.get('name', '')} {product_data.get('description', '')}"
             product_data['caliber'] = scraping_utils.extract_caliber(full_text)
@@ -168,23 +238,9 @@ class SGAmmoScraper(BaseScraper):
                 self.logger.warning(f"Could not calculate price per round for {product_data.get('name', 'Unknown')}")
                 return None
             
-            # Stock status
-            stock_text = soup.get_text()
-            product_data['in_stock'] = scraping_utils.is_in_stock(stock_text)
-            
-            # Product URL
-            product_data['product_url'] = product_url
-            
-            # Try to find product image
-            img_element = soup.find('img', class_=['product-image', 'main-image']) or soup.find('img')
-            if img_element and img_element.get('src'):
-                product_data['image_url'] = scraping_utils.build_absolute_url(
-                    self.base_url, img_element['src']
-                )
-            
             # Extract manufacturer from name
             name_parts = product_data['name'].split()
-            if name_parts:
+            if name_parts and not product_data.get('manufacturer'):
                 # First word is often the manufacturer
                 potential_manufacturer = name_parts[0]
                 common_manufacturers = [
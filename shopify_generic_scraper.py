@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Generic Shopify Catalogue Scraper
+Pulls every configured Shopify store's catalogue through /products.json
+(250 products per request) instead of paging HTML listings
+"""
+
+from catalog_adapters import ShopifyCatalog, scrape_stores
+from config import CATALOG_CONFIG
+from http_cache import response_cache
+
+def main():
+    """Main function"""
+    print("🚀 Starting Shopify catalogue scraper")
+    scrape_stores(ShopifyCatalog, CATALOG_CONFIG['shopify_stores'], 'shopify_prices.csv')
+    print(f"HTTP cache: {response_cache.get_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,10 @@ Avoids complex regex, targets product links efficiently
 
 import urllib.request
 import re
-import time
 import random
 from datetime import datetime
+from http_cache import cached_urlopen
+import extraction
 
 def make_request(url):
     """Make HTTP request"""
@@ -17,8 +18,7 @@ def make_request(url):
         req.add_header('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
         req.add_header('Accept', 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8')
         
-        with urllib.request.urlopen(req, timeout=10) as response:
-            return response.read().decode('utf-8', errors='ignore')
+        return cached_urlopen(req, timeout=10).text
             
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -26,46 +26,15 @@ def make_request(url):
 
 def extract_price(text):
     """Simple price extraction"""
-    matches = re.findall(r'\$([0-9,]+\.?[0-9]*)', text)
-    for match in matches:
-        try:
-            price = float(match.replace(',', ''))
-            if 15 <= price <= 3000:
-                return price
-        except:
-            continue
-    return None
+    return extraction.extract_price(text, min_price=15, max_price=3000)
 
 def extract_caliber(text):
     """Simple caliber extraction"""
-    text = text.upper()
-    if '9MM' in text or '9 MM' in text:
-        return '9MM'
-    elif '.223' in text or '223' in text:
-        return '.223'
-    elif '5.56' in text:
-        return '5.56'
-    elif '.308' in text:
-        return '.308'
-    elif '.45' in text:
-        return '.45 ACP'
-    elif '.40' in text:
-        return '.40 S&W'
-    elif '22LR' in text or '.22' in text:
-        return '22LR'
-    return None
+    return extraction.extract_caliber(text)
 
 def extract_quantity(text):
     """Simple quantity extraction"""
-    match = re.search(r'(\d+)\s*ROUNDS?', text.upper())
-    if match:
-        try:
-            qty = int(match.group(1))
-            if 10 <= qty <= 5000:
-                return qty
-        except:
-            pass
-    return 50
+    return extraction.extract_quantity(text, min_qty=10, max_qty=5000, keywords=False)
 
 def scrape_simple():
     """Simple scraping approach"""
@@ -162,8 +131,6 @@ def scrape_simple():
             if len(all_products) >= 12:
                 break
         
-        time.sleep(2)
-        
         if len(all_products) >= 10:
             break
     
@@ -6,8 +6,9 @@ Discovers actual site structure first, then extracts products from real category
 
 import urllib.request
 import re
-import time
 from datetime import datetime
+from http_cache import cached_urlopen
+import extraction
 
 def make_request(url):
     """Make HTTP request"""
@@ -19,8 +20,7 @@ def make_request(url):
             'Connection': 'keep-alive',
         }
         req = urllib.request.Request(url, headers=headers)
-        response = urllib.request.urlopen(req, timeout=20)
-        return response.read().decode('utf-8', errors='ignore')
+        return cached_urlopen(req, timeout=20).text
     except Exception as e:
         print(f"❌ Error: {e}")
         return None
@@ -162,42 +162,11 @@ def extract_price_from_context(html, link):
 
 def extract_caliber(text):
     """Extract caliber from text"""
-    text = text.upper()
-    calibers = {
-        '9MM': ['9MM', '9 MM', '9X19', '9 LUGER'],
-        '.223': ['.223', '223 REM', '223 REMINGTON'],
-        '5.56': ['5.56', '5.56X45', '5.56 NATO'],
-        '.308': ['.308', '308 WIN', '308 WINCHESTER'],
-        '.45 ACP': ['.45 ACP', '45 ACP', '.45 AUTO'],
-        '.40 S&W': ['.40 S&W', '40 S&W', '.40 SW'],
-        '.380': ['.380', '380 ACP', '380 AUTO'],
-        '22LR': ['22LR', '.22 LR', '22 LONG RIFLE'],
-        '7.62x39': ['7.62X39', '7.62 X 39'],
-        '300 BLK': ['300 BLK', '300 BLACKOUT'],
-    }
-    
-    for standard, variations in calibers.items():
-        for variation in variations:
-            if variation in text:
-                return standard
-    return "Unknown"
+    return extraction.extract_caliber(text, default="Unknown")
 
 def extract_quantity(text):
     """Extract quantity from text"""
-    patterns = [r'(\d+)\s*ROUNDS?', r'(\d+)\s*RDS?', r'(\d+)\s*CT']
-    
-    text_upper = text.upper()
-    for pattern in patterns:
-        match = re.search(pattern, text_upper)
-        if match:
-            try:
-                qty = int(match.group(1))
-                if 10 <= qty <= 5000:
-                    return qty
-            except:
-                continue
-    
-    return 50  # Default
+    return extraction.extract_quantity(text, min_qty=10, max_qty=5000, keywords=False)  # Default 50
 
 def main():
     """Main function"""
@@ -232,8 +201,6 @@ def main():
                 products.extend(new_products)
                 print(f"✅ Added {len(new_products)} more products")
             
-            time.sleep(2)
-            
             if len(products) >= 10:
                 break
     
@@ -0,0 +1,94 @@
+import ahocorasick
+
+# Markers of a greyed-out add-to-cart button. 'disabled' alone only counts
+# when followed by a quote, whitespace or '>' or when inside a class="..."
+DISABLED_KEYWORDS = ['btn-disabled', 'button-disabled']
+DISABLED = 'disabled'
+PRICE = '$'
+
+
+class StockMatcher:
+    """Finds every stock-status keyword in a page in one Aho-Corasick pass.
+
+    Out-of-stock and in-stock phrases, disabled-button markers and dollar
+    signs all live in one automaton, so a page is lower-cased once and
+    scanned once however many indicators a scraper checks for.
+    """
+
+    def __init__(self, out_of_stock, in_stock, disabled=False, price=False):
+        self.out_of_stock = [keyword.lower() for keyword in out_of_stock]
+        self.in_stock = [keyword.lower() for keyword in in_stock]
+
+        self.automaton = ahocorasick.Automaton()
+        for keyword in self.out_of_stock + self.in_stock:
+            self.automaton.add_word(keyword, keyword)
+        if disabled:
+            for keyword in DISABLED_KEYWORDS + [DISABLED]:
+                self.automaton.add_word(keyword, keyword)
+        if price:
+            self.automaton.add_word(PRICE, PRICE)
+        self.automaton.make_automaton()
+
+    def scan(self, text):
+        """Return (keywords found, has disabled button, has visible price)"""
+        found = set()
+        has_disabled = has_price = False
+        if not text:
+            return found, has_disabled, has_price
+
+        text = text.lower()
+        for end, keyword in self.automaton.iter(text):
+            if keyword == PRICE:
+                has_price = has_price or (end + 1 < len(text) and text[end + 1] in '0123456789,')
+            elif keyword == DISABLED:
+                has_disabled = has_disabled or self._disabled_at(text, end)
+            elif keyword in DISABLED_KEYWORDS:
+                has_disabled = True
+            else:
+                found.add(keyword)
+        return found, has_disabled, has_price
+
+    def _disabled_at(self, text, end):
+        """Whether the 'disabled' ending at end is an attribute or class name"""
+        if end + 1 < len(text) and (text[end + 1] in '">' or text[end + 1].isspace()):
+            return True
+
+        # Inside a class="..." value: the nearest quote before it opens the
+        # attribute and the value is closed somewhere after it
+        quote = text.rfind('"', 0, end - len(DISABLED) + 1)
+        return quote >= 6 and text[quote - 6:quote] == 'class=' and text.find('"', end + 1) != -1
+
+    def is_in_stock(self, text):
+        """True/False from the first matching indicator (out-of-stock wins),
+        None when the text has neither"""
+        found = self.scan(text)[0]
+        if any(keyword in found for keyword in self.out_of_stock):
+            return False
+        if any(keyword in found for keyword in self.in_stock):
+            return True
+        return None
+
+    def detect(self, text):
+        """Return (in_stock, confidence, reason).
+
+        Explicit out-of-stock phrases override everything; in-stock phrases
+        only count when no button on the page is disabled, and a visible
+        price is the weakest in-stock signal.
+        """
+        if not text:
+            return False, "low", "No HTML content"
+
+        found, has_disabled, has_price = self.scan(text)
+        for keyword in self.out_of_stock:
+            if keyword in found:
+                return False, "high", f"Found '{keyword}'"
+
+        strong_matches = [keyword for keyword in self.in_stock if keyword in found]
+        if strong_matches and not has_disabled:
+            return True, "high", f"Found: {', '.join(strong_matches[:2])}"
+        elif strong_matches and has_disabled:
+            return False, "medium", "Buttons present but disabled"
+        elif has_price and not has_disabled:
+            return True, "medium", "Price visible, no disabled elements"
+        else:
+            return False, "low", "No clear stock indicators"
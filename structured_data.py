@@ -0,0 +1,192 @@
+import html as html_module
+import json
+import re
+
+JSON_LD_TYPE = 'application/ld+json'
+
+# schema.org availability values (last path segment of the URL)
+IN_STOCK_AVAILABILITY = {'instock', 'limitedavailability', 'onlineonly', 'instoreonly'}
+OUT_OF_STOCK_AVAILABILITY = {'outofstock', 'soldout', 'discontinued', 'backorder', 'preorder', 'presale'}
+
+# Microdata fallback: <meta itemprop="price" content="24.99">, <link itemprop="availability" href="...">
+MICRODATA_REGEX = re.compile(
+    r'<[^>]+itemprop=["\'](name|description|price|lowPrice|priceCurrency|availability|sku|image)["\'][^>]*>',
+    re.IGNORECASE
+)
+ATTRIBUTE_REGEX = re.compile(r'(content|href|src)=["\']([^"\']*)["\']', re.IGNORECASE)
+
+
+def find_json_ld_blocks(html):
+    """Yield the raw contents of every application/ld+json script on the page.
+
+    Uses plain substring searches for the type marker rather than a DOM
+    parse or a case-insensitive regex over the whole page.
+    """
+    position = html.find(JSON_LD_TYPE)
+    while position != -1:
+        start = html.find('>', position)
+        end = html.find('</script>', start)
+        if start == -1 or end == -1:
+            return
+        yield html[start + 1:end]
+        position = html.find(JSON_LD_TYPE, end)
+
+
+def _iter_nodes(data):
+    """Every JSON object in a JSON-LD document, including @graph members and nested values"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                yield from _iter_nodes(value)
+
+
+def _has_type(node, *types):
+    node_type = node.get('@type')
+    node_types = node_type if isinstance(node_type, list) else [node_type]
+    return any(t in types for t in node_types)
+
+
+def _first(value):
+    """First entry of a JSON-LD value that may be a single item or a list"""
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def _text(value):
+    value = _first(value)
+    if isinstance(value, dict):
+        value = value.get('name') or value.get('url') or value.get('@id')
+    if value is None:
+        return None
+    return html_module.unescape(str(value)).strip() or None
+
+
+def _price(value):
+    try:
+        price = float(str(_first(value)).replace(',', '').replace('$', ''))
+    except (TypeError, ValueError):
+        return None
+    return price if price > 0 else None
+
+
+def parse_availability(value):
+    """True/False for a schema.org availability URL or name, None if unknown"""
+    value = _text(value)
+    if not value:
+        return None
+    value = value.rstrip('/').rsplit('/', 1)[-1].lower().replace('_', '').replace(' ', '')
+    if value in IN_STOCK_AVAILABILITY:
+        return True
+    if value in OUT_OF_STOCK_AVAILABILITY:
+        return False
+    return None
+
+
+def _best_offer(offers):
+    """(price, currency, in_stock) of the cheapest in-stock offer, else the cheapest offer"""
+    candidates = []
+    for offer in _iter_nodes(offers):
+        price = _price(offer.get('price'))
+        if price is None:
+            price = _price(offer.get('lowPrice'))
+        if price is None and isinstance(offer.get('priceSpecification'), dict):
+            price = _price(offer['priceSpecification'].get('price'))
+        if price is None:
+            continue
+        in_stock = parse_availability(offer.get('availability'))
+        candidates.append((in_stock is not True, price, _text(offer.get('priceCurrency')), in_stock))
+
+    if not candidates:
+        return None, None, None
+    _, price, currency, in_stock = min(candidates, key=lambda c: (c[0], c[1]))
+    return price, currency, in_stock
+
+
+def _product_from_node(node):
+    offers = node.get('offers')
+    if offers is None and node.get('hasVariant'):
+        # Shopify ProductGroup: offers live on the variants
+        offers = [variant.get('offers') for variant in node['hasVariant'] if isinstance(variant, dict)]
+    price, currency, in_stock = _best_offer(offers)
+    if price is None:
+        return None
+
+    return {
+        'name': _text(node.get('name')),
+        'description': _text(node.get('description')),
+        'price': price,
+        'currency': currency,
+        'in_stock': in_stock,
+        'sku': _text(node.get('sku') or node.get('mpn')),
+        'brand': _text(node.get('brand')),
+        'image_url': _text(node.get('image')),
+        'url': _text(node.get('url')),
+    }
+
+
+def extract_json_ld_product(html):
+    """Product fields from the first JSON-LD Product/ProductGroup with a priced offer"""
+    for block in find_json_ld_blocks(html):
+        try:
+            data = json.loads(block.strip(), strict=False)
+        except ValueError:
+            continue
+        for node in _iter_nodes(data):
+            if _has_type(node, 'Product', 'ProductGroup'):
+                product = _product_from_node(node)
+                if product:
+                    return product
+    return None
+
+
+def extract_microdata_product(html):
+    """Product fields from itemprop attributes (first occurrence of each wins)"""
+    if 'itemprop' not in html:
+        return None
+
+    props = {}
+    for match in MICRODATA_REGEX.finditer(html):
+        prop = match.group(1)
+        if prop in props:
+            continue
+        attributes = dict((key.lower(), value) for key, value in ATTRIBUTE_REGEX.findall(match.group(0)))
+        value = attributes.get('content') or attributes.get('href') or attributes.get('src')
+        if value is None and prop in ('name', 'price', 'sku'):
+            # <h1 itemprop="name">Federal 9mm ...</h1>
+            end = html.find('<', match.end())
+            value = html[match.end():end]
+        if value and value.strip():
+            props[prop] = value
+
+    price = _price(props.get('price')) or _price(props.get('lowPrice'))
+    if price is None:
+        return None
+
+    return {
+        'name': _text(props.get('name')),
+        'description': _text(props.get('description')),
+        'price': price,
+        'currency': _text(props.get('priceCurrency')),
+        'in_stock': parse_availability(props.get('availability')),
+        'sku': _text(props.get('sku')),
+        'brand': None,
+        'image_url': _text(props.get('image')),
+        'url': None,
+    }
+
+
+def extract_product(html):
+    """Structured product data from a page: JSON-LD first, then microdata.
+
+    Returns a dict with name, description, price, currency, in_stock
+    (True/False/None), sku, brand, image_url and url, or None when the page
+    has no priced Product markup and callers should fall back to heuristics.
+    """
+    if not html:
+        return None
+    return extract_json_ld_product(html) or extract_microdata_product(html)
@@ -6,8 +6,10 @@ Uses multiple discovery methods to find 10 different products
 
 import urllib.request
 import re
-import time
 from datetime import datetime
+from http_cache import cached_urlopen
+import extraction
+from stock_status import StockMatcher
 
 def make_request(url):
     """Make HTTP request"""
@@ -20,15 +22,7 @@ def make_request(url):
             'Connection': 'keep-alive',
         }
         req = urllib.request.Request(url, headers=headers)
-        response = urllib.request.urlopen(req, timeout=20)
-        
-        # Handle potential gzip encoding
-        content = response.read()
-        if response.headers.get('Content-Encoding') == 'gzip':
-            import gzip
-            content = gzip.decompress(content)
-        
-        return content.decode('utf-8', errors='ignore')
+        return cached_urlopen(req, timeout=20).text
     except Exception as e:
         print(f"❌ Error accessing {url}: {e}")
         return None
@@ -104,89 +98,27 @@ def extract_product_info(html, url):
 
 def extract_caliber(text):
     """Extract caliber from text"""
-    text = text.upper()
-    calibers = {
-        '9MM': ['9MM', '9 MM', '9X19', '9 LUGER'],
-        '.223': ['.223', '223 REM', '223 REMINGTON'],
-        '5.56': ['5.56', '5.56X45', '5.56 NATO'],
-        '.308': ['.308', '308 WIN', '308 WINCHESTER'],
-        '.45 ACP': ['.45 ACP', '45 ACP', '.45 AUTO'],
-        '.40 S&W': ['.40 S&W', '40 S&W', '.40 SW'],
-        '.380': ['.380', '380 ACP', '380 AUTO'],
-        '22LR': ['22LR', '.22 LR', '22 LONG RIFLE'],
-        '7.62x39': ['7.62X39', '7.62 X 39'],
-        '300 BLK': ['300 BLK', '300 BLACKOUT', '.300 AAC'],
-        '6.5 CM': ['6.5 CM', '6.5 CREEDMOOR'],
-        '.30-06': ['.30-06', '30-06', '30.06'],
-        '12 GAUGE': ['12 GAUGE', '12GA', '12 GA'],
-        '20 GAUGE': ['20 GAUGE', '20GA', '20 GA'],
-        '.357': ['.357', '357 MAG', '357 MAGNUM'],
-        '.38': ['.38', '38 SPECIAL', '.38 SPL'],
-        '10MM': ['10MM', '10 MM'],
-        '.243': ['.243', '243 WIN'],
-        '7MM': ['7MM', '7MM-08', '7MM REM'],
-    }
-    
-    for standard, variations in calibers.items():
-        for variation in variations:
-            if variation in text:
-                return standard
-    return "Unknown"
+    return extraction.extract_caliber(text, default="Unknown")
 
 def extract_quantity(text):
     """Extract quantity from text"""
-    patterns = [
-        r'(\d+)\s*ROUNDS?',
-        r'(\d+)\s*RDS?',
-        r'(\d+)\s*CT',
-        r'(\d+)\s*COUNT',
-        r'(\d{3,4})\s*PER',
-        r'BULK\s*(\d+)'
-    ]
-    
-    text_upper = text.upper()
-    for pattern in patterns:
-        match = re.search(pattern, text_upper)
-        if match:
-            try:
-                qty = int(match.group(1))
-                if 10 <= qty <= 5000:  # Reasonable range
-                    return qty
-            except:
-                continue
-    
-    # Default estimates
-    if 'CASE' in text_upper:
-        return 1000
-    elif 'BOX' in text_upper:
-        return 50
-    return 50
+    return extraction.extract_quantity(text, min_qty=10, max_qty=5000, table=extraction.bulk_quantity_table)  # Reasonable range
+
+# Out of stock indicators are checked first
+stock_matcher = StockMatcher(
+    out_of_stock=['out of stock', 'sold out', 'unavailable', 'backorder',
+                  'notify when available', 'temporarily unavailable',
+                  'item not available', 'currently unavailable'],
+    in_stock=['add to cart', 'buy now', 'in stock', 'available',
+              'add to bag'],
+)
 
 def detect_stock_status(html):
     """Detect stock status"""
-    if not html:
+    in_stock = stock_matcher.is_in_stock(html)
+    if in_stock is None:
         return "Unknown"
-    
-    html_lower = html.lower()
-    
-    # Out of stock indicators (check first)
-    out_indicators = [
-        'out of stock', 'sold out', 'unavailable', 'backorder',
-        'notify when available', 'temporarily unavailable',
-        'item not available', 'currently unavailable'
-    ]
-    
-    for indicator in out_indicators:
-        if indicator in html_lower:
-            return "OUT OF STOCK"
-    
-    # In stock indicators
-    in_indicators = ['add to cart', 'buy now', 'in stock', 'available', 'add to bag']
-    for indicator in in_indicators:
-        if indicator in html_lower:
-            return "IN STOCK"
-    
-    return "Unknown"
+    return "IN STOCK" if in_stock else "OUT OF STOCK"
 
 def try_specific_products():
     """Try specific product URLs that are likely to exist"""
@@ -243,8 +175,6 @@ def try_specific_products():
                 print("❌ Could not extract product info")
         else:
             print("❌ Page not found")
-        
-        time.sleep(1.5)  # Be respectful
     
     return products
 
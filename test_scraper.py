@@ -4,8 +4,15 @@ Simple test script for the ammunition scraper
 """
 
 import sys
+import csv
+import glob
+import json
 import logging
-from database import db_manager
+import os
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from database import db_manager, DatabaseManager, Product, PriceHistory, PriceRollup
 from sgammo_scraper import SGAmmoScraper
 from config import RETAILERS
 
@@ -100,6 +107,287 @@ def test_product_extraction():
         logger.error(f"✗ Product extraction test failed: {e}")
         return False
 
+def temp_database():
+    """DatabaseManager on a fresh SQLite file; returns (db, path)"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    db = DatabaseManager(f'sqlite:///{path}')
+    db.create_tables()
+    return db, path
+
+def product_data(retailer_id, name, price, quantity=50, caliber='9mm', in_stock=True):
+    return {
+        'retailer_id': retailer_id, 'name': name, 'caliber': caliber, 'price': price, 'quantity': quantity,
+        'price_per_round': round(price / quantity, 4), 'in_stock': in_stock,
+        'product_url': f'https://test.com/p/{name.replace(" ", "-")}',
+    }
+
+def history(db, name):
+    """(price, in_stock) history rows of a product, oldest first"""
+    session = db.get_session()
+    try:
+        return [
+            (price, in_stock) for price, in_stock in session.query(PriceHistory.price, PriceHistory.in_stock)
+            .join(Product, Product.id == PriceHistory.product_id).filter(Product.name == name)
+            .order_by(PriceHistory.id)
+        ]
+    finally:
+        session.close()
+
+def test_upsert_change_only_history():
+    """Test that upserts update products in place and only record history on change"""
+    db, path = temp_database()
+    try:
+        retailer_id = db.get_retailer_id('Test Retailer', website='https://test.com')
+        
+        assert db.upsert_products([product_data(retailer_id, 'Steady 9mm', 15.0),
+                                   product_data(retailer_id, 'Moving 9mm', 16.0)]) == 2
+        assert db.upsert_products([product_data(retailer_id, 'Steady 9mm', 15.0),
+                                   product_data(retailer_id, 'Moving 9mm', 14.0)]) == 2
+        assert db.upsert_product(product_data(retailer_id, 'Moving 9mm', 14.0, in_stock=False))
+        assert db.upsert_product(product_data(retailer_id, 'Moving 9mm', 14.0, in_stock=False))
+        
+        session = db.get_session()
+        try:
+            assert session.query(Product).count() == 2
+            moving = session.query(Product).filter_by(name='Moving 9mm').one()
+            assert (moving.price, moving.price_per_round, moving.in_stock) == (14.0, 0.28, False)
+        finally:
+            session.close()
+        assert history(db, 'Steady 9mm') == [(15.0, True)]
+        assert history(db, 'Moving 9mm') == [(16.0, True), (14.0, True), (14.0, False)]
+    finally:
+        os.remove(path)
+
+def test_best_prices_leaderboard():
+    """Test that the best_prices leaderboard follows price and stock changes"""
+    db, path = temp_database()
+    try:
+        retailer_id = db.get_retailer_id('Test Retailer', website='https://test.com')
+        db.upsert_products([product_data(retailer_id, f'Box {price}', price) for price in (20.0, 12.0, 16.0)]
+                           + [product_data(retailer_id, 'Rifle box', 30.0, caliber='.223')])
+        db.upsert_product(product_data(retailer_id, 'Sold out', 10.0, in_stock=False))
+        
+        assert db.check_best_prices() == []
+        assert [p.name for p in db.get_best_prices('9mm')] == ['Box 12.0', 'Box 16.0', 'Box 20.0']
+        
+        # The cheapest box sells out, a sold-out one comes back cheaper than everything
+        db.upsert_products([product_data(retailer_id, 'Box 12.0', 12.0, in_stock=False),
+                            product_data(retailer_id, 'Sold out', 10.0)])
+        assert db.check_best_prices() == []
+        assert [p.name for p in db.get_best_prices('9mm')] == ['Sold out', 'Box 16.0', 'Box 20.0']
+        assert [p.name for p in db.get_best_prices(limit=2)] == ['Sold out', 'Box 16.0']
+    finally:
+        os.remove(path)
+
+def test_rollups_and_retention():
+    """Test that rollups absorb every observation and prune_history respects retention"""
+    db, path = temp_database()
+    try:
+        retailer_id = db.get_retailer_id('Test Retailer', website='https://test.com')
+        db.upsert_products([product_data(retailer_id, 'Cheap', 10.0), product_data(retailer_id, 'Dear', 20.0)])
+        db.upsert_products([product_data(retailer_id, 'Cheap', 12.0), product_data(retailer_id, 'Dear', 20.0)])
+        db.upsert_product(product_data(retailer_id, 'Sold out', 5.0, in_stock=False))
+        
+        session = db.get_session()
+        try:
+            cheap_id = session.query(Product.id).filter_by(name='Cheap').scalar()
+        finally:
+            session.close()
+        
+        # Unchanged observations count as samples even though they add no history
+        day = db.get_price_rollups(product_id=cheap_id)
+        assert [(r['min_price_per_round'], r['max_price_per_round'], r['samples']) for r in day] == [(0.2, 0.24, 2)]
+        dear_hour = db.get_price_rollups(caliber='9mm', period='hour')
+        # The out-of-stock offer is left out of the caliber rollup
+        assert [(r['min_price_per_round'], r['max_price_per_round'], r['samples']) for r in dear_hour] == [(0.2, 0.4, 4)]
+        assert abs(dear_hour[0]['avg_price_per_round'] - 0.31) < 1e-9
+        
+        # Age everything past retention
+        old = datetime.utcnow() - timedelta(days=400)
+        session = db.get_session()
+        try:
+            session.query(PriceHistory).update({PriceHistory.recorded_at: old})
+            session.query(PriceRollup).update({PriceRollup.bucket_start: old})
+            session.commit()
+        finally:
+            session.close()
+        
+        raw_deleted, hourly_deleted = db.prune_history(raw_retention_days=30, hourly_retention_days=7)
+        # Only Cheap's first price goes; each product keeps its latest row
+        assert raw_deleted == 1
+        assert history(db, 'Cheap') == [(12.0, True)]
+        assert history(db, 'Dear') == [(20.0, True)]
+        # Three products' hourly buckets; daily ones are kept
+        assert hourly_deleted == 3
+        assert not db.get_price_rollups(product_id=cheap_id, period='hour')
+        assert db.get_price_rollups(product_id=cheap_id)[0]['samples'] == 2
+    finally:
+        os.remove(path)
+
+def test_recrawl_rate_after_prune():
+    """Test that pruning raw history does not lower recrawl change-rate estimates"""
+    from recrawl import RecrawlScheduler
+    
+    db, path = temp_database()
+    try:
+        retailer_id = db.get_retailer_id('Test Retailer', website='https://test.com')
+        
+        # A product that changed price every 6 hours for 120 days
+        now = datetime.utcnow()
+        first_seen = now - timedelta(days=120)
+        session = db.get_session()
+        try:
+            product = Product(retailer_id=retailer_id, name='Volatile 9mm', caliber='9mm', price=15.0,
+                              quantity=50, price_per_round=0.3, in_stock=True, product_url='https://test.com/p/1',
+                              first_seen=first_seen, last_scraped=now)
+            session.add(product)
+            session.flush()
+            session.add_all(
+                PriceHistory(product_id=product.id, price=15.0 + i % 2, price_per_round=0.3 + i % 2 / 50,
+                             in_stock=True, recorded_at=first_seen + timedelta(hours=6 * i))
+                for i in range(120 * 4)
+            )
+            session.commit()
+        finally:
+            session.close()
+        
+        scheduler = RecrawlScheduler(db=db)
+        before = scheduler.estimate_rates(now)['https://test.com/p/1'][1] * 24
+        db.prune_history(raw_retention_days=30)
+        after = scheduler.estimate_rates(now)['https://test.com/p/1'][1] * 24
+        scheduler.plan(now)
+        
+        logger.info(f"Estimated changes/day: {before:.2f} before pruning, {after:.2f} after")
+        assert abs(after - before) <= 0.25, "Pruning changed the estimated change rate"
+        assert abs(after - 4) <= 0.25
+    finally:
+        os.remove(path)
+
+def test_recrawl_zero_rates():
+    """Test that products with no expected changes get the maximum interval"""
+    from recrawl import RecrawlScheduler
+    
+    scheduler = RecrawlScheduler(requests_per_hour=100, min_interval_minutes=30, max_interval_hours=48,
+                                 prior_changes=0, prior_hours=24)
+    assert scheduler.allocate([0, 0]) == [48, 48]
+    assert scheduler.allocate([0, 1]) == [48, 0.5]
+
+def test_http_cache_revalidation():
+    """Test that a 304 serves the cached body and a 304 without one triggers a plain refetch"""
+    from http_cache import ResponseCache
+    
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(directory=directory, fresh_seconds=0, enabled=True)
+        url = 'https://cache-test.invalid/page'
+        sent = []
+        
+        def send(status, body):
+            def do_send(extra_headers):
+                sent.append(dict(extra_headers))
+                return status, body, {'ETag': '"v1"'}, 'utf-8'
+            return do_send
+        
+        first = cache.fetch(url, send(200, b'<html>v1</html>'))
+        assert (first.status_code, first.text, first.from_cache) == (200, '<html>v1</html>', False)
+        
+        revalidated = cache.fetch(url, send(304, b''))
+        assert sent[-1] == {'If-None-Match': '"v1"'}
+        assert (revalidated.status_code, revalidated.text, revalidated.from_cache) == (200, '<html>v1</html>', True)
+        
+        # The body file is gone: the 304 cannot be served, so the page is asked for again without validators
+        for body_path in glob.glob(os.path.join(directory, 'bodies', '*', '*.gz')):
+            os.remove(body_path)
+        responses = iter([(304, b''), (200, b'<html>v2</html>')])
+        
+        def send_once_more(extra_headers):
+            sent.append(dict(extra_headers))
+            return (*next(responses), {}, 'utf-8')
+        
+        refetched = cache.fetch(url, send_once_more)
+        assert sent[-2:] == [{'If-None-Match': '"v1"'}, {}]
+        assert (refetched.status_code, refetched.text, refetched.from_cache) == (200, '<html>v2</html>', False)
+        assert cache.get_stats()['revalidations'] == 1
+        cache.conn.close()
+
+def write_prices(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as fh:
+        writer = csv.DictWriter(fh, fieldnames=['name', 'caliber', 'price', 'quantity', 'retailer', 'in_stock', 'url'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+def read_combined():
+    with open('all_prices.csv', newline='', encoding='utf-8') as fh:
+        return [(row['name'], row['retailer'], row['price']) for row in csv.DictReader(fh)]
+
+def test_combine_incremental():
+    """Test that combine_prices merges inputs, drops cross-file duplicates and only re-reads changed inputs"""
+    import combine_prices
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            box = {'caliber': '9mm', 'quantity': '50', 'in_stock': 'True'}
+            write_prices('a_prices.csv', [
+                dict(box, name='Box A', price='15.00', retailer='Shop A', url='https://a.test/1'),
+                dict(box, name='Box A', price='15.00', retailer='Shop A', url='https://a.test/1'),
+                dict(box, name='Box B', price='17.00', retailer='Shop A', url='https://a.test/2'),
+            ])
+            write_prices('b_prices.csv', [
+                dict(box, name='Box A again', price='15.00', retailer='Shop A', url='https://a.test/1'),
+                dict(box, name='Box C', price='12.00', retailer='Shop B', url='https://b.test/1'),
+            ])
+            files = [Path('a_prices.csv'), Path('b_prices.csv')]
+            
+            assert combine_prices.combine_files(files) == 3
+            assert read_combined() == [('Box A', 'Shop A', '15.00'), ('Box B', 'Shop A', '17.00'),
+                                       ('Box C', 'Shop B', '12.00')]
+            
+            # The dashboard's default shard holds the cheapest rows overall, cheapest first
+            with open('price_feed/manifest.json', encoding='utf-8') as fh:
+                feed = json.load(fh)
+            with open(f"price_feed/shards/{feed['cheapest']['file']}", encoding='utf-8') as fh:
+                cheapest = json.load(fh)
+            assert [row[0] for row in cheapest['rows']] == ['Box C', 'Box A', 'Box B']
+            assert feed['calibers']['9mm']['retailers']['Shop B']['count'] == 1
+            
+            # Nothing changed: the output is left alone
+            mtime = os.stat('all_prices.csv').st_mtime_ns
+            assert combine_prices.combine_files(files) == 3
+            assert os.stat('all_prices.csv').st_mtime_ns == mtime
+            
+            # The first input goes away: its duplicate in the second input now makes it into the feed
+            os.remove('a_prices.csv')
+            assert combine_prices.combine_files(files[1:]) == 2
+            assert read_combined() == [('Box A again', 'Shop A', '15.00'), ('Box C', 'Shop B', '12.00')]
+            assert combine_prices.load_manifest()['output'] == ['b_prices.csv']
+        finally:
+            os.chdir(cwd)
+
+def test_combine_vanished_input_and_bad_input():
+    """Test that a failed rebuild does not bring back the keys of an input that went away"""
+    import combine_prices
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            box = dict(name='Box A', caliber='9mm', price='15.00', quantity='50', retailer='Shop A',
+                       in_stock='True', url='https://a.test/1')
+            write_prices('a_prices.csv', [box])
+            write_prices('b_prices.csv', [box])
+            assert combine_prices.combine_files([Path('a_prices.csv'), Path('b_prices.csv')]) == 1
+            
+            # a goes away while b no longer parses: b keeps its last partition
+            os.remove('a_prices.csv')
+            with open('b_prices.csv', 'ab') as fh:
+                fh.write(b'\xff\xfe,9mm\n')
+            assert combine_prices.combine_files([Path('b_prices.csv')]) == 1
+            assert read_combined() == [('Box A', 'Shop A', '15.00')]
+        finally:
+            os.chdir(cwd)
+
 def run_all_tests():
     """Run all tests"""
     logger.info("=" * 50)
@@ -110,6 +398,14 @@ def run_all_tests():
         ("Database Connection", test_database_connection),
         ("Scraper Basic Functionality", test_scraper_basic),
         ("Product Data Extraction", test_product_extraction),
+        ("Upsert And Change-Only History", test_upsert_change_only_history),
+        ("Best Prices Leaderboard", test_best_prices_leaderboard),
+        ("Rollups And Retention", test_rollups_and_retention),
+        ("Recrawl Rate After Pruning", test_recrawl_rate_after_prune),
+        ("Recrawl Zero Rates", test_recrawl_zero_rates),
+        ("HTTP Cache Revalidation", test_http_cache_revalidation),
+        ("Incremental Combine", test_combine_incremental),
+        ("Combine After Vanished And Bad Inputs", test_combine_vanished_input_and_bad_input),
     ]
     
     passed = 0
@@ -118,7 +414,8 @@ def run_all_tests():
     for test_name, test_func in tests:
         logger.info(f"\n--- {test_name} ---")
         try:
-            if test_func():
+            # Assertion-based tests return None and raise on failure
+            if test_func() is not False:
                 passed += 1
                 logger.info(f"✓ {test_name} PASSED")
             else:
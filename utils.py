@@ -1,15 +1,31 @@
 import random
-import time
 import re
 import logging
-from fake_useragent import UserAgent
 from urllib.parse import urljoin, urlparse
-from config import SCRAPING_CONFIG, DATA_CONFIG
+from config import DATA_CONFIG
+import extraction
+from stock_status import StockMatcher
+from lazy import LazySingleton
 
 class ScrapingUtils:
     def __init__(self):
-        self.ua = UserAgent()
+        self._ua = None
         self.logger = logging.getLogger(__name__)
+        self.caliber_matcher = extraction.CaliberMatcher.from_mapping(DATA_CONFIG['caliber_mapping'])
+        self.stock_matcher = StockMatcher(
+            out_of_stock=['OUT OF STOCK', 'SOLD OUT', 'UNAVAILABLE', 'BACKORDER',
+                          'NOTIFY WHEN AVAILABLE', 'EMAIL WHEN AVAILABLE'],
+            in_stock=['IN STOCK', 'AVAILABLE', 'ADD TO CART', 'BUY NOW',
+                      'PURCHASE', 'ORDER NOW', 'SHIPS'],
+        )
+    
+    @property
+    def ua(self):
+        """fake_useragent database, loaded on first use (it may read from disk or the network)"""
+        if self._ua is None:
+            from fake_useragent import UserAgent
+            self._ua = UserAgent()
+        return self._ua
     
     def get_random_user_agent(self):
         """Get a random user agent string"""
@@ -36,15 +52,6 @@ class ScrapingUtils:
             'Upgrade-Insecure-Requests': '1',
         }
     
-    def random_delay(self):
-        """Add random delay between requests"""
-        delay = random.uniform(
-            SCRAPING_CONFIG['delay_min'], 
-            SCRAPING_CONFIG['delay_max']
-        )
-        time.sleep(delay)
-        return delay
-    
     def clean_price(self, price_text):
         """Extract and clean price from text"""
         if not price_text:
@@ -70,104 +77,20 @@ class ScrapingUtils:
     
     def extract_caliber(self, text):
         """Extract caliber from product name or description"""
-        if not text:
-            return None
-        
-        text = text.upper()
-        
-        # Common caliber patterns
-        caliber_patterns = [
-            r'9MM|9 MM',
-            r'\.223|223 REM|223 REMINGTON',
-            r'5\.56|5\.56X45|5\.56 NATO',
-            r'\.308|308 WIN|308 WINCHESTER',
-            r'\.45 ACP|45 ACP|\.45 AUTO',
-            r'\.40 S&W|40 S&W|\.40 SW',
-            r'\.380|380 ACP|380 AUTO',
-            r'7\.62X39|7\.62 X 39',
-            r'\.22 LR|22 LR|\.22LR',
-            r'300 AAC|300 BLACKOUT|300 BLK',
-            r'6\.5 CREEDMOOR|6\.5 CM',
-            r'\.30-06|30-06|30\.06',
-        ]
-        
-        for pattern in caliber_patterns:
-            if re.search(pattern, text):
-                # Map to standardized caliber names
-                for standard_cal, variations in DATA_CONFIG['caliber_mapping'].items():
-                    for variation in variations:
-                        if variation.upper() in text:
-                            return standard_cal
-        
-        return None
+        # Standardized caliber names from DATA_CONFIG['caliber_mapping']
+        return self.caliber_matcher.match(text)
     
     def extract_grain_weight(self, text):
         """Extract grain weight from text"""
-        if not text:
-            return None
-        
-        grain_match = re.search(r'(\d+)\s*GR|(\d+)\s*GRAIN', text.upper())
-        if grain_match:
-            try:
-                return int(grain_match.group(1) or grain_match.group(2))
-            except ValueError:
-                pass
-        
-        return None
+        return extraction.extract_grain_weight(text)
     
     def extract_bullet_type(self, text):
         """Extract bullet type from text"""
-        if not text:
-            return None
-        
-        text = text.upper()
-        
-        bullet_types = {
-            'FMJ': ['FMJ', 'FULL METAL JACKET'],
-            'HP': ['HP', 'HOLLOW POINT', 'HOLLOWPOINT'],
-            'SP': ['SP', 'SOFT POINT', 'SOFTPOINT'],
-            'JHP': ['JHP', 'JACKETED HOLLOW POINT'],
-            'JSP': ['JSP', 'JACKETED SOFT POINT'],
-            'TMJ': ['TMJ', 'TOTAL METAL JACKET'],
-            'LRN': ['LRN', 'LEAD ROUND NOSE'],
-            'LSWC': ['LSWC', 'LEAD SEMI WADCUTTER'],
-            'MATCH': ['MATCH', 'MATCH GRADE'],
-            'BALL': ['BALL', 'BALL AMMO'],
-        }
-        
-        for bullet_type, variations in bullet_types.items():
-            for variation in variations:
-                if variation in text:
-                    return bullet_type
-        
-        return None
+        return extraction.extract_bullet_type(text)
     
     def extract_quantity(self, text):
         """Extract quantity/count from text"""
-        if not text:
-            return None
-        
-        # Look for patterns like "50 rounds", "20 ct", "100 count", etc.
-        quantity_patterns = [
-            r'(\d+)\s*ROUNDS?',
-            r'(\d+)\s*CT',
-            r'(\d+)\s*COUNT',
-            r'(\d+)\s*PCS?',
-            r'(\d+)\s*PIECES?',
-            r'BOX OF (\d+)',
-            r'(\d+)/BOX',
-        ]
-        
-        text_upper = text.upper()
-        for pattern in quantity_patterns:
-            match = re.search(pattern, text_upper)
-            if match:
-                try:
-                    return int(match.group(1))
-                except ValueError:
-                    continue
-        
-        return None
+        return extraction.extract_quantity(text, default=None, keywords=False)
     
     def calculate_price_per_round(self, price, quantity):
         """Calculate price per round"""
@@ -187,35 +110,9 @@ class ScrapingUtils:
     
     def is_in_stock(self, text):
         """Determine if product is in stock based on text"""
-        if not text:
-            return False
-        
-        text = text.upper()
-        
-        # In stock indicators
-        in_stock_indicators = [
-            'IN STOCK', 'AVAILABLE', 'ADD TO CART', 'BUY NOW', 
-            'PURCHASE', 'ORDER NOW', 'SHIPS'
-        ]
-        
-        # Out of stock indicators
-        out_of_stock_indicators = [
-            'OUT OF STOCK', 'SOLD OUT', 'UNAVAILABLE', 'BACKORDER',
-            'NOTIFY WHEN AVAILABLE', 'EMAIL WHEN AVAILABLE'
-        ]
-        
-        # Check out of stock first (more specific)
-        for indicator in out_of_stock_indicators:
-            if indicator in text:
-                return False
-        
-        # Check in stock indicators
-        for indicator in in_stock_indicators:
-            if indicator in text:
-                return True
-        
-        # Default to False if unclear
-        return False
+        # Out of stock indicators are checked first (more specific);
+        # default to False if unclear
+        return bool(self.stock_matcher.is_in_stock(text))
     
     def clean_text(self, text):
         """Clean and normalize text"""
@@ -248,5 +145,5 @@ class ScrapingUtils:
         except:
             return False
 
-# Initialize utils instance
-scraping_utils = ScrapingUtils() 
\ No newline at end of file
+# Initialize utils instance (built on first use)
+scraping_utils = LazySingleton(ScrapingUtils)
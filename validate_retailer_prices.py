@@ -7,9 +7,11 @@ This uses only built-in Python libraries for HTTP requests and simple regex pric
 import csv
 import random
 import re
-import time
+import sys
 import urllib.request
 from datetime import datetime
+from http_cache import cached_urlopen
+import price_snapshot
 
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -40,24 +42,35 @@ def fetch_page(url):
         req.add_header('Connection', 'keep-alive')
         req.add_header('Upgrade-Insecure-Requests', '1')
 
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            content = resp.read()
-            if resp.info().get('Content-Encoding') == 'gzip':
-                import gzip
-                content = gzip.decompress(content)
-            return content.decode('utf-8', errors='ignore')
+        return cached_urlopen(req, timeout=15).text
     except Exception as e:
         print(f"❌ Failed to fetch {url}: {e}")
         return None
 
-def validate_prices(csv_file='real_ammo_prices.csv', sample_size=5):
-    """Validate prices for a sample of products"""
-    try:
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            products = list(csv.DictReader(f))
-    except FileNotFoundError:
-        print("CSV file not found. Run the scraper first.")
-        return
+def validate_prices(csv_file='real_ammo_prices.csv', sample_size=5, combined=False):
+    """Validate prices for a sample of products.
+
+    combined=True samples the all-retailer feed from combine_prices.py
+    instead of csv_file, reading only the columns compared here from its
+    Parquet snapshot (or all_prices.csv without one).
+    """
+    products = None
+    if combined:
+        df = price_snapshot.read_snapshot(
+            columns=['name', 'url', 'price'],
+            filter=price_snapshot.ds.field('price').is_valid()
+        ) if price_snapshot.available() else None
+        if df is not None:
+            products = df.to_dict('records')
+        csv_file = 'all_prices.csv'
+
+    if products is None:
+        try:
+            with open(csv_file, 'r', encoding='utf-8') as f:
+                products = list(csv.DictReader(f))
+        except FileNotFoundError:
+            print("CSV file not found. Run the scraper first.")
+            return
 
     if not products:
         print("CSV file is empty.")
@@ -97,9 +110,6 @@ def validate_prices(csv_file='real_ammo_prices.csv', sample_size=5):
         results.append({**prod, 'live_price': live_price, 'status': status})
         print(f"   → Scraped: ${scraped_price} | Live: {live_price} | {status}")
 
-        # polite delay to avoid hammering servers
-        time.sleep(2)
-
     # Summary
     print("\n✅ Validation Results Summary")
     matches = sum(1 for r in results if r['status'] == 'Match')
@@ -111,4 +121,5 @@ def validate_prices(csv_file='real_ammo_prices.csv', sample_size=5):
     print(f"Not Found/Err : {not_found}")
 
 if __name__ == '__main__':
-    validate_prices() 
\ No newline at end of file
+    # --combined: sample every retailer's prices from combine_prices.py instead
+    validate_prices(combined='--combined' in sys.argv) 
\ No newline at end of file
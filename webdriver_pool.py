@@ -0,0 +1,180 @@
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from config import SCRAPING_CONFIG, SELENIUM_POOL_CONFIG
+from utils import scraping_utils
+
+
+class WebDriverPool:
+    """Pool of warm headless Chrome drivers shared by every scraper in the process.
+
+    Drivers are created lazily up to `size`, leased one page at a time, and
+    replaced after `max_pages_per_driver` pages or when they crash.
+    """
+
+    def __init__(self, size=None, max_pages_per_driver=None, lease_timeout=None, blocked_url_patterns=None):
+        self.size = size or SELENIUM_POOL_CONFIG['size']
+        self.max_pages_per_driver = max_pages_per_driver or SELENIUM_POOL_CONFIG['max_pages_per_driver']
+        self.lease_timeout = lease_timeout or SELENIUM_POOL_CONFIG['lease_timeout']
+        if blocked_url_patterns is None:
+            blocked_url_patterns = SELENIUM_POOL_CONFIG['blocked_url_patterns']
+        self.blocked_url_patterns = blocked_url_patterns
+        self.logger = logging.getLogger(__name__)
+
+        self.condition = threading.Condition()
+        self.idle = []
+        self.page_counts = {}
+        self.total = 0
+        self.in_use = 0
+
+        # Statistics
+        self.started_at = time.monotonic()
+        self.busy_seconds = 0.0
+        self.leases = 0
+        self.created = 0
+        self.recycled = 0
+        self.crashed = 0
+        self.wait_seconds = 0.0
+
+    def _create_driver(self):
+        """Start a headless Chrome with third-party resources blocked"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument(f'--user-agent={scraping_utils.get_random_user_agent()}')
+        chrome_options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+        })
+
+        driver = webdriver.Chrome(options=chrome_options)
+        driver.set_page_load_timeout(SCRAPING_CONFIG['timeout'])
+
+        if self.blocked_url_patterns:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_url_patterns})
+
+        self.created += 1
+        self.logger.info(f"Started WebDriver {self.created} (pool size {self.size})")
+        return driver
+
+    def _acquire(self):
+        """Take an idle driver, start a new one if below size, or wait for a release"""
+        wait_started = time.monotonic()
+        deadline = wait_started + self.lease_timeout
+
+        with self.condition:
+            while True:
+                if self.idle:
+                    driver = self.idle.pop()
+                    self.in_use += 1
+                    self.wait_seconds += time.monotonic() - wait_started
+                    return driver
+
+                if self.total < self.size:
+                    # Reserve the slot, then start Chrome outside the lock
+                    self.total += 1
+                    self.in_use += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise Exception(f"No WebDriver available after {self.lease_timeout}s")
+                self.condition.wait(remaining)
+
+        try:
+            driver = self._create_driver()
+        except Exception:
+            with self.condition:
+                self.total -= 1
+                self.in_use -= 1
+                self.condition.notify()
+            raise
+
+        self.page_counts[id(driver)] = 0
+        self.wait_seconds += time.monotonic() - wait_started
+        return driver
+
+    def _release(self, driver, broken, busy_seconds):
+        """Return a driver to the pool, retiring it if it crashed or is worn out"""
+        with self.condition:
+            self.in_use -= 1
+            self.leases += 1
+            self.busy_seconds += busy_seconds
+            self.page_counts[id(driver)] += 1
+
+            retire = broken or self.page_counts[id(driver)] >= self.max_pages_per_driver
+            if retire:
+                self.total -= 1
+                del self.page_counts[id(driver)]
+                if broken:
+                    self.crashed += 1
+                else:
+                    self.recycled += 1
+            else:
+                self.idle.append(driver)
+            self.condition.notify()
+
+        if retire:
+            try:
+                driver.quit()
+            except Exception as e:
+                self.logger.debug(f"Error quitting WebDriver: {e}")
+
+    @contextmanager
+    def lease(self):
+        """Lease a driver for one page load"""
+        from selenium.common.exceptions import TimeoutException, WebDriverException
+
+        driver = self._acquire()
+        started = time.monotonic()
+        broken = False
+        try:
+            yield driver
+        except TimeoutException:
+            raise
+        except WebDriverException:
+            # Session died (Chrome crash, renderer hang): replace the driver
+            broken = True
+            raise
+        finally:
+            self._release(driver, broken, time.monotonic() - started)
+
+    def get_stats(self):
+        """Pool utilization since startup"""
+        elapsed = time.monotonic() - self.started_at
+        capacity = elapsed * self.size
+        return {
+            'size': self.size,
+            'running': self.total,
+            'in_use': self.in_use,
+            'leases': self.leases,
+            'created': self.created,
+            'recycled': self.recycled,
+            'crashed': self.crashed,
+            'utilization': round(self.busy_seconds / capacity * 100, 1) if capacity else 0.0,
+            'avg_wait_seconds': round(self.wait_seconds / self.leases, 2) if self.leases else 0.0,
+        }
+
+    def shutdown(self):
+        """Quit every idle driver"""
+        with self.condition:
+            drivers, self.idle = self.idle, []
+            self.total -= len(drivers)
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                self.logger.debug(f"Error quitting WebDriver: {e}")
+
+
+# Initialize shared WebDriver pool (drivers start on first lease)
+webdriver_pool = WebDriverPool()
+atexit.register(webdriver_pool.shutdown)